@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Response
+
+from config import settings
+from api.websocket_manager import manager
+from core.http_pool import http_pool
+from core.metrics import loop_lag_monitor, metrics
+from core.opportunity_index import opportunity_index
+from core.scan_scheduler import TIERS, scan_scheduler
+from core.snapshots import snapshot_recorder
+from core.write_behind import write_behind
+
+# Starlette appends "; charset=utf-8" to text/* media types itself.
+MEDIA_TYPE = "text/plain; version=0.0.4"
+
+router = APIRouter()
+
+metrics.gauge("arbitrage_active_opportunities", "Opportunities currently served", collect=lambda: len(opportunity_index))
+metrics.gauge("arbitrage_db_write_pending", "Opportunity rows waiting for the write-behind flush", collect=lambda: write_behind.pending)
+metrics.gauge("arbitrage_snapshot_rows_buffered", "Market snapshot rows waiting to be written", collect=lambda: snapshot_recorder.get_stats()["buffered"])
+metrics.gauge("arbitrage_ws_clients", "Connected WebSocket clients", collect=lambda: len(manager.clients))
+metrics.gauge(
+    "arbitrage_ws_queue_depth", "Frames queued across WebSocket clients",
+    collect=lambda: sum(client.queue.qsize() for client in manager.clients.values())
+)
+metrics.gauge(
+    "arbitrage_http_connections", "Upstream HTTP requests by state", ["state"],
+    collect=lambda: {(state,): http_pool.get_stats()[state] for state in ("in_flight", "waiting")}
+)
+metrics.gauge(
+    "arbitrage_scheduler_markets", "Markets per scheduler tier", ["tier"],
+    collect=lambda: {(name,): stats.markets for name, stats in zip(TIERS, scan_scheduler.tiers)}
+)
+metrics.gauge("arbitrage_event_loop_lag_last_seconds", "Most recent event-loop lag probe", collect=lambda: loop_lag_monitor.last_lag)
+
+@router.get("/metrics")
+async def get_metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=metrics.render(), media_type=MEDIA_TYPE)
@@ -1,21 +1,63 @@
 import asyncio
-from fastapi import APIRouter, Query, HTTPException, BackgroundTasks
-from typing import Optional
-from models.database import (
-    get_active_opportunities, get_opportunity_by_id,
-    get_scan_history, get_summary_stats
-)
+import secrets
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, BackgroundTasks, Request, Response
+from fastapi.responses import PlainTextResponse
+from typing import Callable, Optional
+from config import settings
+from models.database import get_opportunity_by_id, get_scan_history, get_market_snapshots
+from api.websocket_manager import manager
+from core.cluster import cluster_node
+from core.depth_engine import depth_engine
+from core.event_index import event_index
+from core.http_pool import http_pool
+from core.market_fetcher import market_fetcher
+from core.offload import process_offloader
+from core.opportunity_index import opportunity_index
+from core.profiler import MODES, scan_profiler
 from core.scanner import scanner
+from core.snapshots import snapshot_recorder, unpack_prices
+from core.warm_start import warm_start
+from core.write_behind import write_behind
+from services.notifications import notification_dispatcher
 
 router = APIRouter()
 
+def _indexed_response(request: Request, key: tuple, build: Callable[[], object]) -> Response:
+    etag = opportunity_index.etag()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=opportunity_index.render(key, build),
+        media_type="application/json",
+        headers=headers
+    )
+
+def require_admin(x_admin_token: str = Header(default="")):
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin API is disabled")
+    if not secrets.compare_digest(x_admin_token, settings.ADMIN_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 @router.get("/")
 async def health_check():
     return {"status": "ok"}
 
 @router.get("/status")
 async def get_status():
-    return scanner.get_status()
+    status = scanner.get_status()
+    status["http_pool"] = http_pool.get_stats()
+    status["fetcher"] = market_fetcher.get_stats()
+    status["depth"] = depth_engine.get_stats()
+    status["events"] = event_index.get_stats()
+    status["db_writes"] = write_behind.get_stats()
+    status["snapshots"] = snapshot_recorder.get_stats()
+    status["websocket"] = manager.get_stats()
+    status["notifications"] = notification_dispatcher.get_stats()
+    status["execution"] = process_offloader.get_stats()
+    status["warm_start"] = warm_start.get_stats()
+    status["cluster"] = cluster_node.get_stats() if cluster_node.enabled else None
+    return status
 
 @router.post("/start")
 async def start_scanning(background_tasks: BackgroundTasks):
@@ -28,6 +70,7 @@ async def start_scanning(background_tasks: BackgroundTasks):
 @router.post("/stop")
 async def stop_scanning():
     scanner.stop()
+    await scanner.close_tick_window()
     return {"message": "Scanner stopped", "status": "stopped"}
 
 @router.post("/scan")
@@ -44,26 +87,92 @@ async def trigger_scan():
 
 @router.get("/opportunities")
 async def list_opportunities(
+    request: Request,
     min_profit: float = Query(default=0, ge=0),
     sort: str = Query(default="profit", pattern="^(profit|liquidity|recent)$"),
     limit: int = Query(default=100, ge=1, le=500)
 ):
-    opportunities = await get_active_opportunities(limit, min_profit, sort)
-    return opportunities
+    return _indexed_response(
+        request,
+        ("list", sort, min_profit, limit),
+        lambda: opportunity_index.query(limit, min_profit, sort)
+    )
 
 @router.get("/opportunities/{opp_id}")
-async def get_opportunity(opp_id: str):
+async def get_opportunity(request: Request, opp_id: str):
+    if opportunity_index.get(opp_id) is not None:
+        return _indexed_response(request, ("detail", opp_id), lambda: opportunity_index.get(opp_id))
+    
     opportunity = await get_opportunity_by_id(opp_id)
     if not opportunity:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     return opportunity
 
 @router.get("/summary")
-async def get_summary():
-    stats = await get_summary_stats()
-    return stats
+async def get_summary(request: Request):
+    return _indexed_response(request, ("summary",), opportunity_index.summary)
 
 @router.get("/history")
-async def get_history(limit: int = Query(default=50, ge=1, le=200)):
-    history = await get_scan_history(limit)
+async def get_history(
+    limit: int = Query(default=50, ge=1, le=200),
+    kind: Optional[str] = Query(default=None, pattern="^(full|ticks)$")
+):
+    history = await get_scan_history(limit, kind)
     return history
+
+@router.get("/markets/{condition_id}/history")
+async def get_market_history(
+    condition_id: str,
+    resolution: int = Query(default=1),
+    since: str = Query(default=""),
+    limit: int = Query(default=1000, ge=1, le=10000)
+):
+    if resolution not in (1, 60, 3600):
+        raise HTTPException(status_code=400, detail="resolution must be 1, 60 or 3600")
+    snapshots = await get_market_snapshots(condition_id, resolution, since, limit)
+    for snapshot in snapshots:
+        snapshot["token_prices"] = unpack_prices(snapshot["token_prices"])
+    return snapshots
+
+@router.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def start_profile(
+    scans: int = Query(default=1, ge=1),
+    mode: str = Query(default="deterministic", pattern=f"^({'|'.join(MODES)})$"),
+    interval_ms: float = Query(default=5.0, ge=0.5, le=1000),
+    allocations: bool = Query(default=False),
+    top: int = Query(default=25, ge=1, le=500)
+):
+    if scans > settings.PROFILE_MAX_SCANS:
+        raise HTTPException(status_code=400, detail=f"scans must be at most {settings.PROFILE_MAX_SCANS}")
+    try:
+        scan_profiler.arm(scans, mode, interval_ms, allocations, top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return scan_profiler.get_status()
+
+@router.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def get_profile():
+    return scan_profiler.get_status()
+
+@router.delete("/admin/profile", dependencies=[Depends(require_admin)])
+async def cancel_profile():
+    scan_profiler.cancel()
+    return scan_profiler.get_status()
+
+@router.get("/admin/profile/pstats", dependencies=[Depends(require_admin)])
+async def download_pstats():
+    data = scan_profiler.dump_pstats()
+    if data is None:
+        raise HTTPException(status_code=404, detail="No completed deterministic profile")
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="scan.pstats"'}
+    )
+
+@router.get("/admin/profile/collapsed", dependencies=[Depends(require_admin)])
+async def download_collapsed():
+    text = scan_profiler.dump_collapsed()
+    if text is None:
+        raise HTTPException(status_code=404, detail="No completed profile")
+    return PlainTextResponse(text, headers={"Content-Disposition": 'attachment; filename="scan.collapsed.txt"'})
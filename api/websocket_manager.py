@@ -1,45 +1,279 @@
+import asyncio
 import json
 import logging
-from typing import List
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
 from fastapi import WebSocket
+from config import settings
+from core.metrics import WS_FANOUT
+from core.opportunity_index import opportunity_index
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+RESYNC = object()
+
+Payload = Union[str, bytes]
+
+class Subscription:
+    __slots__ = ("min_profit", "types", "encoding")
+    
+    def __init__(self, min_profit: float = 0.0, types: Optional[Iterable[str]] = None, encoding: str = "json"):
+        self.min_profit = float(min_profit or 0)
+        self.types: Optional[FrozenSet[str]] = frozenset(types) if types else None
+        if encoding == "msgpack" and msgpack is None:
+            logger.warning("msgpack encoding requested but the 'msgpack' package is not installed, using JSON")
+            encoding = "json"
+        self.encoding = encoding if encoding in ("json", "msgpack") else "json"
+    
+    @classmethod
+    def from_params(cls, params) -> "Subscription":
+        types = params.get("types")
+        if isinstance(types, str):
+            types = [t for t in types.split(",") if t]
+        try:
+            min_profit = float(params.get("min_profit") or 0)
+        except (TypeError, ValueError):
+            min_profit = 0.0
+        return cls(min_profit, types, params.get("encoding") or "json")
+    
+    @property
+    def is_filtered(self) -> bool:
+        return self.min_profit > 0 or self.types is not None
+    
+    def key(self) -> Tuple[float, Optional[FrozenSet[str]], str]:
+        return (self.min_profit, self.types, self.encoding)
+    
+    def matches(self, opportunity: dict) -> bool:
+        if opportunity["net_profit_percent"] < self.min_profit:
+            return False
+        return self.types is None or opportunity["arbitrage_type"] in self.types
+    
+    def filter_frame(self, frame: dict) -> dict:
+        if not self.is_filtered or frame.get("type") != "delta":
+            return frame
+        removed = list(frame["removed"])
+        updated = []
+        for opportunity in frame["updated"]:
+            if self.matches(opportunity):
+                updated.append(opportunity)
+            else:
+                removed.append(opportunity["id"])
+        return {
+            **frame,
+            "added": [opp for opp in frame["added"] if self.matches(opp)],
+            "updated": updated,
+            "removed": removed
+        }
+    
+    def encode(self, frame: dict) -> Payload:
+        if self.encoding == "msgpack":
+            return msgpack.packb(frame, use_bin_type=True)
+        return json.dumps(frame, separators=(",", ":"))
+
+class ClientChannel:
+    __slots__ = (
+        "websocket", "subscription", "queue", "task", "sent", "dropped",
+        "resyncs", "resync_pending", "sending_since"
+    )
+    
+    def __init__(self, websocket: WebSocket, subscription: Subscription):
+        self.websocket = websocket
+        self.subscription = subscription
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_CLIENT_QUEUE_SIZE)
+        self.task: Optional[asyncio.Task] = None
+        self.sent: int = 0
+        self.dropped: int = 0
+        self.resyncs: int = 0
+        self.resync_pending: bool = False
+        self.sending_since: float = 0.0
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.clients: Dict[WebSocket, ClientChannel] = {}
+        self.messages_published: int = 0
+        self.messages_dropped: int = 0
+        self.evictions: int = 0
+        self.resyncs: int = 0
+        self.last_publish_us: float = 0.0
+        self.last_encodings: int = 0
+        self.seq: int = 0
+        self._closing: Set[asyncio.Task] = set()
+    
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients)
     
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        client = ClientChannel(websocket, Subscription.from_params(websocket.query_params))
+        self._queue_snapshot(client)
+        client.task = asyncio.create_task(self._writer(client))
+        self.clients[websocket] = client
+        logger.info(f"WebSocket connected. Total connections: {len(self.clients)}")
     
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+        logger.info(f"WebSocket disconnected. Total connections: {len(self.clients)}")
+    
+    async def _writer(self, client: ClientChannel):
+        try:
+            while True:
+                payload = await client.queue.get()
+                if payload is RESYNC:
+                    client.resync_pending = False
+                    payload = client.subscription.encode(self.snapshot_frame(client.subscription))
+                client.sending_since = time.monotonic()
+                if isinstance(payload, bytes):
+                    await client.websocket.send_bytes(payload)
+                else:
+                    await client.websocket.send_text(payload)
+                client.sending_since = 0.0
+                client.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send to websocket: {e!r}")
+            self.disconnect(client.websocket)
+            await self._close_quietly(client.websocket)
+    
+    def _evict(self, client: ClientChannel):
+        self.evictions += 1
+        self.disconnect(client.websocket)
+        task = asyncio.create_task(self._close_quietly(client.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+    
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+    
+    def _queue_snapshot(self, client: ClientChannel) -> int:
+        discarded = 0
+        while not client.queue.empty():
+            client.queue.get_nowait()
+            discarded += 1
+        client.queue.put_nowait(RESYNC)
+        client.resync_pending = True
+        return discarded
+    
+    def _resync(self, client: ClientChannel):
+        discarded = self._queue_snapshot(client)
+        client.dropped += discarded
+        self.messages_dropped += discarded
+        client.resyncs += 1
+        self.resyncs += 1
+    
+    def _overflow(self, client: ClientChannel):
+        client.dropped += 1
+        self.messages_dropped += 1
+        if settings.WS_SLOW_CLIENT_POLICY == "disconnect":
+            self._evict(client)
+        elif not client.resync_pending:
+            self._resync(client)
+    
+    def snapshot_frame(self, subscription: Subscription) -> dict:
+        opportunities = opportunity_index.query(settings.WS_SNAPSHOT_LIMIT, subscription.min_profit, "profit")
+        if subscription.types is not None:
+            opportunities = [opp for opp in opportunities if subscription.matches(opp)]
+        return {
+            "type": "snapshot",
+            "seq": self.seq,
+            "opportunities": opportunities,
+            "summary": opportunity_index.summary()
+        }
+    
+    def publish(self, frame: dict):
+        start = time.perf_counter()
+        stalled_before = time.monotonic() - settings.WS_SEND_TIMEOUT_SECONDS
+        encoded: Dict[tuple, Payload] = {}
+        for client in list(self.clients.values()):
+            if client.sending_since and client.sending_since < stalled_before:
+                self._evict(client)
+                continue
+            if client.resync_pending:
+                client.dropped += 1
+                self.messages_dropped += 1
+                continue
+            subscription = client.subscription
+            key = subscription.key()
+            payload = encoded.get(key)
+            if payload is None:
+                payload = subscription.encode(subscription.filter_frame(frame))
+                encoded[key] = payload
+            try:
+                client.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._overflow(client)
+        self.messages_published += 1
+        self.last_encodings = len(encoded)
+        elapsed = time.perf_counter() - start
+        WS_FANOUT.observe(elapsed)
+        self.last_publish_us = round(elapsed * 1e6, 1)
     
     async def broadcast(self, message: dict):
-        if not self.active_connections:
+        if not self.clients:
+            return
+        self.publish(message)
+    
+    async def publish_delta(self, delta: dict):
+        self.seq += 1
+        if not self.clients:
+            return
+        self.publish({**delta, "seq": self.seq})
+    
+    def handle_message(self, websocket: WebSocket, text: str):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
             return
         
-        json_message = json.dumps(message)
-        disconnected = []
-        
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json_message)
-            except Exception as e:
-                logger.warning(f"Failed to send to websocket: {e}")
-                disconnected.append(connection)
-        
-        for conn in disconnected:
-            self.disconnect(conn)
+        kind = message.get("type")
+        if kind == "subscribe":
+            client.subscription = Subscription.from_params(message)
+        elif kind != "resync":
+            return
+        if not client.resync_pending:
+            self._queue_snapshot(client)
     
     async def send_personal(self, websocket: WebSocket, message: dict):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
         try:
-            await websocket.send_text(json.dumps(message))
-        except Exception as e:
-            logger.warning(f"Failed to send personal message: {e}")
+            client.queue.put_nowait(client.subscription.encode(message))
+        except asyncio.QueueFull:
+            self._overflow(client)
+    
+    def get_stats(self) -> dict:
+        depths = [client.queue.qsize() for client in self.clients.values()]
+        return {
+            "clients": len(self.clients),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "messages_published": self.messages_published,
+            "messages_dropped": self.messages_dropped,
+            "evictions": self.evictions,
+            "resyncs": self.resyncs,
+            "last_publish_us": self.last_publish_us,
+            "last_encodings": self.last_encodings,
+            "seq": self.seq,
+            "policy": settings.WS_SLOW_CLIENT_POLICY
+        }
 
 manager = ConnectionManager()
@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from core.arbitrage_detector import detect_arbitrage
+from core.snapshots import pack_prices
+from models.connection import database
+from models.database import (
+    get_active_opportunities, get_opportunity_by_id, init_database, insert_market_snapshots,
+    log_scan_complete, log_scan_start, opportunity_row, write_opportunity_batch
+)
+from synthetic import SyntheticPolymarket
+
+def build_opportunities(n_rows: int, seed: int) -> list:
+    data = SyntheticPolymarket(n_rows * 2, seed, mispriced_share=1.0, event_share=0.0)
+    opportunities = []
+    for market in data.records():
+        opportunity = detect_arbitrage(market)
+        if opportunity is not None:
+            opportunities.append(opportunity.to_dict())
+            if len(opportunities) == n_rows:
+                break
+    return opportunities
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def timings_ms(samples: list) -> dict:
+    return {
+        "p50": round(statistics.median(samples) * 1000, 3),
+        "p99": round(percentile(samples, 0.99) * 1000, 3)
+    }
+
+async def write_batches(rows: list, expirations: list, batch_size: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(0, max(len(rows), len(expirations)), batch_size):
+        await write_opportunity_batch(rows[i:i + batch_size], expirations[i:i + batch_size])
+    return time.perf_counter() - t0
+
+async def run(n_rows: int, args) -> dict:
+    opportunities = build_opportunities(n_rows, args.seed)
+    n_rows = len(opportunities)
+    rng = random.Random(args.seed)
+    batch_size = settings.DB_FLUSH_MAX_ROWS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.path = os.path.join(tmp, "bench.db")
+        await init_database()
+
+        seen_at = datetime.utcnow().isoformat()
+        rows = [opportunity_row(opp, seen_at) for opp in opportunities]
+        insert_seconds = await write_batches(rows, [], batch_size)
+        upsert_seconds = await write_batches(rows, [], batch_size)
+
+        list_samples = []
+        for i in range(args.queries):
+            sort = ("profit", "liquidity", "recent")[i % 3]
+            t0 = time.perf_counter()
+            await get_active_opportunities(100, 0, sort)
+            list_samples.append(time.perf_counter() - t0)
+
+        detail_samples = []
+        for _ in range(args.queries):
+            opp_id = rng.choice(opportunities)["id"]
+            t0 = time.perf_counter()
+            await get_opportunity_by_id(opp_id)
+            detail_samples.append(time.perf_counter() - t0)
+
+        scan_log_samples = []
+        for _ in range(args.queries):
+            t0 = time.perf_counter()
+            scan_id = await log_scan_start()
+            await log_scan_complete(scan_id, n_rows, n_rows, 1000, None, {"pipeline": 1.0}, 0.0)
+            scan_log_samples.append(time.perf_counter() - t0)
+
+        expirations = [(seen_at, opp["id"]) for opp in opportunities]
+        expire_seconds = await write_batches([], expirations, batch_size)
+
+        snapshot_rows = [
+            (1, opp["markets_involved"][0], opp["total_cost"], pack_prices([leg["price"] for leg in opp["trade_legs"]]),
+             1000.0, opp["min_liquidity"], seen_at)
+            for opp in opportunities
+        ]
+        t0 = time.perf_counter()
+        for i in range(0, len(snapshot_rows), batch_size):
+            await insert_market_snapshots(snapshot_rows[i:i + batch_size])
+        snapshot_seconds = time.perf_counter() - t0
+
+        await database.close()
+        db_bytes = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+
+    return {
+        "rows": n_rows,
+        "batch_size": batch_size,
+        "insert_rows_per_s": round(n_rows / insert_seconds),
+        "upsert_rows_per_s": round(n_rows / upsert_seconds),
+        "expire_rows_per_s": round(n_rows / expire_seconds),
+        "snapshot_rows_per_s": round(n_rows / snapshot_seconds),
+        "list_active_ms": timings_ms(list_samples),
+        "get_by_id_ms": timings_ms(detail_samples),
+        "scan_log_ms": timings_ms(scan_log_samples),
+        "db_mb": round(db_bytes / 1e6, 1)
+    }
+
+async def main_async(args):
+    results = []
+    for n_rows in args.rows:
+        result = await run(n_rows, args)
+        results.append(result)
+        print(json.dumps(result))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite layer: opportunity batch writes, reads, scan logging and snapshots")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "db", "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
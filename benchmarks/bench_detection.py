@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.arbitrage_detector import detect_arbitrage
+from core.batch_detector import PriceColumns, detect_arbitrage_batch, evaluate_batch
+from models.market import Market, Token
+
+CHUNK_SIZE = 50_000
+
+def generate_prices(n_markets: int, mispriced_share: float, seed: int):
+    rng = np.random.default_rng(seed)
+    counts = np.where(rng.random(n_markets) < 0.8, 2, rng.integers(3, 8, n_markets))
+    offsets = np.zeros(n_markets + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    
+    weights = rng.random(int(offsets[-1])) + 0.05
+    totals = np.add.reduceat(weights, offsets[:-1])
+    target = np.where(rng.random(n_markets) < mispriced_share, rng.uniform(0.90, 0.975, n_markets), rng.uniform(1.0, 1.04, n_markets))
+    prices = np.round(weights * np.repeat(target / totals, counts), 4)
+    return PriceColumns(prices, offsets)
+
+def build_markets(columns: PriceColumns, start: int, stop: int):
+    markets = []
+    prices = columns.prices
+    offsets = columns.offsets
+    for i in range(start, stop):
+        tokens = [
+            Token(token_id=f"{i}-{j}", outcome=f"O{j}", price=float(prices[k]))
+            for j, k in enumerate(range(offsets[i], offsets[i + 1]))
+        ]
+        markets.append(Market(
+            id=str(i), question=f"Market {i}?", conditionId=f"0x{i:064x}",
+            slug=f"market-{i}", tokens=tokens, liquidity=1000
+        ))
+    return markets
+
+def comparable(opportunity) -> dict:
+    data = opportunity.to_dict()
+    data.pop("detected_at")
+    return data
+
+def run(n_markets: int, mispriced_share: float, seed: int, verify: bool) -> dict:
+    columns = generate_prices(n_markets, mispriced_share, seed)
+    
+    scalar_seconds = 0.0
+    build_seconds = 0.0
+    batch_seconds = 0.0
+    scalar_found = 0
+    batch_found = 0
+    identical = True
+    
+    for start in range(0, n_markets, CHUNK_SIZE):
+        stop = min(n_markets, start + CHUNK_SIZE)
+        markets = build_markets(columns, start, stop)
+        
+        t0 = time.perf_counter()
+        scalar = [o for o in (detect_arbitrage(m) for m in markets) if o]
+        scalar_seconds += time.perf_counter() - t0
+        
+        t0 = time.perf_counter()
+        chunk_columns = PriceColumns.from_markets(markets)
+        build_seconds += time.perf_counter() - t0
+        
+        t0 = time.perf_counter()
+        batch = detect_arbitrage_batch(markets, chunk_columns)
+        batch_seconds += time.perf_counter() - t0
+        
+        scalar_found += len(scalar)
+        batch_found += len(batch)
+        if verify and [comparable(o) for o in scalar] != [comparable(o) for o in batch]:
+            identical = False
+    
+    t0 = time.perf_counter()
+    evaluate_batch(columns)
+    evaluate_seconds = time.perf_counter() - t0
+    
+    return {
+        "markets": n_markets,
+        "opportunities": scalar_found,
+        "identical": identical and scalar_found == batch_found,
+        "scalar_ms": round(scalar_seconds * 1000, 2),
+        "batch_ms": round(batch_seconds * 1000, 2),
+        "column_build_ms": round(build_seconds * 1000, 2),
+        "evaluate_only_ms": round(evaluate_seconds * 1000, 2),
+        "speedup": round(scalar_seconds / batch_seconds, 1) if batch_seconds else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Scalar vs vectorized arbitrage detection")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--mispriced", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-verify", action="store_true")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    
+    results = []
+    for size in args.sizes:
+        result = run(size, args.mispriced, args.seed, not args.no_verify)
+        results.append(result)
+        print(
+            f"{result['markets']:>9,} markets  scalar {result['scalar_ms']:>10.1f} ms  "
+            f"batch {result['batch_ms']:>8.1f} ms  (columns {result['column_build_ms']:.1f} ms, "
+            f"evaluate only {result['evaluate_only_ms']:.1f} ms)  x{result['speedup']}  "
+            f"opps={result['opportunities']} identical={result['identical']}"
+        )
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "detection", "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from core.batch_detector import detect_arbitrage_batch
+from core.offload import process_offloader
+from core.scanner import ArbitrageScanner, ScanState
+from models.market import MarketRecord, TokenRecord
+
+def generate_markets(n_markets: int, mispriced_share: float, rng: random.Random):
+    markets = []
+    for i in range(n_markets):
+        n_tokens = 2 if rng.random() < 0.8 else rng.randint(3, 7)
+        target = rng.uniform(0.90, 0.975) if rng.random() < mispriced_share else rng.uniform(1.0, 1.04)
+        weights = [rng.random() + 0.05 for _ in range(n_tokens)]
+        total = sum(weights)
+        tokens = [
+            TokenRecord(f"{i}-{j}", f"O{j}", round(weight / total * target, 4))
+            for j, weight in enumerate(weights)
+        ]
+        markets.append(MarketRecord(
+            str(i), f"Market {i}?", f"0x{i:064x}", f"market-{i}", tokens, 0.0, 1000.0, False, None
+        ))
+    return markets
+
+def generate_prices(markets, changed_share: float, rng: random.Random) -> dict:
+    prices = {}
+    for market in markets:
+        if rng.random() >= changed_share:
+            continue
+        for token in market.tokens:
+            prices[token.token_id] = {"price": round(max(0.001, token.price * rng.uniform(0.97, 1.03)), 4)}
+    return prices
+
+async def ticker(interval: float, lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+async def run_mode(mode: str, markets, rounds, args) -> dict:
+    settings.EXECUTION_MODE = mode
+    scanner = ArbitrageScanner()
+    batches = [markets[i:i + args.batch_size] for i in range(0, len(markets), args.batch_size)]
+    workers = process_offloader.workers if mode == "pool" else 1
+    semaphore = asyncio.Semaphore(workers)
+    
+    async def process(batch, prices):
+        async with semaphore:
+            if mode == "pool":
+                changed, opportunities, _ = await process_offloader.scan_batch(batch, prices, 1, scanner._last_prices)
+                for pos, new_prices in changed:
+                    for token, price in zip(batch[pos].tokens, new_prices):
+                        token.price = price
+                    scanner._last_prices[batch[pos].key] = (batch[pos].liquidity, *new_prices)
+                return len(opportunities)
+            selected = scanner._build_markets_inline(batch, prices) or []
+            await asyncio.sleep(0)
+            return len(detect_arbitrage_batch(selected)) if selected else 0
+    
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(args.tick_interval, lags, stop))
+    scan_seconds = []
+    found = []
+    for prices in rounds:
+        scanner._scan = ScanState()
+        batch_prices = [
+            {tid: prices[tid] for market in batch for token in market.tokens if (tid := token.token_id) in prices}
+            for batch in batches
+        ]
+        start = time.perf_counter()
+        counts = await asyncio.gather(*[process(batch, p) for batch, p in zip(batches, batch_prices)])
+        scan_seconds.append(time.perf_counter() - start)
+        found.append(sum(counts))
+    stop.set()
+    await tick
+    
+    stats = process_offloader.get_stats() if mode == "pool" else {}
+    process_offloader.shutdown()
+    return {
+        "mode": mode,
+        "workers": workers,
+        "markets": len(markets),
+        "rounds": len(rounds),
+        "first_scan_seconds": round(scan_seconds[0], 3),
+        "scan_seconds_median": round(statistics.median(scan_seconds[1:] or scan_seconds), 3),
+        "loop_lag_ms_p99": round(sorted(lags)[int(len(lags) * 0.99) - 1] * 1000, 2) if lags else None,
+        "loop_lag_ms_max": round(max(lags, default=0) * 1000, 2),
+        "detected_last_round": found[-1],
+        "shard_loads": stats.get("shard_loads", 0),
+        "worker_seconds": stats.get("worker_seconds", 0.0),
+        "round_trip_seconds": stats.get("round_trip_seconds", 0.0)
+    }
+
+async def main_async(args):
+    results = []
+    for n_markets in args.sizes:
+        for mode in args.modes:
+            rng = random.Random(args.seed)
+            markets = generate_markets(n_markets, args.mispriced_share, rng)
+            rounds = [generate_prices(markets, args.changed_share, rng) for _ in range(args.rounds)]
+            result = await run_mode(mode, markets, rounds, args)
+            results.append(result)
+            print(json.dumps(result))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs process-pool market evaluation: scan time and event-loop lag")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"], choices=["inline", "pool"])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--changed-share", type=float, default=0.2, help="share of markets whose prices move each round")
+    parser.add_argument("--mispriced-share", type=float, default=0.05)
+    parser.add_argument("--tick-interval", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    
+    settings.SNAPSHOTS_ENABLED = False
+    settings.EVENT_ARBITRAGE_ENABLED = False
+    results = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.arbitrage_detector import detect_arbitrage
+from models.market import Market, MarketRecord
+
+def generate_raw_markets(n_markets: int, seed: int):
+    rng = random.Random(seed)
+    raw_markets = []
+    prices = {}
+    for i in range(n_markets):
+        tokens = []
+        for outcome in ("Yes", "No"):
+            token_id = str(rng.getrandbits(250))
+            tokens.append({"token_id": token_id, "outcome": outcome, "price": 0.5})
+            prices[token_id] = {"price": str(round(rng.uniform(0.3, 0.7), 3))}
+        raw_markets.append({
+            "id": str(i),
+            "question": f"Will market {i} resolve YES?",
+            "conditionId": f"0x{rng.getrandbits(256):064x}",
+            "slug": f"market-{i}",
+            "tokens": tokens,
+            "volume24hr": rng.uniform(0, 1e5),
+            "liquidity": rng.uniform(100, 1e5),
+            "closed": False
+        })
+    return raw_markets, prices
+
+def apply_prices(market, prices: dict):
+    for token in market.tokens:
+        price_data = prices.get(token.token_id)
+        if isinstance(price_data, dict):
+            token.price = float(price_data.get("price", token.price) or token.price)
+
+def measure_build(cls, raw_markets):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    markets = [cls.from_api(raw) for raw in raw_markets]
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return markets, elapsed, current
+
+def measure_cycle(raw_markets, prices, records):
+    t0 = time.perf_counter()
+    for raw in raw_markets:
+        market = Market.from_api(raw)
+        apply_prices(market, prices)
+        detect_arbitrage(market)
+    pydantic_seconds = time.perf_counter() - t0
+    
+    t0 = time.perf_counter()
+    for market in records:
+        apply_prices(market, prices)
+        detect_arbitrage(market)
+    record_seconds = time.perf_counter() - t0
+    return pydantic_seconds, record_seconds
+
+def run(n_markets: int, seed: int) -> dict:
+    raw_markets, prices = generate_raw_markets(n_markets, seed)
+    
+    models, model_seconds, model_bytes = measure_build(Market, raw_markets)
+    del models
+    records, record_seconds, record_bytes = measure_build(MarketRecord, raw_markets)
+    pydantic_cycle, record_cycle = measure_cycle(raw_markets, prices, records)
+    
+    return {
+        "markets": n_markets,
+        "pydantic_build_ms": round(model_seconds * 1000, 1),
+        "record_build_ms": round(record_seconds * 1000, 1),
+        "pydantic_bytes_per_market": round(model_bytes / n_markets),
+        "record_bytes_per_market": round(record_bytes / n_markets),
+        "pydantic_cycle_ms": round(pydantic_cycle * 1000, 1),
+        "record_cycle_ms": round(record_cycle * 1000, 1),
+        "cycle_speedup": round(pydantic_cycle / record_cycle, 1) if record_cycle else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Pydantic Market vs slotted MarketRecord on the scan hot path")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    
+    results = []
+    for size in args.sizes:
+        result = run(size, args.seed)
+        results.append(result)
+        print(
+            f"{result['markets']:>8,} markets  build: pydantic {result['pydantic_build_ms']:>8.1f} ms "
+            f"({result['pydantic_bytes_per_market']} B/market)  records {result['record_build_ms']:>8.1f} ms "
+            f"({result['record_bytes_per_market']} B/market)  "
+            f"price cycle: pydantic {result['pydantic_cycle_ms']:.1f} ms  records {result['record_cycle_ms']:.1f} ms  "
+            f"x{result['cycle_speedup']}"
+        )
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "market_model", "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
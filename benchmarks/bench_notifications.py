@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from core.arbitrage_detector import detect_arbitrage
+from mock_api import MockPolymarketServer
+from synthetic import SyntheticPolymarket
+
+def build_opportunities(count: int, seed: int) -> list:
+    data = SyntheticPolymarket(count * 2, seed, mispriced_share=1.0, event_share=0.0)
+    opportunities = []
+    for market in data.records():
+        opportunity = detect_arbitrage(market)
+        if opportunity is not None:
+            opportunities.append(opportunity.to_dict())
+            if len(opportunities) == count:
+                break
+    return opportunities
+
+async def dispatch(args, opportunities: list, base_url: str, file_path: str) -> dict:
+    settings.NOTIFY_RATE_LIMIT_PER_SECOND = args.rate
+    settings.NOTIFY_RATE_LIMIT_BURST = args.burst
+    settings.NOTIFY_COALESCE_SECONDS = args.coalesce_ms / 1000
+    settings.RETRY_BASE_DELAY_SECONDS = 0.05
+    from core.http_pool import http_pool
+    from services.notifications import DiscordSink, FileSink, WebhookSink, notification_dispatcher
+
+    await http_pool.start()
+    sinks = [DiscordSink(f"{base_url}/webhook/discord"), WebhookSink(f"{base_url}/webhook/generic"), FileSink(file_path)]
+    notification_dispatcher.start(sinks)
+    rng = random.Random(args.seed)
+
+    submit_seconds = []
+    submitted = 0
+    notified = []
+    t0 = time.perf_counter()
+    try:
+        for burst in range(args.bursts):
+            # Each burst stands in for one scan delta: fresh opportunities plus
+            # re-detections of ones already notified.
+            fresh = opportunities[burst::args.bursts]
+            repeats = rng.sample(notified, min(len(notified), int(len(fresh) * args.repeat_share)))
+            frame = fresh + repeats
+            notified.extend(fresh)
+            submitted += len(frame)
+            s0 = time.perf_counter()
+            notification_dispatcher.submit_many(frame)
+            submit_seconds.append(time.perf_counter() - s0)
+            await asyncio.sleep(args.burst_interval_ms / 1000)
+        await notification_dispatcher.wait_idle()
+        drain_seconds = time.perf_counter() - t0
+        stats = notification_dispatcher.get_stats()
+        await notification_dispatcher.stop()
+    finally:
+        await http_pool.close()
+
+    with open(file_path) as f:
+        file_items = sum(1 for _ in f)
+    return {
+        "submitted": submitted,
+        "submit_ms_max": round(max(submit_seconds) * 1000, 3),
+        "drain_s": round(drain_seconds, 3),
+        "file_items": file_items,
+        "dispatcher": {key: value for key, value in stats.items() if key not in ("sinks", "rate_limiters")}
+    }
+
+def run_in_child(args, opportunities: list, base_url: str, file_path: str) -> dict:
+    return asyncio.run(dispatch(args, opportunities, base_url, file_path))
+
+def run(size: int, args) -> dict:
+    opportunities = build_opportunities(size, args.seed)
+    server = MockPolymarketServer(
+        10, seed=args.seed, latency_ms=args.latency_ms, throttle_rate=args.throttle_rate, error_rate=args.error_rate
+    )
+    with server, tempfile.TemporaryDirectory() as tmp:
+        # The dispatcher is a module singleton, so every size runs in a fresh process.
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            outcome = pool.apply(run_in_child, (args, opportunities, server.base_url, os.path.join(tmp, "notifications.jsonl")))
+        requests = server.stats()
+
+    unique = len(opportunities)
+    return {
+        "size": unique,
+        "submitted": outcome["submitted"],
+        "deduped": outcome["dispatcher"]["deduped"],
+        "submit_ms_max": outcome["submit_ms_max"],
+        "drain_s": outcome["drain_s"],
+        "discord_messages": requests.get("webhook_discord_messages", 0),
+        "discord_embeds_max": requests.get("webhook_discord_max_items", 0),
+        "discord_missing": unique - requests.get("webhook_discord_items", 0),
+        "webhook_messages": requests.get("webhook_generic_messages", 0),
+        "webhook_missing": unique - requests.get("webhook_generic_items", 0),
+        "file_missing": unique - outcome["file_items"],
+        "retried": outcome["dispatcher"]["retried"],
+        "failed": outcome["dispatcher"]["failed"],
+        "status_429": requests.get("status_429", 0),
+        "status_500": requests.get("status_500", 0)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Notification dispatcher against a local stand-in webhook: dedupe, coalescing, rate limits and retries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000], help="distinct opportunities notified")
+    parser.add_argument("--bursts", type=int, default=10, help="deltas the opportunities arrive in")
+    parser.add_argument("--burst-interval-ms", type=float, default=100.0)
+    parser.add_argument("--repeat-share", type=float, default=0.5, help="re-detected opportunities per burst, relative to fresh ones")
+    parser.add_argument("--coalesce-ms", type=float, default=settings.NOTIFY_COALESCE_SECONDS * 1000)
+    parser.add_argument("--rate", type=float, default=50.0, help="webhook messages per second per sink")
+    parser.add_argument("--burst", type=int, default=settings.NOTIFY_RATE_LIMIT_BURST)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        result = run(size, args)
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "notifications", "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
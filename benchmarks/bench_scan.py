@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from mock_api import MockPolymarketServer
+
+def configure(args, gamma_url: str, clob_url: str, db_path: str):
+    from core.market_fetcher import market_fetcher
+    from core.rate_limiter import AdaptiveRateLimiter
+    from models.connection import database
+
+    settings.SNAPSHOTS_ENABLED = args.snapshots
+    settings.DEPTH_ANALYSIS_ENABLED = args.depth
+    settings.EVENT_ARBITRAGE_ENABLED = args.events
+    settings.DETECTION_MODE = args.detection
+    settings.RETRY_BASE_DELAY_SECONDS = 0.05
+    database.path = db_path
+    market_fetcher.gamma_url = gamma_url
+    market_fetcher.clob_url = clob_url
+    market_fetcher.gamma_limiter = AdaptiveRateLimiter("gamma", args.rate_limit, int(args.rate_limit))
+    market_fetcher.clob_limiter = AdaptiveRateLimiter("clob", args.rate_limit, int(args.rate_limit))
+
+async def scan_rounds(args, gamma_url: str, clob_url: str, advance_url: str, db_path: str) -> dict:
+    configure(args, gamma_url, clob_url, db_path)
+    import httpx
+    from core.http_pool import http_pool
+    from core.market_fetcher import market_fetcher
+    from core.metrics import loop_lag_monitor
+    from core.scanner import scanner
+    from core.snapshots import snapshot_recorder
+    from core.write_behind import write_behind
+    from models.connection import database
+    from models.database import init_database
+
+    await init_database()
+    await http_pool.start()
+    write_behind.start()
+    snapshot_recorder.start()
+    loop_lag_monitor.start()
+
+    scans = []
+    try:
+        async with httpx.AsyncClient() as control:
+            for round_no in range(args.rounds + 1):
+                if round_no:
+                    await control.post(advance_url)
+                t0 = time.perf_counter()
+                opportunities = await scanner.run_single_scan()
+                seconds = time.perf_counter() - t0
+                scans.append({
+                    "seconds": seconds,
+                    "opportunities": len(opportunities),
+                    "dirty_markets": scanner.last_dirty_markets,
+                    "loop_lag_ms_max": scanner.last_loop_lag_ms,
+                    "phases_ms": scanner.last_phases
+                })
+
+        t0 = time.perf_counter()
+        await write_behind.stop()
+        final_flush = time.perf_counter() - t0
+        await snapshot_recorder.stop()
+    finally:
+        await loop_lag_monitor.stop()
+        await http_pool.close()
+        await database.close()
+
+    return {
+        "markets_scanned": scanner.markets_scanned,
+        "scans": scans,
+        "final_flush_ms": round(final_flush * 1000, 2),
+        "fetcher": {key: value for key, value in market_fetcher.get_stats().items() if key != "rate_limiters"}
+    }
+
+def run_in_child(args, gamma_url: str, clob_url: str, advance_url: str, db_path: str) -> dict:
+    return asyncio.run(scan_rounds(args, gamma_url, clob_url, advance_url, db_path))
+
+def run(n_markets: int, args) -> dict:
+    server = MockPolymarketServer(
+        n_markets, seed=args.seed, mispriced_share=args.mispriced, event_share=args.event_share,
+        churn=args.churn, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate, error_rate=args.error_rate
+    )
+    with server, tempfile.TemporaryDirectory() as tmp:
+        # Scanner state lives in module singletons, so every size runs in a fresh process.
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            outcome = pool.apply(run_in_child, (
+                args, server.gamma_url, server.clob_url, f"{server.base_url}/__bench/advance", os.path.join(tmp, "bench.db")
+            ))
+        requests = server.stats()
+
+    cold, warm = outcome["scans"][0], outcome["scans"][1:]
+    warm_seconds = [scan["seconds"] for scan in warm]
+    warm_median = statistics.median(warm_seconds) if warm_seconds else None
+    return {
+        "markets": n_markets,
+        "markets_scanned": outcome["markets_scanned"],
+        "cold_scan_s": round(cold["seconds"], 3),
+        "cold_markets_per_s": round(n_markets / cold["seconds"]) if cold["seconds"] else None,
+        "warm_scan_s_median": round(warm_median, 3) if warm_median is not None else None,
+        "warm_scan_s_max": round(max(warm_seconds), 3) if warm_seconds else None,
+        "warm_markets_per_s": round(n_markets / warm_median) if warm_median else None,
+        "opportunities": warm[-1]["opportunities"] if warm else cold["opportunities"],
+        "dirty_markets_median": statistics.median(scan["dirty_markets"] for scan in warm) if warm else None,
+        "loop_lag_ms_max": max(scan["loop_lag_ms_max"] for scan in outcome["scans"]),
+        "final_flush_ms": outcome["final_flush_ms"],
+        "cold_phases_ms": cold["phases_ms"],
+        "warm_phases_ms": warm[-1]["phases_ms"] if warm else None,
+        "requests": requests,
+        "fetcher": outcome["fetcher"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end run_single_scan against a local mock Polymarket API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=3, help="warm scans after the cold one")
+    parser.add_argument("--mispriced", type=float, default=0.01)
+    parser.add_argument("--event-share", type=float, default=0.1)
+    parser.add_argument("--churn", type=float, default=0.05, help="share of markets re-priced before each warm scan")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=10_000, help="client-side requests per second per API")
+    parser.add_argument("--detection", choices=["scalar", "batch"], default=settings.DETECTION_MODE)
+    parser.add_argument("--no-depth", dest="depth", action="store_false")
+    parser.add_argument("--no-events", dest="events", action="store_false")
+    parser.add_argument("--snapshots", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        result = run(size, args)
+        results.append(result)
+        print(
+            f"{result['markets']:>9,} markets  cold {result['cold_scan_s']:>8.3f} s  "
+            f"warm {result['warm_scan_s_median']} s (max {result['warm_scan_s_max']})  "
+            f"{result['warm_markets_per_s']} markets/s  opps={result['opportunities']}  "
+            f"loop lag max {result['loop_lag_ms_max']} ms"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "scan", "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.arbitrage_detector import detect_arbitrage
+from synthetic import SyntheticPolymarket
+
+async def checkpoint_and_restore(n_markets: int, args, tmp: str) -> dict:
+    from config import settings
+    from core import warm_start as checkpoint
+    from core.market_catalog import market_catalog
+    from core.scanner import scanner
+    from models.connection import database
+    from models.database import init_database
+
+    settings.WARM_START_PATH = checkpoint.warm_start.path = os.path.join(tmp, "warm_start.bin")
+    database.path = os.path.join(tmp, "bench.db")
+    await init_database()
+
+    data = SyntheticPolymarket(n_markets, args.seed, mispriced_share=args.mispriced, event_share=0.0)
+    markets = {market.key: market for market in data.records()}
+    last_prices = {key: (market.liquidity, *(token.price for token in market.tokens)) for key, market in markets.items()}
+    opportunities = []
+    for market in markets.values():
+        opportunity = detect_arbitrage(market)
+        if opportunity is not None:
+            opportunities.append(opportunity.to_dict())
+    market_catalog.restore(markets, 1, datetime.utcnow())
+    scanner.restore(last_prices, opportunities, n_markets)
+
+    t0 = time.perf_counter()
+    state = checkpoint.warm_start._capture()
+    capture_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    await checkpoint.warm_start._checkpoint(state)
+    first_write_seconds = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    await checkpoint.warm_start._checkpoint(checkpoint.warm_start._capture())
+    repeat_write_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    restored = await checkpoint.warm_start.restore()
+    restore_seconds = time.perf_counter() - t0
+    await database.close()
+
+    return {
+        "markets": n_markets,
+        "opportunities": len(opportunities),
+        "restored": restored,
+        "capture_ms": round(capture_seconds * 1000, 2),
+        "first_checkpoint_ms": round(first_write_seconds * 1000, 2),
+        "repeat_checkpoint_ms": round(repeat_write_seconds * 1000, 2),
+        "restore_ms": round(restore_seconds * 1000, 2),
+        "file_mb": round(checkpoint.warm_start.last_checkpoint_bytes / 1e6, 2)
+    }
+
+def run_in_child(n_markets: int, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        return asyncio.run(checkpoint_and_restore(n_markets, args, tmp))
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-start checkpoint capture, write and restore time by catalog size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--mispriced", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        # Catalog and scanner state live in module singletons, so every size runs in a fresh process.
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            result = pool.apply(run_in_child, (size, args))
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "warm_start", "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from api.websocket_manager import ConnectionManager
+
+class SimulatedClient:
+    def __init__(self, latency: float, jitter: float, rng: random.Random):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = rng
+        self.received = 0
+        self.resyncs = 0
+        self.closed = False
+        self.query_params = {}
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.closed:
+            raise RuntimeError("closed")
+        await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        self.received += 1
+        if '"resync"' in text:
+            self.resyncs += 1
+
+    async def send_bytes(self, data: bytes):
+        await self.send_text("")
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+def build_clients(n_clients: int, slow_fraction: float, args, rng: random.Random):
+    n_slow = int(n_clients * slow_fraction)
+    clients = []
+    for i in range(n_clients):
+        slow = i < n_slow
+        latency = args.slow_latency if slow else args.fast_latency
+        clients.append((slow, SimulatedClient(latency, latency * 0.5, rng)))
+    return clients
+
+def sample_opportunity(i: int) -> dict:
+    return {
+        "id": f"{i:016x}",
+        "arbitrage_type": "BINARY_MISPRICING",
+        "net_profit_percent": 1.25,
+        "trade_legs": [{"price": 0.48}, {"price": 0.49}]
+    }
+
+def sample_message(i: int) -> dict:
+    return {"type": "new_opportunity", "data": sample_opportunity(i)}
+
+def sample_delta(i: int) -> dict:
+    return {
+        "type": "delta",
+        "added": [sample_opportunity(i)],
+        "updated": [],
+        "removed": [],
+        "summary": {"active_opportunities": i}
+    }
+
+async def legacy_broadcast(websockets, message: dict):
+    text = json.dumps(message)
+    for websocket in websockets:
+        await websocket.send_text(text)
+
+async def run_legacy(n_clients: int, args) -> dict:
+    rng = random.Random(args.seed)
+    clients = build_clients(n_clients, args.slow_fraction, args, rng)
+    websockets = [client for _, client in clients]
+    timings = []
+    for i in range(args.legacy_messages):
+        t0 = time.perf_counter()
+        await legacy_broadcast(websockets, sample_message(i))
+        timings.append(time.perf_counter() - t0)
+    return {
+        "mode": "legacy",
+        "clients": n_clients,
+        "messages": args.legacy_messages,
+        "publish_ms_p50": round(statistics.median(timings) * 1000, 3),
+        "publish_ms_max": round(max(timings) * 1000, 3)
+    }
+
+async def run_queued(n_clients: int, policy: str, args) -> dict:
+    settings.WS_SLOW_CLIENT_POLICY = policy
+    settings.WS_CLIENT_QUEUE_SIZE = args.queue_size
+    rng = random.Random(args.seed)
+    manager = ConnectionManager()
+    clients = build_clients(n_clients, args.slow_fraction, args, rng)
+    for _, client in clients:
+        await manager.connect(client)
+    await asyncio.sleep(args.scan_interval)
+    expected = args.messages + 1
+
+    timings = []
+    max_depth = 0
+    start = time.perf_counter()
+    for i in range(args.messages):
+        t0 = time.perf_counter()
+        await manager.publish_delta(sample_delta(i))
+        timings.append(time.perf_counter() - t0)
+        if i % args.burst == args.burst - 1:
+            max_depth = max(max_depth, manager.get_stats()["queue_depth_max"])
+            await asyncio.sleep(args.scan_interval)
+    publish_seconds = time.perf_counter() - start
+
+    deadline = time.perf_counter() + args.drain_timeout
+    fast = [client for slow, client in clients if not slow]
+    while time.perf_counter() < deadline and any(client.received < expected for client in fast):
+        await asyncio.sleep(0.01)
+    drain_seconds = time.perf_counter() - start
+
+    stats = manager.get_stats()
+    for websocket in list(manager.clients):
+        manager.disconnect(websocket)
+    await asyncio.sleep(0)
+
+    slow = [client for is_slow, client in clients if is_slow]
+    return {
+        "mode": "queued",
+        "policy": policy,
+        "clients": n_clients,
+        "slow_clients": len(slow),
+        "messages": args.messages,
+        "publish_us_p50": round(statistics.median(timings) * 1e6, 1),
+        "publish_us_p99": round(sorted(timings)[int(len(timings) * 0.99) - 1] * 1e6, 1),
+        "publish_seconds": round(publish_seconds, 3),
+        "fast_delivery_seconds": round(drain_seconds, 3),
+        "fast_clients_complete": sum(1 for client in fast if client.received >= expected),
+        "slow_received_mean": round(statistics.mean(client.received for client in slow), 1) if slow else None,
+        "queue_depth_max": max_depth,
+        "dropped": stats["messages_dropped"],
+        "resyncs": stats["resyncs"],
+        "evictions": stats["evictions"]
+    }
+
+def overflow_problem(result: dict):
+    # Slow clients must overflow their queues, or the resync and evict paths
+    # were never measured.
+    if not result["slow_clients"]:
+        return None
+    counter = "resyncs" if result["policy"] == "resync" else "evictions"
+    if result[counter] == 0:
+        return f"{result['policy']} with {result['clients']} clients: slow clients never overflowed ({counter} = 0)"
+    return None
+
+async def main_async(args):
+    results = []
+    problems = []
+    for n_clients in args.clients:
+        if args.legacy_messages:
+            result = await run_legacy(n_clients, args)
+            results.append(result)
+            print(json.dumps(result))
+        for policy in args.policies:
+            result = await run_queued(n_clients, policy, args)
+            results.append(result)
+            print(json.dumps(result))
+            problem = overflow_problem(result)
+            if problem:
+                problems.append(problem)
+    return results, problems
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket fan-out load test with simulated clients")
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--burst", type=int, default=50, help="messages per simulated scan")
+    parser.add_argument("--scan-interval", type=float, default=0.25)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--fast-latency", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=0.25)
+    parser.add_argument("--queue-size", type=int, default=64, help="per-client queue; keep above --burst and below --messages")
+    parser.add_argument("--policies", nargs="+", default=["resync", "disconnect"], choices=["resync", "disconnect"])
+    parser.add_argument("--legacy-messages", type=int, default=3, help="messages for the sequential baseline, 0 to skip")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results, problems = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if problems:
+        sys.exit("\n".join(problems))
+
+if __name__ == "__main__":
+    main()
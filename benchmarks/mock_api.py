@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+from collections import Counter
+from typing import Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import SyntheticPolymarket
+
+class Faults:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, throttle_rate: float = 0.0,
+                 error_rate: float = 0.0, retry_after: float = 1.0, seed: int = 7):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+def build_app(data: SyntheticPolymarket, faults: Faults) -> Starlette:
+    stats: Counter = Counter()
+
+    async def inject(endpoint: str) -> Optional[Response]:
+        stats[endpoint] += 1
+        delay = faults.latency + faults.rng.uniform(0, faults.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        roll = faults.rng.random()
+        if roll < faults.throttle_rate:
+            stats["status_429"] += 1
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": str(faults.retry_after)})
+        if roll < faults.throttle_rate + faults.error_rate:
+            stats["status_500"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+        return None
+
+    def window(request: Request):
+        return int(request.query_params.get("offset", 0)), int(request.query_params.get("limit", 100))
+
+    async def markets(request: Request):
+        return await inject("markets") or JSONResponse(data.markets_page(*window(request)))
+
+    async def events(request: Request):
+        return await inject("events") or JSONResponse(data.events_page(*window(request)))
+
+    async def prices(request: Request):
+        token_ids = [t for t in request.query_params.get("token_ids", "").split(",") if t]
+        return await inject("prices") or JSONResponse(data.price_map(token_ids))
+
+    async def book(request: Request):
+        return await inject("book") or JSONResponse(data.book(request.query_params.get("token_id", "")))
+
+    async def webhook(request: Request):
+        # Stand-in for Discord and generic webhooks: counts messages and delivered items.
+        name = request.path_params["name"]
+        payload = await request.json()
+        response = await inject(f"webhook_{name}")
+        if response is not None:
+            return response
+        items = len(payload.get("embeds") or payload.get("opportunities") or ())
+        stats[f"webhook_{name}_messages"] += 1
+        stats[f"webhook_{name}_items"] += items
+        stats[f"webhook_{name}_max_items"] = max(stats[f"webhook_{name}_max_items"], items)
+        return Response(status_code=204)
+
+    async def advance(request: Request):
+        return JSONResponse({"epoch": data.advance()})
+
+    async def get_stats(request: Request):
+        return JSONResponse({"epoch": data.epoch, **stats})
+
+    return Starlette(routes=[
+        Route("/gamma/markets", markets),
+        Route("/gamma/events", events),
+        Route("/clob/prices", prices),
+        Route("/clob/book", book),
+        Route("/webhook/{name}", webhook, methods=["POST"]),
+        Route("/__bench/advance", advance, methods=["POST"]),
+        Route("/__bench/stats", get_stats)
+    ])
+
+def serve(port: int, markets: int, seed: int, mispriced_share: float, event_share: float, churn: float,
+          latency_ms: float, jitter_ms: float, throttle_rate: float, error_rate: float):
+    data = SyntheticPolymarket(markets, seed, mispriced_share, event_share, churn=churn)
+    faults = Faults(latency_ms, jitter_ms, throttle_rate, error_rate, seed=seed)
+    uvicorn.run(build_app(data, faults), host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class MockPolymarketServer:
+    def __init__(self, markets: int, seed: int = 7, mispriced_share: float = 0.01, event_share: float = 0.1,
+                 churn: float = 0.0, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 throttle_rate: float = 0.0, error_rate: float = 0.0, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.options = dict(
+            port=self.port, markets=markets, seed=seed, mispriced_share=mispriced_share, event_share=event_share,
+            churn=churn, latency_ms=latency_ms, jitter_ms=jitter_ms, throttle_rate=throttle_rate, error_rate=error_rate
+        )
+        self._process: Optional[multiprocessing.Process] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def gamma_url(self) -> str:
+        return f"{self.base_url}/gamma"
+
+    @property
+    def clob_url(self) -> str:
+        return f"{self.base_url}/clob"
+
+    def start(self, timeout: float = 30.0):
+        self._process = multiprocessing.get_context("spawn").Process(target=serve, kwargs=self.options, daemon=True)
+        self._process.start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                httpx.get(f"{self.base_url}/__bench/stats", timeout=1.0).raise_for_status()
+                return self
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"Mock API did not start on port {self.port}")
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(5)
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        return httpx.get(f"{self.base_url}/__bench/stats").json()
+
+    def advance(self) -> int:
+        return httpx.post(f"{self.base_url}/__bench/advance").json()["epoch"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Gamma and CLOB APIs backed by synthetic markets")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--markets", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mispriced", type=float, default=0.01, help="share of markets and events priced below the threshold")
+    parser.add_argument("--event-share", type=float, default=0.1, help="share of markets that belong to neg-risk events")
+    parser.add_argument("--churn", type=float, default=0.0, help="share of markets re-priced by POST /__bench/advance")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    args = parser.parse_args()
+
+    print(f"Serving {args.markets:,} markets: GAMMA_API_URL=http://127.0.0.1:{args.port}/gamma CLOB_API_URL=http://127.0.0.1:{args.port}/clob")
+    serve(args.port, args.markets, args.seed, args.mispriced, args.event_share, args.churn,
+          args.latency_ms, args.jitter_ms, args.throttle_rate, args.error_rate)
+
+if __name__ == "__main__":
+    main()
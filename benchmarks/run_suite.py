@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+PROFILES = {
+    "quick": {
+        "scan": ["--sizes", "1000", "10000", "--rounds", "2"],
+        "detection": ["--sizes", "10000", "100000"],
+        "db": ["--rows", "10000", "--queries", "100"],
+        "ws_fanout": ["--clients", "100", "--messages", "200", "--legacy-messages", "0"],
+        "execution_mode": ["--sizes", "10000", "--rounds", "3"],
+        "market_model": ["--sizes", "10000"],
+        "notifications": ["--sizes", "200"],
+        "warm_start": ["--sizes", "10000"]
+    },
+    "full": {
+        "scan": ["--sizes", "1000", "10000", "100000", "1000000"],
+        "detection": ["--sizes", "10000", "100000", "1000000"],
+        "db": ["--rows", "10000", "100000", "1000000"],
+        "ws_fanout": [],
+        "execution_mode": [],
+        "market_model": [],
+        "notifications": [],
+        "warm_start": ["--sizes", "10000", "100000", "1000000"]
+    }
+}
+
+# Fields that identify a result row, so runs are compared row by row.
+IDENTITY_KEYS = ("markets", "rows", "clients", "mode", "policy", "size")
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run_benchmark(name: str, extra: list, tmp: str) -> dict:
+    output = os.path.join(tmp, f"{name}.json")
+    command = [sys.executable, os.path.join(BENCH_DIR, f"bench_{name}.py"), *extra, "--json", output]
+    print(f"== {name}: {' '.join(command[1:])}", flush=True)
+    t0 = time.perf_counter()
+    completed = subprocess.run(command, cwd=ROOT)
+    seconds = round(time.perf_counter() - t0, 1)
+    if completed.returncode != 0 or not os.path.exists(output):
+        return {"error": f"exit code {completed.returncode}", "seconds": seconds}
+    with open(output) as f:
+        data = json.load(f)
+    results = data["results"] if isinstance(data, dict) else data
+    return {"args": extra, "seconds": seconds, "results": results}
+
+def row_label(row: dict, index: int) -> str:
+    parts = [f"{key}={row[key]}" for key in IDENTITY_KEYS if key in row]
+    return ",".join(parts) or str(index)
+
+def flatten(value, prefix: str, out: dict):
+    if isinstance(value, bool):
+        return
+    if isinstance(value, (int, float)):
+        out[prefix] = value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            flatten(item, f"{prefix}.{key}", out)
+
+def numeric_fields(suite: dict) -> dict:
+    fields = {}
+    for name, outcome in suite["benchmarks"].items():
+        for index, row in enumerate(outcome.get("results", [])):
+            flatten(row, f"{name}[{row_label(row, index)}]", fields)
+    return fields
+
+def compare(current: dict, baseline: dict, threshold: float):
+    now, before = numeric_fields(current), numeric_fields(baseline)
+    changed = []
+    for key in sorted(now.keys() & before.keys()):
+        old, new = before[key], now[key]
+        if old == new:
+            continue
+        change = (new - old) / abs(old) * 100 if old else float("inf")
+        if abs(change) >= threshold:
+            changed.append((key, old, new, change))
+
+    print(f"\nCompared with {baseline['meta']['revision']} ({baseline['meta']['created_at']}), changes >= {threshold}%:")
+    for key, old, new, change in changed:
+        print(f"  {key:<80} {old:>14,.3f} -> {new:>14,.3f}  {change:+.1f}%")
+    if not changed:
+        print("  none")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and save one combined JSON result")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", nargs="+", choices=sorted(PROFILES["quick"]), help="run a subset of benchmarks")
+    parser.add_argument("--json", help="write the combined results to this file")
+    parser.add_argument("--compare", help="baseline file from an earlier run to diff against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="smallest relative change to report, in percent")
+    args = parser.parse_args()
+
+    suite = {
+        "meta": {
+            "revision": git_revision(),
+            "profile": args.profile,
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "benchmarks": {}
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, extra in PROFILES[args.profile].items():
+            if args.only and name not in args.only:
+                continue
+            suite["benchmarks"][name] = run_benchmark(name, extra, tmp)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(suite, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(suite, json.load(f), args.threshold)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+import random
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.market import MarketRecord
+
+Shape = Tuple[List[str], List[float], float, float]
+
+# Markets are generated on demand from (seed, index), so a mock API can serve
+# a million markets without holding them. The first `event_share` of markets
+# are binary members of neg-risk events; `advance()` re-prices a `churn` share.
+class SyntheticPolymarket:
+    def __init__(self, markets: int, seed: int = 7, mispriced_share: float = 0.01,
+                 event_share: float = 0.1, event_size: int = 5, churn: float = 0.0):
+        self.markets = markets
+        self.seed = seed
+        self.mispriced_share = mispriced_share
+        self.event_size = max(2, event_size)
+        self.events = int(markets * event_share) // self.event_size
+        self.event_markets = self.events * self.event_size
+        self.churn = churn
+        self.epoch = 0
+
+    def _rng(self, kind: int, i: int, epoch: int = 0) -> random.Random:
+        return random.Random(((self.seed * 7 + kind) * 4_294_967_311 + i) * 1_000_003 + epoch)
+
+    def advance(self) -> int:
+        self.epoch += 1
+        return self.epoch
+
+    def _event_yes_prices(self, k: int) -> List[float]:
+        rng = self._rng(1, k)
+        target = rng.uniform(0.90, 0.975) if rng.random() < self.mispriced_share else rng.uniform(1.0, 1.04)
+        weights = [rng.random() + 0.05 for _ in range(self.event_size)]
+        total = sum(weights)
+        return [weight / total * target for weight in weights]
+
+    def _shape(self, i: int) -> Shape:
+        rng = self._rng(0, i)
+        liquidity = round(rng.uniform(50, 50_000), 2)
+        volume = round(rng.expovariate(1 / 5_000), 2)
+
+        if i < self.event_markets:
+            yes = self._event_yes_prices(i // self.event_size)[i % self.event_size]
+            no = rng.uniform(1.0, 1.04) - yes
+            return ["Yes", "No"], [round(yes, 4), round(max(0.001, no), 4)], liquidity, volume
+
+        outcomes = ["Yes", "No"] if rng.random() < 0.8 else [f"O{j}" for j in range(rng.randint(3, 7))]
+        target = rng.uniform(0.90, 0.975) if rng.random() < self.mispriced_share else rng.uniform(1.0, 1.04)
+        weights = [rng.random() + 0.05 for _ in outcomes]
+        total = sum(weights)
+        return outcomes, [round(weight / total * target, 4) for weight in weights], liquidity, volume
+
+    def prices(self, i: int) -> List[float]:
+        prices = self._shape(i)[1]
+        if not self.churn or not self.epoch:
+            return prices
+        rng = self._rng(2, i, self.epoch)
+        if rng.random() >= self.churn:
+            return prices
+        return [round(max(0.001, price * rng.uniform(0.97, 1.03)), 4) for price in prices]
+
+    def market(self, i: int) -> dict:
+        outcomes, _, liquidity, volume = self._shape(i)
+        data = {
+            "id": str(i),
+            "conditionId": f"0x{i:064x}",
+            "question": f"Synthetic market {i}?",
+            "slug": f"synthetic-market-{i}",
+            "liquidity": liquidity,
+            "volume24hr": volume,
+            "closed": False,
+            "tokens": [
+                {"token_id": f"{i}-{j}", "outcome": outcome, "price": price}
+                for j, (outcome, price) in enumerate(zip(outcomes, self.prices(i)))
+            ]
+        }
+        if i < self.event_markets:
+            data["eventTitle"] = f"Synthetic event {i // self.event_size}"
+        return data
+
+    def record(self, i: int) -> MarketRecord:
+        return MarketRecord.from_api(self.market(i))
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[MarketRecord]:
+        for i in range(start, self.markets if stop is None else min(stop, self.markets)):
+            yield self.record(i)
+
+    def markets_page(self, offset: int, limit: int) -> List[dict]:
+        return [self.market(i) for i in range(max(0, offset), min(self.markets, offset + limit))]
+
+    def event(self, k: int) -> dict:
+        first = k * self.event_size
+        return {
+            "id": f"synthetic-event-{k}",
+            "title": f"Synthetic event {k}",
+            "slug": f"synthetic-event-{k}",
+            "negRisk": True,
+            "markets": [{"conditionId": f"0x{i:064x}"} for i in range(first, first + self.event_size)]
+        }
+
+    def events_page(self, offset: int, limit: int) -> List[dict]:
+        return [self.event(k) for k in range(max(0, offset), min(self.events, offset + limit))]
+
+    def _token(self, token_id: str) -> Optional[Tuple[int, int, float]]:
+        market, _, outcome = token_id.partition("-")
+        try:
+            i, j = int(market), int(outcome)
+        except ValueError:
+            return None
+        if not 0 <= i < self.markets:
+            return None
+        prices = self.prices(i)
+        return (i, j, prices[j]) if 0 <= j < len(prices) else None
+
+    def price_map(self, token_ids: List[str]) -> Dict[str, dict]:
+        found = {}
+        for token_id in token_ids:
+            token = self._token(token_id)
+            if token is not None:
+                found[token_id] = {"price": token[2]}
+        return found
+
+    def book(self, token_id: str, levels: int = 5) -> dict:
+        token = self._token(token_id)
+        if token is None:
+            return {"asks": [], "bids": []}
+        i, j, price = token
+        rng = self._rng(3, i * 8 + j, self.epoch)
+        asks = [
+            {"price": f"{min(0.999, price + 0.005 * level):.4f}", "size": f"{rng.uniform(20, 2_000) * (level + 1):.2f}"}
+            for level in range(levels)
+        ]
+        bids = [
+            {"price": f"{max(0.001, price - 0.01 * (level + 1)):.4f}", "size": f"{rng.uniform(20, 2_000):.2f}"}
+            for level in range(levels)
+        ]
+        return {"asks": asks, "bids": bids}
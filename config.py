@@ -7,12 +7,102 @@ load_dotenv()
 class Settings(BaseSettings):
     GAMMA_API_URL: str = "https://gamma-api.polymarket.com"
     CLOB_API_URL: str = "https://clob.polymarket.com"
-    SCAN_INTERVAL_SECONDS: int = 10
+    SCAN_INTERVAL_SECONDS: float = 2
+    SCAN_SCHEDULER: str = "tiered"
+    SCHEDULER_TICK_SECONDS: float = 0.5
+    SCHEDULER_HOT_INTERVAL_SECONDS: float = 1.0
+    SCHEDULER_WARM_INTERVAL_SECONDS: float = 10.0
+    SCHEDULER_COLD_INTERVAL_SECONDS: float = 60.0
+    SCHEDULER_HOT_GAP: float = 0.02
+    SCHEDULER_WARM_GAP: float = 0.08
+    SCHEDULER_ACTIVE_VOLUME_USD: float = 50000
+    SCHEDULER_MAX_MARKETS_PER_TICK: int = 5000
+    SCHEDULER_HISTORY_WINDOW_SECONDS: float = 60
+    SCAN_HISTORY_RETENTION_DAYS: float = 7
+    CATALOG_REFRESH_SECONDS: float = 60
+    CATALOG_FULL_REFRESH_SECONDS: float = 900
+    PIPELINE_BATCH_SIZE: int = 500
+    PIPELINE_QUEUE_SIZE: int = 4
+    PIPELINE_PRICE_WORKERS: int = 2
+    FETCH_PAGE_SIZE: int = 100
+    FETCH_CONCURRENCY: int = 8
+    HTTP_TIMEOUT_SECONDS: float = 30.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP2_ENABLED: bool = False
+    GAMMA_RATE_LIMIT_PER_SECOND: float = 10.0
+    GAMMA_RATE_LIMIT_BURST: int = 20
+    CLOB_RATE_LIMIT_PER_SECOND: float = 20.0
+    CLOB_RATE_LIMIT_BURST: int = 40
+    RATE_LIMIT_MIN_PER_SECOND: float = 0.5
+    RATE_LIMIT_INCREASE_STEP: float = 0.5
+    RATE_LIMIT_DECREASE_FACTOR: float = 0.5
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY_SECONDS: float = 0.5
+    RETRY_MAX_DELAY_SECONDS: float = 30.0
     MIN_ARBITRAGE_PERCENT: float = 0.5
+    OPPORTUNITY_EXIT_PERCENT: float = 0.3
+    OPPORTUNITY_EXPIRY_MISSES: int = 2
+    OPPORTUNITY_GRACE_SECONDS: float = 3.0
     MIN_LIQUIDITY_USD: float = 100
+    DETECTION_MODE: str = "batch"
+    EXECUTION_MODE: str = "inline"
+    EXECUTION_WORKERS: int = 0
+    INCREMENTAL_DETECTION: bool = True
+    EVENT_ARBITRAGE_ENABLED: bool = True
+    EVENT_ARBITRAGE_REQUIRE_NEG_RISK: bool = True
     DATABASE_PATH: str = "arbitrage.db"
+    DB_READ_POOL_SIZE: int = 4
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    DB_SYNCHRONOUS: str = "NORMAL"
+    DB_CACHE_SIZE_KB: int = 65536
+    DB_MMAP_SIZE_BYTES: int = 268435456
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    DB_FLUSH_INTERVAL_SECONDS: float = 1.0
+    DB_FLUSH_MAX_ROWS: int = 5000
+    SNAPSHOTS_ENABLED: bool = True
+    SNAPSHOT_FLUSH_INTERVAL_SECONDS: float = 5.0
+    SNAPSHOT_MAX_BUFFERED_ROWS: int = 500000
+    SNAPSHOT_ROLLUP_INTERVAL_SECONDS: float = 300
+    SNAPSHOT_RAW_RETENTION_HOURS: float = 24
+    SNAPSHOT_MINUTE_RETENTION_DAYS: float = 7
+    SNAPSHOT_HOUR_RETENTION_DAYS: float = 365
+    WS_CLIENT_QUEUE_SIZE: int = 256
+    WS_SLOW_CLIENT_POLICY: str = "resync"
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
+    WS_SNAPSHOT_LIMIT: int = 500
+    WS_PER_MESSAGE_DEFLATE: bool = True
     DISCORD_WEBHOOK_URL: str = ""
+    NOTIFY_WEBHOOK_URL: str = ""
+    NOTIFY_FILE_PATH: str = ""
+    NOTIFY_QUEUE_SIZE: int = 1000
+    NOTIFY_DEDUPE_SECONDS: float = 600
+    NOTIFY_COALESCE_SECONDS: float = 1.0
+    NOTIFY_BATCH_MAX: int = 100
+    NOTIFY_RATE_LIMIT_PER_SECOND: float = 0.5
+    NOTIFY_RATE_LIMIT_BURST: int = 5
+    NOTIFY_MAX_ATTEMPTS: int = 5
     POLYMARKET_FEE_PERCENT: float = 0.02
+    DEPTH_ANALYSIS_ENABLED: bool = True
+    BOOK_CACHE_TTL_SECONDS: float = 2.0
+    CLUSTER_ENABLED: bool = False
+    CLUSTER_NODE_ID: str = ""
+    CLUSTER_SOCKET_PATH: str = "/tmp/polymarket-arbitrage.sock"
+    CLUSTER_HEARTBEAT_SECONDS: float = 2.0
+    CLUSTER_MEMBER_TTL_SECONDS: float = 10.0
+    CLUSTER_RING_REPLICAS: int = 64
+    PORT: int = 5000
+    METRICS_ENABLED: bool = True
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = 0.25
+    ADMIN_API_TOKEN: str = ""
+    PROFILE_MAX_SCANS: int = 100
+    PROFILE_TRACEMALLOC_FRAMES: int = 1
+    WARM_START_ENABLED: bool = True
+    WARM_START_PATH: str = "warm_start.bin"
+    WARM_START_CHECKPOINT_SECONDS: float = 60
+    WARM_START_MAX_AGE_SECONDS: float = 3600
     DEBUG: bool = False
 
     class Config:
@@ -1,18 +1,18 @@
 import hashlib
 from typing import Optional, List
 from datetime import datetime
-from models.market import Market, Token
+from models.market import MarketLike, Token
 from models.opportunity import Opportunity, TradeLeg, ArbitrageType
 from config import settings
 
 def calculate_price_sum(tokens: List[Token]) -> float:
     return sum(token.price for token in tokens)
 
-def generate_opportunity_id(market: Market) -> str:
+def generate_opportunity_id(market: MarketLike) -> str:
     data = f"{market.condition_id or market.id}"
     return hashlib.md5(data.encode()).hexdigest()[:16]
 
-def generate_trade_legs(market: Market) -> List[TradeLeg]:
+def generate_trade_legs(market: MarketLike) -> List[TradeLeg]:
     legs = []
     for token in market.tokens:
         legs.append(TradeLeg(
@@ -24,7 +24,17 @@ def generate_trade_legs(market: Market) -> List[TradeLeg]:
         ))
     return legs
 
-def detect_arbitrage(market: Market) -> Optional[Opportunity]:
+def detection_threshold() -> float:
+    # Live opportunities are re-detected down to the exit threshold; the
+    # lifecycle decides whether a new one clears the entry threshold.
+    return min(settings.MIN_ARBITRAGE_PERCENT, settings.OPPORTUNITY_EXIT_PERCENT)
+
+def detect_arbitrage(market: MarketLike) -> Optional[Opportunity]:
+    return build_opportunity(market, settings.POLYMARKET_FEE_PERCENT, detection_threshold())
+
+def build_opportunity(market: MarketLike, fee_percent: float, min_profit_percent: float) -> Optional[Opportunity]:
+    # Takes its thresholds as arguments so pool workers, which do not share
+    # the parent's settings, detect exactly like the event loop does.
     if not market.tokens or len(market.tokens) < 2:
         return None
     
@@ -42,11 +52,11 @@ def detect_arbitrage(market: Market) -> Optional[Opportunity]:
     gross_profit = guaranteed_payout - total_cost
     gross_profit_percent = (gross_profit / total_cost) * 100 if total_cost > 0 else 0
     
-    estimated_fees = guaranteed_payout * settings.POLYMARKET_FEE_PERCENT
+    estimated_fees = guaranteed_payout * fee_percent
     net_profit = gross_profit - estimated_fees
     net_profit_percent = (net_profit / total_cost) * 100 if total_cost > 0 else 0
     
-    if net_profit_percent < settings.MIN_ARBITRAGE_PERCENT:
+    if net_profit_percent < min_profit_percent:
         return None
     
     arb_type = ArbitrageType.BINARY_MISPRICING if len(valid_tokens) == 2 else ArbitrageType.DUTCH_BOOK_UNDER
@@ -0,0 +1,89 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+from core.arbitrage_detector import detect_arbitrage, detection_threshold
+from models.market import MarketLike
+from models.opportunity import Opportunity
+
+# Slack on the vectorized threshold so rows on the boundary are re-checked
+# by the scalar path instead of being dropped by float rounding differences.
+THRESHOLD_SLACK_PERCENT = 1e-6
+
+class PriceColumns:
+    __slots__ = ("prices", "offsets")
+    
+    def __init__(self, prices: np.ndarray, offsets: np.ndarray):
+        self.prices = prices
+        self.offsets = offsets
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    @classmethod
+    def from_markets(cls, markets: Sequence[MarketLike]) -> "PriceColumns":
+        counts = np.fromiter((len(m.tokens) for m in markets), dtype=np.int64, count=len(markets))
+        offsets = np.zeros(len(markets) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        prices = np.fromiter(
+            (t.price for m in markets for t in m.tokens),
+            dtype=np.float64,
+            count=int(offsets[-1])
+        )
+        return cls(prices, offsets)
+
+class BatchEvaluation:
+    __slots__ = ("price_sum", "gross_profit", "net_profit", "net_profit_percent", "valid_counts", "mask")
+    
+    def __init__(self, price_sum, gross_profit, net_profit, net_profit_percent, valid_counts, mask):
+        self.price_sum = price_sum
+        self.gross_profit = gross_profit
+        self.net_profit = net_profit
+        self.net_profit_percent = net_profit_percent
+        self.valid_counts = valid_counts
+        self.mask = mask
+
+def _segment_sum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    cumulative = np.zeros(len(values) + 1, dtype=values.dtype)
+    np.cumsum(values, out=cumulative[1:])
+    return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+
+def evaluate_batch(columns: PriceColumns, min_profit_percent: float = None) -> BatchEvaluation:
+    if min_profit_percent is None:
+        min_profit_percent = detection_threshold()
+    
+    prices = columns.prices
+    offsets = columns.offsets
+    valid = prices > 0
+    
+    token_counts = np.diff(offsets)
+    valid_counts = _segment_sum(valid.astype(np.int64), offsets)
+    price_sum = _segment_sum(np.where(valid, prices, 0.0), offsets)
+    
+    gross_profit = 1.0 - price_sum
+    net_profit = gross_profit - settings.POLYMARKET_FEE_PERCENT
+    with np.errstate(divide="ignore", invalid="ignore"):
+        net_profit_percent = np.where(price_sum > 0, net_profit / price_sum * 100, 0.0)
+    
+    mask = (
+        (token_counts >= 2)
+        & (valid_counts >= 2)
+        & (price_sum < 1.0)
+        & (net_profit_percent >= min_profit_percent - THRESHOLD_SLACK_PERCENT)
+    )
+    return BatchEvaluation(price_sum, gross_profit, net_profit, net_profit_percent, valid_counts, mask)
+
+def detect_arbitrage_batch(markets: Sequence[MarketLike], columns: Optional[PriceColumns] = None) -> List[Opportunity]:
+    if not markets:
+        return []
+    if columns is None:
+        columns = PriceColumns.from_markets(markets)
+    
+    evaluation = evaluate_batch(columns)
+    opportunities = []
+    for idx in np.flatnonzero(evaluation.mask):
+        opportunity = detect_arbitrage(markets[idx])
+        if opportunity:
+            opportunities.append(opportunity)
+    return opportunities
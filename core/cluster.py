@@ -0,0 +1,343 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from core.event_index import event_index
+from core.hash_ring import HashRing
+from core.opportunity_index import opportunity_index
+from core.write_behind import write_behind
+from models.database import heartbeat_cluster_member, leave_cluster
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("!I")
+
+Publisher = Callable[[dict], Awaitable[None]]
+
+def encode_frame(message: dict) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return FRAME_HEADER.pack(len(body)) + body
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    return json.loads(await reader.readexactly(length))
+
+class Coordinator:
+    def __init__(self, node_id: str, publish: Publisher, owner_of: Callable[[dict], Optional[str]]):
+        self.node_id = node_id
+        self._publish = publish
+        self._owner_of = owner_of
+        # Every worker's last reported opportunities; the merged store serves,
+        # per opportunity, the claim of the worker whose partition holds it.
+        self._claims: Dict[str, Dict[str, dict]] = {}
+        self._owners: Dict[str, str] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self.frames_merged: int = 0
+    
+    async def start(self, local: Dict[str, dict]):
+        self._claims[self.node_id] = dict(local)
+        for opp_id in local:
+            self._owners[opp_id] = self.node_id
+        path = settings.CLUSTER_SOCKET_PATH
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(self._handle, path=path)
+        logger.info(f"Coordinator listening on {path}")
+    
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for writer in list(self._connections):
+            writer.close()
+        self._connections.clear()
+    
+    def served_ids(self) -> List[str]:
+        return list(self._owners)
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                message = await read_frame(reader)
+                await self.merge(message["node"], message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.warning(f"Dropping worker connection: {e!r}")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+    
+    def _resolve(self, opp_ids: Set[str], reported_by: Optional[str] = None, fresh: Set[str] = frozenset()):
+        added, updated, removed = [], [], []
+        for opp_id in opp_ids:
+            claimants = [node for node, claims in self._claims.items() if opp_id in claims]
+            current = self._owners.get(opp_id)
+            chosen = None
+            if claimants:
+                preferred = self._owner_of(self._claims[claimants[0]][opp_id])
+                if preferred in claimants:
+                    chosen = preferred
+                elif current in claimants:
+                    chosen = current
+                else:
+                    chosen = claimants[0]
+            
+            if chosen is None:
+                if current is not None:
+                    del self._owners[opp_id]
+                    opportunity_index.remove(opp_id)
+                    write_behind.expire(opp_id)
+                    removed.append(opp_id)
+                continue
+            if chosen == current and not (chosen == reported_by and opp_id in fresh):
+                continue
+            
+            known = opportunity_index.get(opp_id) is not None
+            entry = opportunity_index.upsert(self._claims[chosen][opp_id])
+            write_behind.upsert(entry)
+            self._owners[opp_id] = chosen
+            (updated if known else added).append(entry)
+        
+        write_behind.flush_soon()
+        return added, updated, removed
+    
+    async def _publish_changes(self, changes, scan: Optional[dict] = None):
+        added, updated, removed = changes
+        if not (added or updated or removed or scan is not None):
+            return
+        frame = {
+            "type": "delta",
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+            "summary": opportunity_index.summary()
+        }
+        if scan is not None:
+            frame["scan"] = scan
+        await self._publish(frame)
+    
+    async def merge(self, node_id: str, frame: dict):
+        claims = self._claims.setdefault(node_id, {})
+        if frame.get("type") == "hello":
+            touched = set(claims)
+            claims.clear()
+            claims.update((opp["id"], opp) for opp in frame["opportunities"])
+            fresh = set(claims)
+            scan = None
+        else:
+            for opp_id in frame["removed"]:
+                claims.pop(opp_id, None)
+            for opp in frame["added"] + frame["updated"]:
+                claims[opp["id"]] = opp
+            fresh = {opp["id"] for opp in frame["added"] + frame["updated"]}
+            touched = set(frame["removed"])
+            scan = {**frame.get("scan", {}), "node": node_id}
+        
+        self.frames_merged += 1
+        await self._publish_changes(self._resolve(touched | fresh, node_id, fresh), scan)
+    
+    async def drop_node(self, node_id: str):
+        claims = self._claims.pop(node_id, {})
+        await self._publish_changes(self._resolve(set(claims)))
+    
+    async def rebalance(self):
+        opp_ids = set(self._owners)
+        for claims in self._claims.values():
+            opp_ids.update(claims)
+        await self._publish_changes(self._resolve(opp_ids))
+    
+    def get_stats(self) -> dict:
+        served: Dict[str, int] = {}
+        for owner in self._owners.values():
+            served[owner] = served.get(owner, 0) + 1
+        return {
+            "workers_connected": len(self._connections),
+            "frames_merged": self.frames_merged,
+            "opportunities_by_node": served
+        }
+
+class ClusterNode:
+    def __init__(self):
+        self.node_id: str = settings.CLUSTER_NODE_ID or f"{socket.gethostname()}-{os.getpid()}"
+        self.ring = HashRing()
+        self.ring_version: int = 0
+        self._rebalanced_version: Tuple[int, int] = (0, 0)
+        self.leader_id: Optional[str] = None
+        self.coordinator: Optional[Coordinator] = None
+        self._publish_local: Optional[Publisher] = None
+        self._local: Dict[str, dict] = {}
+        self._link: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self.rebalances: int = 0
+        self.leader_changes: int = 0
+        self.frames_sent: int = 0
+        self.send_failures: int = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return settings.CLUSTER_ENABLED
+    
+    @property
+    def is_leader(self) -> bool:
+        return self.coordinator is not None
+    
+    def set_publisher(self, publish: Publisher):
+        self._publish_local = publish
+    
+    def owns(self, key: str) -> bool:
+        if not self.enabled:
+            return True
+        # Markets of one event hash together so event arbitrage stays on one worker.
+        owner = self.owner_of(key)
+        return owner is None or owner == self.node_id
+    
+    @property
+    def ownership_version(self) -> Tuple[int, int]:
+        # Ownership moves with the membership and with the event map markets hash by.
+        return self.ring_version, event_index.version
+    
+    def owner_of(self, key: str) -> Optional[str]:
+        return self.ring.owner(event_index.event_by_market.get(key, key))
+    
+    def _opportunity_owner(self, opportunity: dict) -> Optional[str]:
+        return self.owner_of(opportunity["markets_involved"][0])
+    
+    async def start(self):
+        await self._heartbeat()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._close_link()
+        if self.coordinator is not None:
+            await self.coordinator.stop()
+            self.coordinator = None
+        try:
+            await leave_cluster(self.node_id)
+        except Exception as e:
+            logger.warning(f"Failed to leave cluster: {e}")
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.CLUSTER_HEARTBEAT_SECONDS)
+            try:
+                await self._heartbeat()
+            except Exception as e:
+                logger.error(f"Cluster heartbeat failed: {e}")
+    
+    async def _heartbeat(self):
+        members, leader = await heartbeat_cluster_member(
+            self.node_id, time.time(), settings.CLUSTER_MEMBER_TTL_SECONDS
+        )
+        if tuple(members) != self.ring.nodes:
+            departed = set(self.ring.nodes) - set(members)
+            self.ring = HashRing(members, settings.CLUSTER_RING_REPLICAS)
+            self.ring_version += 1
+            self.rebalances += 1
+            logger.info(f"Cluster membership changed: {len(members)} nodes {list(members)}")
+            if self.coordinator is not None:
+                for node_id in departed:
+                    await self.coordinator.drop_node(node_id)
+        
+        version = self.ownership_version
+        if self.coordinator is not None and version != self._rebalanced_version:
+            await self.coordinator.rebalance()
+        self._rebalanced_version = version
+        
+        if leader != self.leader_id:
+            await self._change_leader(leader)
+        elif self.coordinator is None and self._link is None:
+            await self._connect()
+    
+    async def _change_leader(self, leader: Optional[str]):
+        logger.info(f"Cluster leader is now {leader}")
+        self.leader_changes += 1
+        self.leader_id = leader
+        await self._close_link()
+        
+        if leader == self.node_id:
+            self.coordinator = Coordinator(self.node_id, self._publish_local, self._opportunity_owner)
+            await self.coordinator.start(self._local)
+            return
+        if self.coordinator is not None:
+            coordinator, self.coordinator = self.coordinator, None
+            await coordinator.stop()
+            for opp_id in coordinator.served_ids():
+                opportunity_index.remove(opp_id)
+            for entry in self._local.values():
+                opportunity_index.upsert(entry)
+        await self._connect()
+    
+    async def _connect(self) -> bool:
+        try:
+            _, writer = await asyncio.open_unix_connection(settings.CLUSTER_SOCKET_PATH)
+        except OSError:
+            return False
+        self._link = writer
+        return await self._send({"type": "hello", "opportunities": list(self._local.values())})
+    
+    async def _close_link(self):
+        link, self._link = self._link, None
+        if link is not None:
+            link.close()
+    
+    async def _send(self, message: dict) -> bool:
+        try:
+            self._link.write(encode_frame({**message, "node": self.node_id}))
+            await self._link.drain()
+        except (ConnectionError, OSError) as e:
+            logger.warning(f"Lost connection to coordinator: {e!r}")
+            self.send_failures += 1
+            await self._close_link()
+            return False
+        self.frames_sent += 1
+        return True
+    
+    async def publish(self, frame: dict):
+        for opp_id in frame["removed"]:
+            self._local.pop(opp_id, None)
+        for opp in frame["added"] + frame["updated"]:
+            self._local[opp["id"]] = opp
+        
+        if self.coordinator is not None:
+            await self.coordinator.merge(self.node_id, frame)
+            return
+        # Followers serve their own partition from the shared index.
+        for opp_id in frame["removed"]:
+            opportunity_index.remove(opp_id)
+        for opp in frame["added"] + frame["updated"]:
+            opportunity_index.upsert(opp)
+        # A fresh connection opens with a full hello, which already covers this frame.
+        if self._link is None:
+            await self._connect()
+            return
+        await self._send(frame)
+    
+    def get_stats(self) -> dict:
+        return {
+            "node_id": self.node_id,
+            "leader": self.leader_id,
+            "is_leader": self.is_leader,
+            "members": list(self.ring.nodes),
+            "ring_version": self.ring_version,
+            "event_version": event_index.version,
+            "rebalances": self.rebalances,
+            "leader_changes": self.leader_changes,
+            "frames_sent": self.frames_sent,
+            "send_failures": self.send_failures,
+            "local_opportunities": len(self._local),
+            "coordinator": self.coordinator.get_stats() if self.coordinator is not None else None
+        }
+
+cluster_node = ClusterNode()
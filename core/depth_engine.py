@@ -0,0 +1,172 @@
+import asyncio
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from core.market_fetcher import market_fetcher
+from models.opportunity import Opportunity
+
+logger = logging.getLogger(__name__)
+
+Ladder = List[Tuple[float, float]]
+
+def parse_ladder(levels) -> Ladder:
+    ladder = []
+    for level in levels or []:
+        try:
+            price = float(level.get("price"))
+            size = float(level.get("size"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if price > 0 and size > 0:
+            ladder.append((price, size))
+    ladder.sort()
+    return ladder
+
+def ladder_cost(ladder: Ladder, size: float) -> float:
+    cost = 0.0
+    remaining = size
+    for price, level_size in ladder:
+        take = min(remaining, level_size)
+        cost += take * price
+        remaining -= take
+        if remaining <= 0:
+            break
+    return cost
+
+class DepthResult:
+    __slots__ = ("size", "cost", "max_size", "leg_vwaps", "payout")
+    
+    def __init__(self, size: float = 0.0, cost: float = 0.0, max_size: float = 0.0, leg_vwaps: List[float] = None,
+                 payout: float = 0.0):
+        self.size = size
+        self.cost = cost
+        self.max_size = max_size
+        self.leg_vwaps = leg_vwaps or []
+        self.payout = payout
+    
+    @property
+    def vwap_cost(self) -> float:
+        return self.cost / self.size if self.size > 0 else 0.0
+    
+    @property
+    def profit(self) -> float:
+        return self.size * self.payout - self.cost
+
+def compute_depth(ladders: List[Ladder], fee: float, guaranteed_payout: float = 1.0) -> DepthResult:
+    # Fees are charged on the payout, so a NO-side event set paying out
+    # n - 1 per set is sized against (n - 1) * (1 - fee).
+    payout = guaranteed_payout * (1.0 - fee)
+    if not ladders or any(not ladder for ladder in ladders):
+        return DepthResult(payout=payout)
+    
+    levels = [0] * len(ladders)
+    marginal = sum(ladder[0][0] for ladder in ladders)
+    boundaries = [(ladder[0][1], i) for i, ladder in enumerate(ladders)]
+    heapq.heapify(boundaries)
+    
+    size = cost = 0.0
+    best_size = best_cost = 0.0
+    max_size = 0.0
+    
+    # Walk the merged ladders segment by segment: between two level boundaries
+    # the marginal cost of one more complete set is the constant `marginal`.
+    while True:
+        boundary, leg = boundaries[0]
+        step = boundary - size
+        
+        if step > 0:
+            if marginal < payout:
+                size, cost = boundary, cost + marginal * step
+                best_size, best_cost = size, cost
+                max_size = size
+            else:
+                if marginal > payout:
+                    break_even = (marginal * size - cost) / (marginal - payout)
+                    if break_even < boundary:
+                        max_size = max(max_size, break_even)
+                        break
+                size, cost = boundary, cost + marginal * step
+                max_size = size
+        
+        heapq.heappop(boundaries)
+        levels[leg] += 1
+        if levels[leg] >= len(ladders[leg]):
+            break
+        price, level_size = ladders[leg][levels[leg]]
+        marginal += price - ladders[leg][levels[leg] - 1][0]
+        heapq.heappush(boundaries, (boundary + level_size, leg))
+    
+    leg_vwaps = [
+        ladder_cost(ladder, best_size) / best_size if best_size > 0 else ladder[0][0]
+        for ladder in ladders
+    ]
+    return DepthResult(best_size, best_cost, max_size, leg_vwaps, payout)
+
+class DepthEngine:
+    def __init__(self):
+        self._books: Dict[str, Tuple[float, Ladder]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.analyzed: int = 0
+    
+    async def _fetch_asks(self, token_id: str) -> Ladder:
+        book = await market_fetcher.fetch_orderbook(token_id)
+        ladder = parse_ladder(book.get("asks"))
+        self._books[token_id] = (time.monotonic(), ladder)
+        return ladder
+    
+    async def get_asks(self, token_id: str) -> Ladder:
+        cached = self._books.get(token_id)
+        if cached and time.monotonic() - cached[0] < settings.BOOK_CACHE_TTL_SECONDS:
+            self.cache_hits += 1
+            return cached[1]
+        
+        task = self._inflight.get(token_id)
+        if task is None:
+            self.cache_misses += 1
+            task = asyncio.create_task(self._fetch_asks(token_id))
+            self._inflight[token_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(token_id, None))
+        return await asyncio.shield(task)
+    
+    async def analyze(self, opportunity: Opportunity) -> Optional[DepthResult]:
+        try:
+            ladders = await asyncio.gather(*[self.get_asks(leg.token_id) for leg in opportunity.trade_legs])
+        except Exception as e:
+            logger.warning(f"Depth check failed for {opportunity.id}: {e}")
+            return None
+        
+        result = compute_depth(list(ladders), settings.POLYMARKET_FEE_PERCENT, opportunity.guaranteed_payout)
+        self.analyzed += 1
+        
+        opportunity.max_executable_size = round(result.max_size, 2)
+        opportunity.vwap_cost = round(result.vwap_cost, 4)
+        opportunity.depth_adjusted_profit = round(result.profit, 4)
+        for leg, vwap in zip(opportunity.trade_legs, result.leg_vwaps):
+            leg.suggested_size = round(result.size, 2)
+            leg.vwap_price = round(vwap, 4)
+        return result
+    
+    async def apply(self, opportunities: List[Opportunity]):
+        await asyncio.gather(*[self.analyze(opp) for opp in opportunities])
+        self._evict_expired()
+    
+    def _evict_expired(self):
+        cutoff = time.monotonic() - settings.BOOK_CACHE_TTL_SECONDS
+        expired = [token_id for token_id, (fetched_at, _) in self._books.items() if fetched_at < cutoff]
+        for token_id in expired:
+            del self._books[token_id]
+    
+    def get_stats(self) -> dict:
+        return {
+            "cached_books": len(self._books),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "analyzed": self.analyzed
+        }
+
+depth_engine = DepthEngine()
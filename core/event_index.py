@@ -0,0 +1,229 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import settings
+from core.arbitrage_detector import detection_threshold
+from core.market_fetcher import market_fetcher
+from models.market import MarketRecord
+from models.opportunity import Opportunity, TradeLeg, ArbitrageType
+
+logger = logging.getLogger(__name__)
+
+class EventGroup:
+    __slots__ = ("id", "title", "slug", "neg_risk", "members")
+    
+    def __init__(self, event_id: str, title: str, slug: str, neg_risk: bool, members: List[str]):
+        self.id = event_id
+        self.title = title
+        self.slug = slug
+        self.neg_risk = neg_risk
+        self.members = members
+
+class MarketLegs:
+    __slots__ = ("question", "liquidity", "yes_token", "yes_price", "no_token", "no_price")
+    
+    def __init__(self, market: MarketRecord):
+        yes, no = split_yes_no(market)
+        self.question = market.question
+        self.liquidity = market.liquidity
+        self.yes_token = yes.token_id
+        self.yes_price = yes.price
+        self.no_token = no.token_id
+        self.no_price = no.price
+    
+    def key(self) -> Tuple[float, float, float]:
+        return (self.liquidity, self.yes_price, self.no_price)
+
+def split_yes_no(market: MarketRecord):
+    by_outcome = {t.outcome.strip().lower(): t for t in market.tokens}
+    if "yes" in by_outcome and "no" in by_outcome:
+        return by_outcome["yes"], by_outcome["no"]
+    return market.tokens[0], market.tokens[1]
+
+def generate_event_opportunity_id(event_id: str, side: str) -> str:
+    return hashlib.md5(f"event:{event_id}:{side}".encode()).hexdigest()[:16]
+
+class EventIndex:
+    def __init__(self):
+        self.events: Dict[str, EventGroup] = {}
+        self.event_by_market: Dict[str, str] = {}
+        self._legs: Dict[str, MarketLegs] = {}
+        self._dirty: Set[str] = set()
+        self._event_opportunities: Dict[str, Set[str]] = {}
+        self.is_loaded: bool = False
+        self.version: int = 0
+        self.evaluated_events: int = 0
+    
+    def rebuild(self, raw_events: Iterable[dict]):
+        groups = []
+        for raw in raw_events:
+            neg_risk = bool(raw.get("negRisk") or raw.get("enableNegRisk"))
+            if settings.EVENT_ARBITRAGE_REQUIRE_NEG_RISK and not neg_risk:
+                continue
+            
+            members = []
+            for market in raw.get("markets", []) or []:
+                condition_id = market.get("conditionId")
+                if condition_id and not market.get("closed"):
+                    members.append(str(condition_id))
+            if len(members) < 2:
+                continue
+            
+            groups.append(EventGroup(str(raw.get("id", "")), raw.get("title", ""), raw.get("slug", ""), neg_risk, members))
+        self.install(groups)
+    
+    def install(self, groups: Iterable[EventGroup]):
+        events = {}
+        event_by_market = {}
+        for event in groups:
+            events[event.id] = event
+            for condition_id in event.members:
+                event_by_market[condition_id] = event.id
+        
+        # Only new or re-shaped events need re-evaluating; the rest keep their opportunities.
+        changed = {
+            event_id for event_id, event in events.items()
+            if (previous := self.events.get(event_id)) is None
+            or (previous.title, previous.slug, previous.neg_risk, previous.members)
+            != (event.title, event.slug, event.neg_risk, event.members)
+        }
+        # Cluster ownership hashes markets by event, so a regrouped market may change owner.
+        if event_by_market != self.event_by_market:
+            self.version += 1
+        self.events = events
+        self.event_by_market = event_by_market
+        self._event_opportunities = {
+            event_id: ids for event_id, ids in self._event_opportunities.items() if event_id in events
+        }
+        self._dirty = {event_id for event_id in self._dirty if event_id in events} | changed
+        self.is_loaded = True
+        logger.info(f"Event index rebuilt: {len(events)} multi-market events, {len(event_by_market)} markets")
+    
+    def restore(self, groups: Iterable[EventGroup], markets: Iterable[MarketRecord], opportunities: Iterable[dict]):
+        # Legs and opportunities come from the same checkpoint, so no event starts dirty.
+        self.install(groups)
+        for market in markets:
+            if len(market.tokens) == 2:
+                self._legs[market.key] = MarketLegs(market)
+        for opportunity in opportunities:
+            involved = opportunity["markets_involved"]
+            event_id = self.event_by_market.get(involved[0]) if len(involved) > 1 else None
+            if event_id is not None:
+                self._event_opportunities.setdefault(event_id, set()).add(opportunity["id"])
+        self._dirty.clear()
+    
+    async def refresh(self):
+        self.rebuild(await market_fetcher.fetch_all_events())
+    
+    def update_market(self, market: MarketRecord):
+        if len(market.tokens) != 2:
+            return
+        key = market.key
+        legs = MarketLegs(market)
+        previous = self._legs.get(key)
+        if previous is not None and previous.key() == legs.key():
+            return
+        self._legs[key] = legs
+        
+        event_id = self.event_by_market.get(key)
+        if event_id is not None:
+            self._dirty.add(event_id)
+    
+    def prune(self, live_keys):
+        stale = [key for key in self._legs if key not in live_keys]
+        for key in stale:
+            del self._legs[key]
+            event_id = self.event_by_market.get(key)
+            if event_id is not None:
+                self._dirty.add(event_id)
+    
+    def _build_opportunity(self, event: EventGroup, legs: List[MarketLegs], side: str) -> Optional[Opportunity]:
+        buy_yes = side == "YES"
+        prices = [leg.yes_price if buy_yes else leg.no_price for leg in legs]
+        if any(price <= 0 for price in prices):
+            return None
+        
+        total_cost = sum(prices)
+        guaranteed_payout = 1.0 if buy_yes else float(len(legs) - 1)
+        if total_cost >= guaranteed_payout:
+            return None
+        
+        gross_profit = guaranteed_payout - total_cost
+        gross_profit_percent = (gross_profit / total_cost) * 100
+        estimated_fees = guaranteed_payout * settings.POLYMARKET_FEE_PERCENT
+        net_profit = gross_profit - estimated_fees
+        net_profit_percent = (net_profit / total_cost) * 100
+        if net_profit_percent < detection_threshold():
+            return None
+        
+        trade_legs = [
+            TradeLeg(
+                token_id=leg.yes_token if buy_yes else leg.no_token,
+                outcome=f"{leg.question} - {side.title()}",
+                side="BUY",
+                price=price,
+                suggested_size=1.0
+            )
+            for leg, price in zip(legs, prices)
+        ]
+        
+        return Opportunity(
+            id=generate_event_opportunity_id(event.id, side),
+            detected_at=datetime.utcnow(),
+            arbitrage_type=ArbitrageType.MULTI_MARKET_INCONSISTENCY,
+            event_title=event.title,
+            market_question=f"{event.title} (buy all {side})",
+            markets_involved=list(event.members),
+            total_cost=round(total_cost, 4),
+            guaranteed_payout=guaranteed_payout,
+            gross_profit=round(gross_profit, 4),
+            gross_profit_percent=round(gross_profit_percent, 2),
+            estimated_fees=round(estimated_fees, 4),
+            net_profit=round(net_profit, 4),
+            net_profit_percent=round(net_profit_percent, 2),
+            trade_legs=trade_legs,
+            min_liquidity=min(leg.liquidity for leg in legs),
+            slug=event.slug
+        )
+    
+    def _evaluate_event(self, event: EventGroup) -> List[Opportunity]:
+        legs = [self._legs.get(condition_id) for condition_id in event.members]
+        if any(leg is None for leg in legs):
+            return []
+        
+        found = []
+        for side in ("YES", "NO"):
+            opportunity = self._build_opportunity(event, legs, side)
+            if opportunity:
+                found.append(opportunity)
+        return found
+    
+    def evaluate(self) -> Tuple[List[Opportunity], Set[str]]:
+        fresh = []
+        for event_id in self._dirty:
+            event = self.events.get(event_id)
+            if event is None:
+                continue
+            found = self._evaluate_event(event)
+            self._event_opportunities[event_id] = {opp.id for opp in found}
+            fresh.extend(found)
+        
+        carried = set()
+        for event_id, ids in self._event_opportunities.items():
+            if event_id not in self._dirty:
+                carried.update(ids)
+        
+        self.evaluated_events = len(self._dirty)
+        self._dirty.clear()
+        return fresh, carried
+    
+    def get_stats(self) -> dict:
+        return {
+            "events": len(self.events),
+            "markets": len(self.event_by_market),
+            "evaluated_last_scan": self.evaluated_events
+        }
+
+event_index = EventIndex()
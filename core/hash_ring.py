@@ -0,0 +1,26 @@
+import hashlib
+from bisect import bisect
+from typing import Iterable, Optional, Tuple
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+class HashRing:
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64):
+        self.nodes: Tuple[str, ...] = tuple(sorted(set(nodes)))
+        self.replicas = replicas
+        points = sorted(
+            (_point(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+    
+    def __len__(self) -> int:
+        return len(self.nodes)
+    
+    def owner(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        return self._owners[bisect(self._points, _point(key)) % len(self._points)]
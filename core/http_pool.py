@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class HttpClientPool:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._waiting: int = 0
+        self._in_flight: int = 0
+        self.requests: int = 0
+        self.errors: int = 0
+        self.http2_enabled: bool = False
+    
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+        
+        http2 = settings.HTTP2_ENABLED
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed, using HTTP/1.1")
+                http2 = False
+        self.http2_enabled = http2
+        
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=http2,
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS)
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+    
+    async def start(self):
+        self.client
+        logger.info(
+            f"HTTP pool started (max {settings.HTTP_MAX_CONNECTIONS} connections, "
+            f"{settings.HTTP_MAX_CONNECTIONS_PER_HOST} per host, http2={self.http2_enabled})"
+        )
+    
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._host_slots.clear()
+        logger.info("HTTP pool closed")
+    
+    def _slot_for(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+            self._host_slots[host] = slot
+        return slot
+    
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        slot = self._slot_for(url)
+        self._waiting += 1
+        try:
+            await slot.acquire()
+        finally:
+            self._waiting -= 1
+        
+        self._in_flight += 1
+        self.requests += 1
+        try:
+            return await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            slot.release()
+    
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+    
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+    
+    def get_stats(self) -> dict:
+        # Counted here rather than read from httpx's private pool internals,
+        # which change between releases.
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "hosts": len(self._host_slots),
+            "requests": self.requests,
+            "errors": self.errors,
+            "http2": self.http2_enabled
+        }
+
+http_pool = HttpClientPool()
@@ -0,0 +1,75 @@
+from typing import Dict
+
+from config import settings
+from core.metrics import OPPORTUNITY_TRANSITIONS
+from models.opportunity import Opportunity
+
+class LifecycleEntry:
+    __slots__ = ("entered_at", "last_seen", "misses")
+    
+    def __init__(self, now: float):
+        self.entered_at = now
+        self.last_seen = now
+        self.misses = 0
+
+class OpportunityLifecycle:
+    # Opportunities enter at MIN_ARBITRAGE_PERCENT but stay live down to
+    # OPPORTUNITY_EXIT_PERCENT, and only expire after enough consecutive misses
+    # spanning the grace period, so prices flickering around the threshold do
+    # not churn the store and the feed.
+    def __init__(self):
+        self._entries: Dict[str, LifecycleEntry] = {}
+        self.counts: Dict[str, int] = {"entered": 0, "recovered": 0, "held": 0, "expired": 0, "suppressed": 0}
+    
+    def _transition(self, kind: str):
+        self.counts[kind] += 1
+        OPPORTUNITY_TRANSITIONS.inc(kind)
+    
+    def admit(self, opportunity: Opportunity, now: float) -> bool:
+        entry = self._entries.get(opportunity.id)
+        if entry is None:
+            if opportunity.net_profit_percent < settings.MIN_ARBITRAGE_PERCENT:
+                self._transition("suppressed")
+                return False
+            self._entries[opportunity.id] = LifecycleEntry(now)
+            self._transition("entered")
+            return True
+        if entry.misses:
+            self._transition("recovered")
+        entry.misses = 0
+        entry.last_seen = now
+        return True
+    
+    def miss(self, opp_id: str, now: float) -> bool:
+        entry = self._entries.get(opp_id)
+        if entry is None:
+            return True
+        entry.misses += 1
+        if (entry.misses >= settings.OPPORTUNITY_EXPIRY_MISSES
+                and now - entry.last_seen >= settings.OPPORTUNITY_GRACE_SECONDS):
+            del self._entries[opp_id]
+            self._transition("expired")
+            return True
+        self._transition("held")
+        return False
+    
+    def is_missing(self, opp_id: str) -> bool:
+        entry = self._entries.get(opp_id)
+        return entry is not None and entry.misses > 0
+    
+    def adopt(self, opp_id: str, now: float):
+        self._entries.setdefault(opp_id, LifecycleEntry(now))
+    
+    def forget(self, opp_id: str):
+        self._entries.pop(opp_id, None)
+    
+    def get_stats(self) -> dict:
+        return {
+            "tracked": len(self._entries),
+            "missing": sum(1 for entry in self._entries.values() if entry.misses),
+            "enter_percent": settings.MIN_ARBITRAGE_PERCENT,
+            "exit_percent": settings.OPPORTUNITY_EXIT_PERCENT,
+            **self.counts
+        }
+
+opportunity_lifecycle = OpportunityLifecycle()
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from config import settings
+from core.market_fetcher import PageFetchError, market_fetcher
+from models.market import MarketRecord
+
+logger = logging.getLogger(__name__)
+
+def market_key(raw: dict) -> str:
+    return str(raw.get("conditionId") or raw.get("id", ""))
+
+def market_token_ids(market: MarketRecord) -> List[str]:
+    return [t.token_id for t in market.tokens if t.token_id]
+
+class MarketCatalog:
+    def __init__(self):
+        self.markets: Dict[str, MarketRecord] = {}
+        self.token_ids: List[str] = []
+        self.version: int = 0
+        self.last_refresh_at: Optional[datetime] = None
+        self.last_full_refresh_at: Optional[datetime] = None
+        self._last_full_refresh: float = 0.0
+        self.last_diff: dict = {}
+        self.restored: bool = False
+        self._lock = asyncio.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.markets)
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self.last_full_refresh_at is not None
+    
+    def _rebuild_token_ids(self):
+        token_ids = []
+        for market in self.markets.values():
+            token_ids.extend(market_token_ids(market))
+        self.token_ids = token_ids
+    
+    def _apply(self, raw_markets: List[dict], diff: dict, seen: set = None) -> List[MarketRecord]:
+        live = []
+        for raw in raw_markets:
+            key = market_key(raw)
+            if not key:
+                continue
+            if seen is not None:
+                seen.add(key)
+            
+            if raw.get("closed"):
+                if self.markets.pop(key, None) is not None:
+                    diff["removed"] += 1
+                continue
+            
+            record = MarketRecord.from_api(raw)
+            existing = self.markets.get(key)
+            if existing is None:
+                diff["added"] += 1
+            elif existing.same_listing(record):
+                live.append(existing)
+                continue
+            else:
+                diff["updated"] += 1
+                last_prices = {t.token_id: t.price for t in existing.tokens}
+                for token in record.tokens:
+                    token.price = last_prices.get(token.token_id, token.price)
+            self.markets[key] = record
+            live.append(record)
+        return live
+    
+    def _finish_refresh(self, diff: dict, full: bool, seen: set = None):
+        if full and seen:
+            missing = [key for key in self.markets if key not in seen]
+            for key in missing:
+                del self.markets[key]
+            diff["removed"] += len(missing)
+        
+        if diff["added"] or diff["updated"] or diff["removed"]:
+            self.version += 1
+            self._rebuild_token_ids()
+        
+        self.last_diff = diff
+        self.last_refresh_at = datetime.utcnow()
+        if full:
+            self.last_full_refresh_at = self.last_refresh_at
+            self._last_full_refresh = time.monotonic()
+            self.restored = False
+        
+        logger.info(
+            f"Catalog {'full' if full else 'incremental'} refresh: {len(self.markets)} markets "
+            f"(+{diff['added']} ~{diff['updated']} -{diff['removed']})"
+        )
+    
+    def restore(self, markets: Dict[str, MarketRecord], version: int, refreshed_at: datetime):
+        # Served as loaded straight away, with a full refresh already due.
+        self.markets = markets
+        self.version = version
+        self._rebuild_token_ids()
+        self.last_refresh_at = refreshed_at
+        self.last_full_refresh_at = refreshed_at
+        self._last_full_refresh = time.monotonic() - settings.CATALOG_FULL_REFRESH_SECONDS
+        self.restored = True
+    
+    async def stream_full_refresh(self) -> AsyncIterator[List[MarketRecord]]:
+        async with self._lock:
+            diff = {"added": 0, "updated": 0, "removed": 0}
+            seen = set()
+            params = {"closed": "false", "archived": "false"}
+            
+            try:
+                async for page in market_fetcher.iter_pages(f"{market_fetcher.gamma_url}/markets", params):
+                    live = self._apply(page, diff, seen)
+                    if live:
+                        yield live
+            except PageFetchError:
+                # Keep what was applied so far, but an incomplete listing cannot prune.
+                logger.warning("Catalog full refresh incomplete, keeping cached markets")
+                self._finish_refresh(diff, False)
+                raise
+            
+            if not seen and self.markets:
+                logger.warning("Catalog refresh returned no markets, keeping cached catalog")
+                return
+            self._finish_refresh(diff, True, seen)
+    
+    async def refresh(self, full: bool = False) -> dict:
+        if full or not self.is_loaded:
+            async for _ in self.stream_full_refresh():
+                pass
+            return self.last_diff
+        
+        async with self._lock:
+            diff = {"added": 0, "updated": 0, "removed": 0}
+            self._apply(await self._fetch_newest_markets(), diff)
+            self._finish_refresh(diff, False)
+            return self.last_diff
+    
+    def iter_batches(self, batch_size: int) -> Iterator[List[MarketRecord]]:
+        markets = list(self.markets.values())
+        for i in range(0, len(markets), batch_size):
+            yield markets[i:i + batch_size]
+    
+    async def _fetch_newest_markets(self) -> List[dict]:
+        params = {"closed": "false", "archived": "false", "order": "id", "ascending": "false"}
+        newest = []
+        
+        async for page in market_fetcher.iter_pages(f"{market_fetcher.gamma_url}/markets", params):
+            newest.extend(page)
+            if all(market_key(raw) in self.markets for raw in page):
+                break
+        
+        return newest
+    
+    def full_refresh_due(self) -> bool:
+        return time.monotonic() - self._last_full_refresh >= settings.CATALOG_FULL_REFRESH_SECONDS
+    
+    def get_status(self) -> dict:
+        return {
+            "markets": len(self.markets),
+            "tokens": len(self.token_ids),
+            "version": self.version,
+            "last_refresh_at": self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+            "last_full_refresh_at": self.last_full_refresh_at.isoformat() if self.last_full_refresh_at else None,
+            "restored": self.restored
+        }
+
+market_catalog = MarketCatalog()
@@ -1,102 +1,155 @@
 import httpx
 import asyncio
 import logging
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, AsyncIterator, Optional
+from urllib.parse import urlsplit
 from config import settings
+from core.http_pool import HttpClientPool, http_pool
+from core.metrics import HTTP_LATENCY, HTTP_REQUESTS
+from core.rate_limiter import AdaptiveRateLimiter, backoff_delay
 
 logger = logging.getLogger(__name__)
 
+class PageFetchError(Exception):
+    pass
+
 class MarketFetcher:
     def __init__(self):
         self.gamma_url = settings.GAMMA_API_URL
         self.clob_url = settings.CLOB_API_URL
-        self.timeout = httpx.Timeout(30.0)
+        self.timeout = httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS)
+        self.http: HttpClientPool = http_pool
+        self.gamma_limiter = AdaptiveRateLimiter(
+            "gamma", settings.GAMMA_RATE_LIMIT_PER_SECOND, settings.GAMMA_RATE_LIMIT_BURST
+        )
+        self.clob_limiter = AdaptiveRateLimiter(
+            "clob", settings.CLOB_RATE_LIMIT_PER_SECOND, settings.CLOB_RATE_LIMIT_BURST
+        )
+        self.stats: Dict[str, int] = {"requests": 0, "throttled": 0, "retried": 0, "failed": 0}
+    
+    def set_http_pool(self, pool: HttpClientPool):
+        self.http = pool
     
-    async def _request_with_retry(self, client: httpx.AsyncClient, url: str, params: dict = None, retries: int = 3) -> dict:
+    def _limiter_for(self, url: str) -> AdaptiveRateLimiter:
+        return self.clob_limiter if url.startswith(self.clob_url) else self.gamma_limiter
+    
+    async def _request_with_retry(self, url: str, params: dict = None, retries: int = None) -> dict:
+        retries = retries or settings.RETRY_MAX_ATTEMPTS
+        limiter = self._limiter_for(url)
+        endpoint = urlsplit(url).path or "/"
+        
         for attempt in range(retries):
+            delay = backoff_delay(attempt)
             try:
-                await asyncio.sleep(0.1)
-                response = await client.get(url, params=params, timeout=self.timeout)
+                await limiter.acquire()
+                self.stats["requests"] += 1
+                start = time.perf_counter()
+                try:
+                    response = await self.http.get(url, params=params, timeout=self.timeout)
+                except Exception:
+                    HTTP_REQUESTS.inc(limiter.name, endpoint, "error")
+                    raise
+                finally:
+                    HTTP_LATENCY.observe(time.perf_counter() - start, limiter.name, endpoint)
+                HTTP_REQUESTS.inc(limiter.name, endpoint, str(response.status_code))
+                retry_after = limiter.on_response(response)
                 
                 if response.status_code == 429:
-                    logger.warning("Rate limited, waiting 60 seconds...")
-                    await asyncio.sleep(60)
-                    continue
-                
-                response.raise_for_status()
-                return response.json()
+                    self.stats["throttled"] += 1
+                    if retry_after is not None:
+                        delay = max(delay, retry_after)
+                else:
+                    response.raise_for_status()
+                    return response.json()
             except httpx.HTTPStatusError as e:
                 logger.error(f"HTTP error on attempt {attempt + 1}: {e}")
-                if attempt < retries - 1:
-                    await asyncio.sleep(2 ** attempt)
             except Exception as e:
                 logger.error(f"Request error on attempt {attempt + 1}: {e}")
-                if attempt < retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+            
+            if attempt < retries - 1:
+                self.stats["retried"] += 1
+                await asyncio.sleep(delay)
+        
+        self.stats["failed"] += 1
         return {}
     
-    async def fetch_all_events(self) -> List[dict]:
-        events = []
-        offset = 0
-        limit = 100
+    async def iter_pages(self, url: str, params: dict = None) -> AsyncIterator[List[dict]]:
+        limit = settings.FETCH_PAGE_SIZE
+        concurrency = max(1, settings.FETCH_CONCURRENCY)
+        base_params = dict(params or {})
+        
+        pending: Dict[asyncio.Task, int] = {}
+        pages: Dict[int, List[dict]] = {}
+        next_offset = 0
+        next_yield = 0
+        end_offset: Optional[int] = None
         
-        async with httpx.AsyncClient() as client:
+        try:
             while True:
-                params = {
-                    "closed": "false",
-                    "archived": "false",
-                    "limit": limit,
-                    "offset": offset
-                }
-                data = await self._request_with_retry(
-                    client, 
-                    f"{self.gamma_url}/events",
-                    params
-                )
+                while len(pending) < concurrency and (end_offset is None or next_offset < end_offset):
+                    page_params = {**base_params, "limit": limit, "offset": next_offset}
+                    task = asyncio.create_task(self._request_with_retry(url, page_params))
+                    pending[task] = next_offset
+                    next_offset += limit
                 
-                if not data or (isinstance(data, list) and len(data) == 0):
+                if not pending:
                     break
                 
-                if isinstance(data, list):
-                    events.extend(data)
-                    if len(data) < limit:
-                        break
-                    offset += limit
-                else:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: pending[t]):
+                    if task not in pending:
+                        continue
+                    offset = pending.pop(task)
+                    data = task.result()
+                    # A page that failed every retry is not the end of the listing;
+                    # callers must not mistake the markets after it for delisted ones.
+                    if not isinstance(data, list):
+                        raise PageFetchError(f"Page at offset {offset} of {url} failed")
+                    page = data
+                    
+                    if len(page) < limit:
+                        page_end = offset + limit if page else offset
+                        if end_offset is None or page_end < end_offset:
+                            end_offset = page_end
+                            for other, other_offset in list(pending.items()):
+                                if other_offset >= end_offset:
+                                    other.cancel()
+                                    del pending[other]
+                            for stale_offset in [o for o in pages if o >= end_offset]:
+                                del pages[stale_offset]
+                    
+                    if end_offset is None or offset < end_offset:
+                        pages[offset] = page
+                
+                while next_yield in pages:
+                    page = pages.pop(next_yield)
+                    next_yield += limit
+                    if page:
+                        yield page
+                
+                if end_offset is not None and next_yield >= end_offset:
                     break
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def fetch_all_events(self) -> List[dict]:
+        events = []
+        params = {"closed": "false", "archived": "false"}
+        
+        async for page in self.iter_pages(f"{self.gamma_url}/events", params):
+            events.extend(page)
         
         logger.info(f"Fetched {len(events)} events")
         return events
     
     async def fetch_all_markets(self) -> List[dict]:
         markets = []
-        offset = 0
-        limit = 100
+        params = {"closed": "false", "archived": "false"}
         
-        async with httpx.AsyncClient() as client:
-            while True:
-                params = {
-                    "closed": "false",
-                    "archived": "false",
-                    "limit": limit,
-                    "offset": offset
-                }
-                data = await self._request_with_retry(
-                    client,
-                    f"{self.gamma_url}/markets",
-                    params
-                )
-                
-                if not data or (isinstance(data, list) and len(data) == 0):
-                    break
-                
-                if isinstance(data, list):
-                    markets.extend(data)
-                    if len(data) < limit:
-                        break
-                    offset += limit
-                else:
-                    break
+        async for page in self.iter_pages(f"{self.gamma_url}/markets", params):
+            markets.extend(page)
         
         logger.info(f"Fetched {len(markets)} markets")
         return markets
@@ -107,30 +160,37 @@ class MarketFetcher:
         
         prices = {}
         chunk_size = 100
+        slots = asyncio.Semaphore(max(1, settings.FETCH_CONCURRENCY))
         
-        async with httpx.AsyncClient() as client:
-            for i in range(0, len(token_ids), chunk_size):
-                chunk = token_ids[i:i + chunk_size]
-                params = {"token_ids": ",".join(chunk)}
-                
+        async def fetch_chunk(chunk: List[str]):
+            async with slots:
                 data = await self._request_with_retry(
-                    client,
                     f"{self.clob_url}/prices",
-                    params
+                    {"token_ids": ",".join(chunk)}
                 )
-                
-                if isinstance(data, dict):
-                    prices.update(data)
+            if isinstance(data, dict):
+                prices.update(data)
         
+        await asyncio.gather(*[
+            fetch_chunk(token_ids[i:i + chunk_size])
+            for i in range(0, len(token_ids), chunk_size)
+        ])
         return prices
     
     async def fetch_orderbook(self, token_id: str) -> dict:
-        async with httpx.AsyncClient() as client:
-            data = await self._request_with_retry(
-                client,
-                f"{self.clob_url}/book",
-                {"token_id": token_id}
-            )
-            return data if isinstance(data, dict) else {}
+        data = await self._request_with_retry(
+            f"{self.clob_url}/book",
+            {"token_id": token_id}
+        )
+        return data if isinstance(data, dict) else {}
+    
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "rate_limiters": {
+                "gamma": self.gamma_limiter.get_stats(),
+                "clob": self.clob_limiter.get_stats()
+            }
+        }
 
 market_fetcher = MarketFetcher()
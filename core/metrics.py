@@ -0,0 +1,208 @@
+import asyncio
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from config import settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+Labels = Tuple[str, ...]
+Collected = Union[float, Dict[Labels, float]]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Metric:
+    kind = "untyped"
+    
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+    
+    def samples(self) -> List[str]:
+        return []
+    
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+class Counter(Metric):
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in self._values.items()]
+
+class Gauge(Metric):
+    kind = "gauge"
+    
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), collect: Optional[Callable[[], Collected]] = None):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+        self._collect = collect
+    
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+    
+    def samples(self) -> List[str]:
+        values = self._values
+        if self._collect is not None:
+            collected = self._collect()
+            values = collected if isinstance(collected, dict) else {(): collected}
+        return [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            for key, value in values.items() if value is not None
+        ]
+
+class Histogram(Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # Per label set: bucket counts (last slot is +Inf), sum, count.
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+    
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[labels] = series
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+    
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total[0])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+    
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+    
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), collect: Optional[Callable[[], Collected]] = None) -> Gauge:
+        return self._register(Gauge(name, help, labels, collect))
+    
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class ScanTimer:
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+    
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+    
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+    
+    def timed(self, phase: str, handler: Callable):
+        async def run(item):
+            with self.span(phase):
+                return await handler(item)
+        return run
+    
+    def as_ms(self) -> Dict[str, float]:
+        return {phase: round(seconds * 1000, 2) for phase, seconds in self.phases.items()}
+
+class LoopLagMonitor:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._window_max: float = 0.0
+        self.last_lag: float = 0.0
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    def take_window_max(self) -> float:
+        lag, self._window_max = self._window_max, 0.0
+        return lag
+    
+    async def _run(self):
+        interval = settings.METRICS_LOOP_LAG_INTERVAL_SECONDS
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.last_lag = lag
+            if lag > self._window_max:
+                self._window_max = lag
+            LOOP_LAG.observe(lag)
+
+metrics = MetricsRegistry()
+
+SCAN_DURATION = metrics.histogram("arbitrage_scan_duration_seconds", "Wall time of a scan", ["mode"])
+SCAN_PHASE = metrics.histogram("arbitrage_scan_phase_seconds", "Time spent per scan phase; pipeline stages report busy time summed over workers", ["phase"])
+SCANS = metrics.counter("arbitrage_scans_total", "Completed scans", ["status"])
+SCAN_MARKETS = metrics.gauge("arbitrage_scan_markets", "Markets evaluated and changed in the last scan", ["kind"])
+HTTP_LATENCY = metrics.histogram("arbitrage_http_request_seconds", "Upstream API request latency", ["api", "endpoint"])
+HTTP_REQUESTS = metrics.counter("arbitrage_http_requests_total", "Upstream API requests by status", ["api", "endpoint", "status"])
+DB_WRITE_LATENCY = metrics.histogram("arbitrage_db_write_seconds", "SQLite write transaction latency", ["kind"])
+NOTIFICATIONS = metrics.counter("arbitrage_notifications_total", "Notification deliveries by sink and status", ["sink", "status"])
+WS_FANOUT = metrics.histogram("arbitrage_ws_fanout_seconds", "Time to encode and enqueue one frame for all WebSocket clients", buckets=LAG_BUCKETS)
+OPPORTUNITY_TRANSITIONS = metrics.counter("arbitrage_opportunity_transitions_total", "Opportunity lifecycle transitions", ["transition"])
+LOOP_LAG = metrics.histogram("arbitrage_event_loop_lag_seconds", "Event-loop scheduling delay of a periodic probe", buckets=LAG_BUCKETS)
+
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+from config import settings
+from core.arbitrage_detector import detection_threshold
+from core import shard_worker
+from models.market import MarketRecord
+from models.opportunity import Opportunity
+
+logger = logging.getLogger(__name__)
+
+ShardResult = Tuple[List[Tuple[int, Tuple[float, ...]]], List[Opportunity], List[int]]
+
+def pool_size() -> int:
+    if settings.EXECUTION_WORKERS > 0:
+        return settings.EXECUTION_WORKERS
+    return max(1, (os.cpu_count() or 2) - 1)
+
+class ProcessOffloader:
+    def __init__(self):
+        self._executors: List[ProcessPoolExecutor] = []
+        self._loaded: Dict[str, int] = {}
+        self.batches: int = 0
+        self.scoped_batches: int = 0
+        self.shard_loads: int = 0
+        self.failures: int = 0
+        self.worker_seconds: float = 0.0
+        self.round_trip_seconds: float = 0.0
+    
+    @property
+    def is_running(self) -> bool:
+        return bool(self._executors)
+    
+    @property
+    def workers(self) -> int:
+        return len(self._executors) or pool_size()
+    
+    def start(self):
+        if self._executors:
+            return
+        context = multiprocessing.get_context("spawn")
+        # One single-process executor per worker so a shard always lands on
+        # the process that holds its price state.
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context)
+            for _ in range(pool_size())
+        ]
+        self._loaded = {}
+        logger.info(f"Process offload started with {len(self._executors)} workers")
+    
+    def shutdown(self):
+        executors, self._executors = self._executors, []
+        self._loaded = {}
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _executor_for(self, shard_id: str) -> ProcessPoolExecutor:
+        return self._executors[hash(shard_id) % len(self._executors)]
+    
+    async def _submit(self, shard_id: str, fn, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor_for(shard_id), fn, *args)
+        except BrokenProcessPool:
+            self.failures += 1
+            self.shutdown()
+            raise
+    
+    def _params(self) -> tuple:
+        return (
+            settings.MIN_LIQUIDITY_USD,
+            detection_threshold(),
+            settings.POLYMARKET_FEE_PERCENT,
+            settings.INCREMENTAL_DETECTION
+        )
+    
+    def _static(self, batch: List[MarketRecord], last_prices: Dict[str, tuple]) -> tuple:
+        # Plain columns pickle several times faster than the slotted records;
+        # the worker rebuilds its own records from them.
+        return (
+            [(m.id, m.question, m.condition_id, m.slug, m.event_title, m.liquidity) for m in batch],
+            [tuple((t.token_id, t.outcome, t.price) for t in m.tokens) for m in batch],
+            [last_prices.get(m.key) for m in batch]
+        )
+    
+    def _finish(self, result: tuple, start: float) -> ShardResult:
+        changed, opportunities, carried, worker_seconds = result
+        self.batches += 1
+        self.worker_seconds += worker_seconds
+        self.round_trip_seconds += time.perf_counter() - start
+        return changed, opportunities, carried
+    
+    async def scan_batch(self, batch: List[MarketRecord], prices: dict, version: int,
+                         last_prices: Dict[str, tuple]) -> ShardResult:
+        if not self._executors:
+            self.start()
+        
+        shard_id = f"{batch[0].key}:{batch[-1].key}:{len(batch)}"
+        params = self._params()
+        start = time.perf_counter()
+        
+        result = None
+        if self._loaded.get(shard_id) == version:
+            result = await self._submit(shard_id, shard_worker.scan_shard, shard_id, version, None, prices, params)
+        if result is None:
+            static = self._static(batch, last_prices)
+            result = await self._submit(shard_id, shard_worker.scan_shard, shard_id, version, static, prices, params)
+            self._loaded[shard_id] = version
+            self.shard_loads += 1
+        return self._finish(result, start)
+    
+    async def scan_scoped(self, batch: List[MarketRecord], prices: dict, last_prices: Dict[str, tuple]) -> ShardResult:
+        # Scoped batches change composition every tick, so they ship their
+        # static columns each time and leave no shard behind in the worker.
+        if not self._executors:
+            self.start()
+        
+        start = time.perf_counter()
+        static = self._static(batch, last_prices)
+        result = await self._submit(batch[0].key, shard_worker.scan_once, static, prices, self._params())
+        self.scoped_batches += 1
+        return self._finish(result, start)
+    
+    async def prune(self, version: int):
+        if not self._executors:
+            return
+        stale = [shard_id for shard_id, loaded in self._loaded.items() if loaded != version]
+        if not stale:
+            return
+        for shard_id in stale:
+            del self._loaded[shard_id]
+        
+        live: Dict[int, List[str]] = {i: [] for i in range(len(self._executors))}
+        for shard_id in self._loaded:
+            live[hash(shard_id) % len(self._executors)].append(shard_id)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, shard_worker.drop_shards, live[i])
+            for i, executor in enumerate(self._executors)
+        ], return_exceptions=True)
+    
+    def get_stats(self) -> dict:
+        return {
+            "mode": settings.EXECUTION_MODE,
+            "workers": len(self._executors),
+            "batches": self.batches,
+            "scoped_batches": self.scoped_batches,
+            "shard_loads": self.shard_loads,
+            "failures": self.failures,
+            "worker_seconds": round(self.worker_seconds, 3),
+            "round_trip_seconds": round(self.round_trip_seconds, 3)
+        }
+
+process_offloader = ProcessOffloader()
@@ -0,0 +1,137 @@
+import json
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+MAX_RENDERED_VIEWS = 64
+
+SORT_KEYS: Dict[str, Callable[[dict], tuple]] = {
+    "profit": lambda opp: (-opp["net_profit_percent"], opp["id"]),
+    "liquidity": lambda opp: (-(opp["min_liquidity"] or 0), opp["id"]),
+    "recent": lambda opp: (_descending(opp["detected_at"]), opp["id"])
+}
+
+def _descending(timestamp: str) -> float:
+    return -datetime.fromisoformat(timestamp).timestamp()
+
+class OpportunityIndex:
+    def __init__(self):
+        self._items: Dict[str, dict] = {}
+        self._views: Dict[str, List[Tuple[tuple, str]]] = {name: [] for name in SORT_KEYS}
+        self._keys: Dict[str, Dict[str, tuple]] = {name: {} for name in SORT_KEYS}
+        self._rendered: Dict[tuple, bytes] = {}
+        self.total_profit: float = 0.0
+        self.markets_scanned: int = 0
+        self.version: int = 0
+        self._epoch: int = int(time.time())
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def _bump(self):
+        self.version += 1
+        self._rendered.clear()
+    
+    def _unlink(self, opp_id: str):
+        for name, view in self._views.items():
+            key = self._keys[name].pop(opp_id, None)
+            if key is not None:
+                del view[bisect_left(view, (key, opp_id))]
+    
+    def _link(self, opp: dict):
+        opp_id = opp["id"]
+        for name, key_fn in SORT_KEYS.items():
+            key = key_fn(opp)
+            self._keys[name][opp_id] = key
+            insort(self._views[name], (key, opp_id))
+    
+    def upsert(self, opportunity: dict) -> dict:
+        opp_id = opportunity["id"]
+        entry = dict(opportunity)
+        entry["is_active"] = True
+        entry["last_seen_at"] = datetime.utcnow().isoformat()
+        
+        previous = self._items.get(opp_id)
+        if previous is not None:
+            entry["detected_at"] = previous["detected_at"]
+            entry["times_detected"] = previous["times_detected"] + 1
+            self.total_profit -= previous["net_profit"]
+            self._unlink(opp_id)
+        else:
+            entry["times_detected"] = 1
+        
+        self._items[opp_id] = entry
+        self.total_profit += entry["net_profit"]
+        self._link(entry)
+        self._bump()
+        return entry
+    
+    def load(self, entries: List[dict]):
+        for entry in entries:
+            opp_id = entry["id"]
+            previous = self._items.get(opp_id)
+            if previous is not None:
+                self.total_profit -= previous["net_profit"]
+                self._unlink(opp_id)
+            self._items[opp_id] = entry
+            self.total_profit += entry["net_profit"]
+            self._link(entry)
+        self._bump()
+    
+    def entries(self) -> List[dict]:
+        return list(self._items.values())
+    
+    def remove(self, opp_id: str):
+        previous = self._items.pop(opp_id, None)
+        if previous is None:
+            return
+        self.total_profit -= previous["net_profit"]
+        self._unlink(opp_id)
+        if not self._items:
+            self.total_profit = 0.0
+        self._bump()
+    
+    def set_markets_scanned(self, count: int):
+        if count != self.markets_scanned:
+            self.markets_scanned = count
+            self._bump()
+    
+    def get(self, opp_id: str) -> Optional[dict]:
+        return self._items.get(opp_id)
+    
+    def query(self, limit: int = 100, min_profit: float = 0, sort: str = "profit") -> List[dict]:
+        results = []
+        for _, opp_id in self._views[sort]:
+            opp = self._items[opp_id]
+            if opp["net_profit_percent"] < min_profit:
+                if sort == "profit":
+                    break
+                continue
+            results.append(opp)
+            if len(results) >= limit:
+                break
+        return results
+    
+    def summary(self) -> dict:
+        best = self._views["profit"]
+        return {
+            "active_opportunities": len(self._items),
+            "total_profit_potential": round(self.total_profit, 4),
+            "best_opportunity_percent": self._items[best[0][1]]["net_profit_percent"] if best else 0,
+            "markets_scanned": self.markets_scanned
+        }
+    
+    def etag(self) -> str:
+        return f'W/"{self._epoch}-{self.version}"'
+    
+    def render(self, key: tuple, build: Callable[[], object]) -> bytes:
+        body = self._rendered.get(key)
+        if body is None:
+            if len(self._rendered) >= MAX_RENDERED_VIEWS:
+                self._rendered.clear()
+            body = json.dumps(build(), separators=(",", ":")).encode()
+            self._rendered[key] = body
+        return body
+
+opportunity_index = OpportunityIndex()
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+StageHandler = Callable[[Any], Awaitable[Any]]
+
+class Stage:
+    def __init__(self, name: str, handler: StageHandler, workers: int = 1):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.items_in: int = 0
+        self.items_out: int = 0
+
+class Pipeline:
+    def __init__(self, source: AsyncIterator[Any], queue_size: int = 4):
+        self.source = source
+        self.queue_size = max(1, queue_size)
+        self.stages: List[Stage] = []
+    
+    def add_stage(self, name: str, handler: StageHandler, workers: int = 1) -> "Pipeline":
+        self.stages.append(Stage(name, handler, workers))
+        return self
+    
+    async def _feed(self, outbox: asyncio.Queue):
+        try:
+            async for item in self.source:
+                await outbox.put(item)
+        finally:
+            aclose = getattr(self.source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        await outbox.put(_DONE)
+    
+    async def _run_stage(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]):
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    await inbox.put(_DONE)
+                    return
+                stage.items_in += 1
+                result = await stage.handler(item)
+                if result is not None and outbox is not None:
+                    stage.items_out += 1
+                    await outbox.put(result)
+        
+        await asyncio.gather(*[worker() for _ in range(stage.workers)])
+        if outbox is not None:
+            await outbox.put(_DONE)
+    
+    async def run(self):
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        tasks = [asyncio.create_task(self._feed(queues[0]))]
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            tasks.append(asyncio.create_task(self._run_stage(stage, queues[i], outbox)))
+        
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    
+    def get_stats(self) -> dict:
+        return {stage.name: {"in": stage.items_in, "out": stage.items_out} for stage in self.stages}
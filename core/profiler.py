@@ -0,0 +1,265 @@
+import cProfile
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MODES = ("deterministic", "sampling")
+
+FuncKey = Tuple[str, int, str]
+
+def _frame_label(filename: str, name: str) -> str:
+    module = os.path.splitext(os.path.basename(filename))[0] if filename and filename != "~" else "builtins"
+    return f"{module}:{name}".replace(";", ":").replace(" ", "_")
+
+def collapse_pstats(stats: Dict[FuncKey, tuple], max_depth: int = 64) -> Dict[str, int]:
+    # cProfile keeps only caller -> callee edges, so stacks are rebuilt from the
+    # roots down, splitting each function's time by the share each edge contributed.
+    children: Dict[FuncKey, List[Tuple[FuncKey, float]]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    stacks: Dict[str, int] = {}
+    
+    def walk(func: FuncKey, path: List[str], seen: set, share: float):
+        _, _, self_time, cumulative, _ = stats[func]
+        if cumulative <= 0 or share <= 0:
+            return
+        scale = min(1.0, share / cumulative)
+        path = path + [_frame_label(func[0], func[2])]
+        stack = ";".join(path)
+        stacks[stack] = stacks.get(stack, 0) + int(self_time * scale * 1e6)
+        if len(path) >= max_depth:
+            return
+        for child, edge_time in children.get(func, ()):
+            if child not in seen and child in stats:
+                walk(child, path, seen | {child}, edge_time * scale)
+    
+    for root in roots:
+        walk(root, [], {root}, stats[root][3])
+    return {stack: value for stack, value in stacks.items() if value > 0}
+
+def render_collapsed(stacks: Dict[str, int]) -> str:
+    return "".join(f"{stack} {value}\n" for stack, value in sorted(stacks.items()))
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples: int = 0
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="scan-profiler-sampler", daemon=True)
+        self._thread.start()
+    
+    def resume(self):
+        self._active.set()
+    
+    def pause(self):
+        self._active.clear()
+    
+    def close(self):
+        self._stopped.set()
+        self._active.set()
+        self._thread.join(1.0)
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self._active.wait()
+            if self._stopped.is_set():
+                return
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                path = []
+                while frame is not None:
+                    code = frame.f_code
+                    path.append(_frame_label(code.co_filename, code.co_name))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(path))] += 1
+                self.samples += 1
+            time.sleep(self.interval)
+
+class ProfileSession:
+    def __init__(self, mode: str, scans: int, interval_ms: float, allocations: bool, top: int):
+        self.mode = mode
+        self.scans_requested = scans
+        self.scans_profiled: int = 0
+        self.interval_ms = interval_ms
+        self.allocations = allocations
+        self.top = top
+        self.created_at = datetime.utcnow().isoformat()
+        self.completed_at: Optional[str] = None
+        self.profile_seconds: float = 0.0
+        self.profile: Optional[cProfile.Profile] = None
+        self.sampler: Optional[StackSampler] = None
+        self.allocation_diffs: List[dict] = []
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started: float = 0.0
+        self._pstats: Optional[Dict[FuncKey, tuple]] = None
+    
+    @property
+    def done(self) -> bool:
+        return self.completed_at is not None
+    
+    def pstats_data(self) -> Optional[Dict[FuncKey, tuple]]:
+        if self.profile is None:
+            return None
+        if self._pstats is None:
+            self._pstats = pstats.Stats(self.profile).stats
+        return self._pstats
+    
+    def collapsed(self) -> Dict[str, int]:
+        if self.sampler is not None:
+            return dict(self.sampler.stacks)
+        data = self.pstats_data()
+        return collapse_pstats(data) if data else {}
+    
+    def top_functions(self, limit: int) -> List[dict]:
+        data = self.pstats_data()
+        if not data:
+            return []
+        ranked = sorted(data.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": f"{os.path.basename(func[0])}:{func[1]}({func[2]})",
+                "calls": entry[1],
+                "own_ms": round(entry[2] * 1000, 3),
+                "cumulative_ms": round(entry[3] * 1000, 3)
+            }
+            for func, entry in ranked
+        ]
+    
+    def summary(self) -> dict:
+        summary = {
+            "mode": self.mode,
+            "scans_requested": self.scans_requested,
+            "scans_profiled": self.scans_profiled,
+            "allocations": self.allocations,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "profiled_seconds": round(self.profile_seconds, 3)
+        }
+        if self.done:
+            if self.mode == "deterministic":
+                summary["top_functions"] = self.top_functions(self.top)
+            else:
+                summary["samples"] = self.sampler.samples if self.sampler else 0
+                summary["interval_ms"] = self.interval_ms
+            summary["allocation_diffs"] = self.allocation_diffs
+        return summary
+
+class ScanProfiler:
+    def __init__(self):
+        self.session: Optional[ProfileSession] = None
+        self._started_tracemalloc: bool = False
+    
+    @property
+    def armed(self) -> bool:
+        session = self.session
+        return session is not None and not session.done
+    
+    def arm(self, scans: int, mode: str, interval_ms: float, allocations: bool, top: int) -> ProfileSession:
+        if self.armed:
+            raise RuntimeError("A profiling session is already running")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        self.session = ProfileSession(mode, scans, interval_ms, allocations, top)
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        logger.info(f"Profiling the next {scans} scans ({mode}{', allocations' if allocations else ''})")
+        return self.session
+    
+    def cancel(self):
+        if self.armed:
+            self._finish(self.session)
+    
+    def begin_scan(self):
+        session = self.session
+        if session.allocations:
+            session._snapshot = tracemalloc.take_snapshot()
+        if session.mode == "deterministic":
+            if session.profile is None:
+                session.profile = cProfile.Profile()
+            session.profile.enable()
+        else:
+            if session.sampler is None:
+                session.sampler = StackSampler(threading.get_ident(), session.interval_ms / 1000)
+            session.sampler.resume()
+        session._started = time.perf_counter()
+    
+    def end_scan(self, scan_id: Optional[int]):
+        session = self.session
+        if session is None or session.done:
+            return
+        session.profile_seconds += time.perf_counter() - session._started
+        if session.profile is not None:
+            session.profile.disable()
+        if session.sampler is not None:
+            session.sampler.pause()
+        if session.allocations and session._snapshot is not None:
+            after = tracemalloc.take_snapshot()
+            diff = after.compare_to(session._snapshot, "lineno")[:session.top]
+            session._snapshot = None
+            session.allocation_diffs.append({
+                "scan_id": scan_id,
+                "top": [
+                    {
+                        "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                        "size_diff_kb": round(stat.size_diff / 1024, 1),
+                        "size_kb": round(stat.size / 1024, 1),
+                        "count_diff": stat.count_diff
+                    }
+                    for stat in diff
+                ]
+            })
+        
+        session.scans_profiled += 1
+        if session.scans_profiled >= session.scans_requested:
+            self._finish(session)
+    
+    def _finish(self, session: ProfileSession):
+        if session.profile is not None:
+            session.profile.disable()
+        if session.sampler is not None:
+            session.sampler.close()
+        session._snapshot = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        session.completed_at = datetime.utcnow().isoformat()
+        logger.info(f"Profiling finished after {session.scans_profiled} scans")
+    
+    def dump_pstats(self) -> Optional[bytes]:
+        session = self.session
+        if session is None or not session.done:
+            return None
+        data = session.pstats_data()
+        return marshal.dumps(data) if data is not None else None
+    
+    def dump_collapsed(self) -> Optional[str]:
+        session = self.session
+        if session is None or not session.done:
+            return None
+        return render_collapsed(session.collapsed())
+    
+    def get_status(self) -> dict:
+        return {
+            "armed": self.armed,
+            "session": self.session.summary() if self.session is not None else None
+        }
+
+scan_profiler = ScanProfiler()
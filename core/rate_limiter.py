@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def parse_rate_limit_reset(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+def backoff_delay(attempt: int) -> float:
+    ceiling = min(settings.RETRY_MAX_DELAY_SECONDS, settings.RETRY_BASE_DELAY_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+class AdaptiveRateLimiter:
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = min(settings.RATE_LIMIT_MIN_PER_SECOND, rate)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.throttled = 0
+        self.waits = 0
+    
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self.tokens = min(float(self.burst), self.tokens + elapsed * self.rate)
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    self.waits += 1
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                self.waits += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def block_for(self, seconds: float):
+        until = time.monotonic() + seconds
+        if until > self._blocked_until:
+            self._blocked_until = until
+    
+    def on_response(self, response: httpx.Response) -> Optional[float]:
+        headers = response.headers
+        
+        if response.status_code == 429:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate * settings.RATE_LIMIT_DECREASE_FACTOR)
+            self.tokens = 0.0
+            retry_after = parse_retry_after(headers.get("retry-after"))
+            if retry_after is None:
+                retry_after = parse_rate_limit_reset(headers.get("x-ratelimit-reset"))
+            if retry_after is not None:
+                self.block_for(retry_after)
+            logger.warning(
+                f"{self.name} rate limited, rate reduced to {self.rate:.2f}/s"
+                + (f", retrying after {retry_after:.1f}s" if retry_after is not None else "")
+            )
+            return retry_after
+        
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is not None and remaining.strip() in ("0", "0.0"):
+            reset = parse_rate_limit_reset(headers.get("x-ratelimit-reset"))
+            if reset:
+                self.block_for(reset)
+        
+        if response.status_code < 400 and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + settings.RATE_LIMIT_INCREASE_STEP)
+        return None
+    
+    def get_stats(self) -> dict:
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "max_rate_per_second": self.max_rate,
+            "tokens": round(self.tokens, 2),
+            "throttled": self.throttled,
+            "waits": self.waits,
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2)
+        }
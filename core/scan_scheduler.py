@@ -0,0 +1,184 @@
+import heapq
+import random
+import time
+from typing import AbstractSet, Dict, Hashable, List, Mapping, Optional, Tuple
+
+from config import settings
+from core.arbitrage_detector import detection_threshold
+from models.market import MarketRecord
+
+TIERS = ("hot", "warm", "cold")
+HOT, WARM, COLD = range(len(TIERS))
+
+def tier_intervals() -> Tuple[float, float, float]:
+    return (
+        settings.SCHEDULER_HOT_INTERVAL_SECONDS,
+        settings.SCHEDULER_WARM_INTERVAL_SECONDS,
+        settings.SCHEDULER_COLD_INTERVAL_SECONDS
+    )
+
+def threshold_price_sum() -> float:
+    return (1.0 - settings.POLYMARKET_FEE_PERCENT) / (1.0 + detection_threshold() / 100)
+
+def classify(market: MarketRecord, threshold: float) -> int:
+    if market.liquidity < settings.MIN_LIQUIDITY_USD:
+        return COLD
+    prices = [token.price for token in market.tokens if token.price > 0]
+    if len(prices) < 2:
+        return COLD
+    
+    gap = sum(prices) - threshold
+    if gap <= settings.SCHEDULER_HOT_GAP:
+        tier = HOT
+    elif gap <= settings.SCHEDULER_WARM_GAP:
+        tier = WARM
+    else:
+        tier = COLD
+    if tier != HOT and market.volume_24h >= settings.SCHEDULER_ACTIVE_VOLUME_USD:
+        tier -= 1
+    return tier
+
+class TierStats:
+    __slots__ = ("markets", "refreshes", "missed", "lateness_max", "interval_ewma")
+    
+    def __init__(self):
+        self.markets: int = 0
+        self.refreshes: int = 0
+        self.missed: int = 0
+        self.lateness_max: float = 0.0
+        self.interval_ewma: Optional[float] = None
+
+class ScanScheduler:
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._tier: Dict[str, int] = {}
+        self._last_refresh: Dict[str, float] = {}
+        self._version: Optional[Hashable] = None
+        self._started_at: float = time.monotonic()
+        self.tiers = [TierStats() for _ in TIERS]
+        self.ticks: int = 0
+        self.last_tick_markets: int = 0
+    
+    def __len__(self) -> int:
+        return len(self._tier)
+    
+    def _schedule(self, key: str, due: float):
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+    
+    def _set_tier(self, key: str, tier: int):
+        previous = self._tier.get(key)
+        if previous == tier:
+            return
+        if previous is not None:
+            self.tiers[previous].markets -= 1
+        self.tiers[tier].markets += 1
+        self._tier[key] = tier
+    
+    def _forget(self, key: str):
+        self._due.pop(key, None)
+        self._last_refresh.pop(key, None)
+        self.tiers[self._tier.pop(key)].markets -= 1
+    
+    def needs_sync(self, version: Hashable) -> bool:
+        return version != self._version
+    
+    def sync(self, markets: Mapping[str, MarketRecord], version: Hashable, now: Optional[float] = None):
+        if not self.needs_sync(version):
+            return
+        now = now or time.monotonic()
+        initial = self._version is None
+        self._version = version
+        
+        for key in [key for key in self._tier if key not in markets]:
+            self._forget(key)
+        
+        threshold = threshold_price_sum()
+        intervals = tier_intervals()
+        for key, market in markets.items():
+            if key in self._tier:
+                continue
+            tier = classify(market, threshold)
+            self._set_tier(key, tier)
+            # Markets present at startup were just scanned in full; spread their
+            # first deadlines over one period so tiers don't refresh in lockstep.
+            self._schedule(key, now + random.random() * intervals[tier] if initial else now)
+        
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(due, key) for key, due in self._due.items()]
+            heapq.heapify(self._heap)
+    
+    def pop_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+        now = now or time.monotonic()
+        limit = limit or settings.SCHEDULER_MAX_MARKETS_PER_TICK
+        keys = []
+        while self._heap and len(keys) < limit:
+            due, key = self._heap[0]
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            if self._due.get(key) != due:
+                continue
+            del self._due[key]
+            
+            lateness = now - due
+            stats = self.tiers[self._tier[key]]
+            if lateness > settings.SCHEDULER_TICK_SECONDS:
+                stats.missed += 1
+            if lateness > stats.lateness_max:
+                stats.lateness_max = lateness
+            keys.append(key)
+        
+        self.ticks += 1
+        self.last_tick_markets = len(keys)
+        return keys
+    
+    def complete(self, keys: List[str], markets: Mapping[str, MarketRecord], now: Optional[float] = None,
+                 pinned: AbstractSet[str] = frozenset()):
+        # Pinned markets back a live or held opportunity; they stay hot until it
+        # expires, however far their prices have moved from the threshold.
+        now = now or time.monotonic()
+        threshold = threshold_price_sum()
+        intervals = tier_intervals()
+        for key in keys:
+            if key not in self._tier:
+                continue
+            market = markets.get(key)
+            if market is None:
+                self._forget(key)
+                continue
+            stats = self.tiers[self._tier[key]]
+            stats.refreshes += 1
+            previous = self._last_refresh.get(key)
+            if previous is not None:
+                interval = now - previous
+                stats.interval_ewma = interval if stats.interval_ewma is None else 0.95 * stats.interval_ewma + 0.05 * interval
+            self._last_refresh[key] = now
+            
+            tier = HOT if key in pinned else classify(market, threshold)
+            self._set_tier(key, tier)
+            self._schedule(key, now + intervals[tier])
+    
+    def get_stats(self) -> dict:
+        elapsed = max(1e-9, time.monotonic() - self._started_at)
+        intervals = tier_intervals()
+        return {
+            "markets": len(self._tier),
+            "ticks": self.ticks,
+            "last_tick_markets": self.last_tick_markets,
+            "tiers": {
+                name: {
+                    "markets": stats.markets,
+                    "target_interval_seconds": intervals[i],
+                    "actual_interval_seconds": round(stats.interval_ewma, 3) if stats.interval_ewma is not None else None,
+                    "refreshes": stats.refreshes,
+                    "refreshes_per_second": round(stats.refreshes / elapsed, 2),
+                    "missed_deadlines": stats.missed,
+                    "max_lateness_seconds": round(stats.lateness_max, 3)
+                }
+                for i, (name, stats) in enumerate(zip(TIERS, self.tiers))
+            }
+        }
+
+scan_scheduler = ScanScheduler()
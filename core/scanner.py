@@ -1,21 +1,82 @@
 import asyncio
 import logging
 import time
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Set, Tuple
 
 from config import settings
 from core.market_fetcher import market_fetcher
-from core.arbitrage_detector import detect_arbitrage
-from models.market import Market
-from models.opportunity import Opportunity
-from models.database import (
-    save_opportunity, log_scan_start, log_scan_complete,
-    mark_opportunity_inactive, get_active_opportunities
+from core.market_catalog import market_catalog, market_token_ids
+from core.pipeline import Pipeline
+from core.arbitrage_detector import detect_arbitrage, generate_opportunity_id
+from core.batch_detector import detect_arbitrage_batch
+from core.cluster import cluster_node
+from core.depth_engine import depth_engine
+from core.event_index import event_index
+from core.lifecycle import opportunity_lifecycle
+from core.metrics import (
+    DB_WRITE_LATENCY, SCAN_DURATION, SCAN_MARKETS, SCAN_PHASE, SCANS, ScanTimer, loop_lag_monitor
 )
+from core.offload import process_offloader
+from core.opportunity_index import OpportunityIndex, opportunity_index
+from core.profiler import scan_profiler
+from core.scan_scheduler import scan_scheduler
+from core.snapshots import snapshot_recorder
+from models.market import MarketRecord
+from models.opportunity import Opportunity
+from core.write_behind import write_behind
+from models.database import delete_scans_before, log_scan_start, log_scan_complete
 
 logger = logging.getLogger(__name__)
 
+SCAN_HISTORY_PRUNE_SECONDS = 3600
+
+class ScanState:
+    def __init__(self):
+        self.opportunities: List[Opportunity] = []
+        self.opportunity_ids: Set[str] = set()
+        self.markets_scanned: int = 0
+        self.dirty_markets: int = 0
+        self.carried_over: int = 0
+        self.scan_id: Optional[int] = None
+        self.added: List[dict] = []
+        self.updated: List[dict] = []
+        self.removed: List[str] = []
+        self.scope: Optional[Set[str]] = None
+        self.timer = ScanTimer()
+        self.started_at: str = datetime.utcnow().isoformat()
+
+class TickWindow:
+    # Tiered ticks run every SCHEDULER_TICK_SECONDS; they share one scans row
+    # per window instead of writing one each.
+    def __init__(self, scan_id: int):
+        self.scan_id = scan_id
+        self.opened = time.monotonic()
+        self.ticks: int = 0
+        self.markets_scanned: int = 0
+        self.duration: float = 0.0
+        self.errors: int = 0
+        self.last_error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.loop_lag_max_ms: float = 0.0
+    
+    def add(self, markets_scanned: int, duration: float, error: Optional[str], phases: Dict[str, float], loop_lag_ms: float):
+        self.ticks += 1
+        self.markets_scanned += markets_scanned
+        self.duration += duration
+        if error:
+            self.errors += 1
+            self.last_error = error
+        for phase, ms in phases.items():
+            self.phases[phase] = round(self.phases.get(phase, 0.0) + ms, 2)
+        self.loop_lag_max_ms = max(self.loop_lag_max_ms, loop_lag_ms)
+    
+    @property
+    def error_message(self) -> Optional[str]:
+        if not self.errors:
+            return None
+        return f"{self.errors} of {self.ticks} ticks failed, last: {self.last_error}"
+
 class ArbitrageScanner:
     def __init__(self):
         self.is_running: bool = False
@@ -24,111 +85,492 @@ class ArbitrageScanner:
         self.scan_count: int = 0
         self.markets_scanned: int = 0
         self._scan_task: Optional[asyncio.Task] = None
+        self._catalog_task: Optional[asyncio.Task] = None
         self._websocket_callback = None
+        self._scan_complete_callback = None
+        self.scan_in_progress: bool = False
+        self._scan = ScanState()
+        self._last_prices: Dict[str, Tuple[float, ...]] = {}
+        self._last_prices_catalog_version: int = -1
+        self._ownership_version: Tuple[int, int] = (0, 0)
+        self._partition_index = OpportunityIndex()
+        self.last_dirty_markets: int = 0
+        self.last_phases: Dict[str, float] = {}
+        self.last_loop_lag_ms: float = 0.0
+        self._tick_window: Optional[TickWindow] = None
+        self._history_pruned_at: float = 0.0
+    
+    @property
+    def index(self) -> OpportunityIndex:
+        # In cluster mode the shared index is the coordinator's merged view.
+        return self._partition_index if cluster_node.enabled else opportunity_index
+    
+    def set_scan_complete_callback(self, callback):
+        self._scan_complete_callback = callback
+    
+    def last_price_state(self, key: str) -> Optional[Tuple[float, ...]]:
+        return self._last_prices.get(key)
+    
+    def restore(self, last_prices: Dict[str, Tuple[float, ...]], entries: List[dict], markets_scanned: int):
+        self._last_prices = last_prices
+        self._last_prices_catalog_version = market_catalog.version
+        now = time.monotonic()
+        for entry in entries:
+            opportunity = Opportunity(**entry)
+            self.active_opportunities[opportunity.id] = opportunity
+            opportunity_lifecycle.adopt(opportunity.id, now)
+        self.index.load(entries)
+        self.markets_scanned = markets_scanned
+        self.index.set_markets_scanned(markets_scanned)
     
     def set_websocket_callback(self, callback):
         self._websocket_callback = callback
     
-    async def run_single_scan(self) -> List[Opportunity]:
+    async def _iter_cached_batches(self) -> AsyncIterator[List[MarketRecord]]:
+        for batch in market_catalog.iter_batches(settings.PIPELINE_BATCH_SIZE):
+            yield batch
+    
+    async def _iter_scoped_batches(self, keys: List[str]) -> AsyncIterator[List[MarketRecord]]:
+        markets = [market_catalog.markets[key] for key in keys if key in market_catalog.markets]
+        for i in range(0, len(markets), settings.PIPELINE_BATCH_SIZE):
+            yield markets[i:i + settings.PIPELINE_BATCH_SIZE]
+    
+    async def _iter_owned_batches(self, source: AsyncIterator[List[MarketRecord]]) -> AsyncIterator[List[MarketRecord]]:
+        try:
+            async for batch in source:
+                owned = [market for market in batch if cluster_node.owns(market.key)]
+                if owned:
+                    yield owned
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+    
+    async def _iter_timed(self, source: AsyncIterator[List[MarketRecord]]) -> AsyncIterator[List[MarketRecord]]:
+        timer = self._scan.timer
+        iterator = source.__aiter__()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    batch = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    timer.add("pagination", time.perf_counter() - start)
+                yield batch
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+    
+    def _market_source(self, keys: Optional[List[str]] = None) -> AsyncIterator[List[MarketRecord]]:
+        if keys is not None and market_catalog.is_loaded:
+            return self._iter_scoped_batches(keys)
+        if market_catalog.is_loaded:
+            source = self._iter_cached_batches()
+        else:
+            source = market_catalog.stream_full_refresh()
+        return self._iter_owned_batches(source) if cluster_node.enabled else source
+    
+    def _owned_markets(self) -> Mapping[str, MarketRecord]:
+        if not cluster_node.enabled:
+            return market_catalog.markets
+        return {key: market for key, market in market_catalog.markets.items() if cluster_node.owns(key)}
+    
+    def _release_unowned(self):
+        if not cluster_node.enabled or self._ownership_version == cluster_node.ownership_version:
+            return
+        self._ownership_version = cluster_node.ownership_version
+        owned = self._owned_markets()
+        for key in [key for key in self._last_prices if key not in owned]:
+            del self._last_prices[key]
+        # Forget legs of markets handed off so a market that comes back is re-evaluated.
+        event_index.prune(owned)
+        for opp_id, opportunity in list(self.active_opportunities.items()):
+            if not cluster_node.owns(opportunity.markets_involved[0]):
+                self._retire(opp_id)
+    
+    async def _fetch_prices_stage(self, batch: List[MarketRecord]) -> Tuple[List[MarketRecord], Dict[str, Any]]:
+        token_ids = [tid for market in batch for tid in market_token_ids(market)]
+        prices = await market_fetcher.fetch_prices(token_ids) if token_ids else {}
+        return batch, prices
+    
+    async def _build_markets_stage(self, item: Tuple[List[MarketRecord], Dict[str, Any]]) -> Optional[List[MarketRecord]]:
+        batch, prices = item
+        self._scan.markets_scanned += len(batch)
+        return self._build_markets_inline(batch, prices)
+    
+    async def _evaluate_pooled_stage(self, item: Tuple[List[MarketRecord], Dict[str, Any]]) -> Optional[List[Opportunity]]:
+        batch, prices = item
+        self._scan.markets_scanned += len(batch)
+        
+        if market_catalog.is_loaded:
+            try:
+                return self._admit(await self._evaluate_pooled(batch, prices)) or None
+            except Exception as e:
+                logger.warning(f"Pool evaluation failed, processing batch inline: {e!r}")
+        markets = self._build_markets_inline(batch, prices)
+        return await self._detect_stage(markets) if markets else None
+    
+    def _build_markets_inline(self, batch: List[MarketRecord], prices: Dict[str, Any]) -> Optional[List[MarketRecord]]:
+        markets = []
+        
+        for market in batch:
+            try:
+                if market.liquidity < settings.MIN_LIQUIDITY_USD:
+                    continue
+                
+                if prices:
+                    for token in market.tokens:
+                        if token.token_id in prices:
+                            price_data = prices[token.token_id]
+                            if isinstance(price_data, dict):
+                                token.price = float(price_data.get("price", token.price) or token.price)
+                            elif isinstance(price_data, (int, float, str)):
+                                token.price = float(price_data)
+                
+                changed = self._mark_dirty(market)
+                if changed and settings.SNAPSHOTS_ENABLED:
+                    snapshot_recorder.record(self._scan.scan_id, self._scan.started_at, market)
+                if settings.INCREMENTAL_DETECTION and not changed:
+                    self._carry_over(market)
+                    continue
+                
+                if settings.EVENT_ARBITRAGE_ENABLED:
+                    event_index.update_market(market)
+                markets.append(market)
+            except Exception as e:
+                logger.warning(f"Error processing market: {e}")
+        
+        self._scan.dirty_markets += len(markets)
+        return markets or None
+    
+    async def _evaluate_pooled(self, batch: List[MarketRecord], prices: Dict[str, Any]) -> List[Opportunity]:
+        if self._scan.scope is not None:
+            changed, opportunities, carried = await process_offloader.scan_scoped(batch, prices, self._last_prices)
+        else:
+            changed, opportunities, carried = await process_offloader.scan_batch(
+                batch, prices, market_catalog.version, self._last_prices
+            )
+        
+        for pos, new_prices in changed:
+            market = batch[pos]
+            for token, price in zip(market.tokens, new_prices):
+                token.price = price
+            self._last_prices[market.key] = (market.liquidity, *new_prices)
+            if settings.SNAPSHOTS_ENABLED:
+                snapshot_recorder.record(self._scan.scan_id, self._scan.started_at, market)
+            if settings.EVENT_ARBITRAGE_ENABLED:
+                event_index.update_market(market)
+        
+        for pos in carried:
+            self._carry_over(batch[pos])
+        
+        self._scan.dirty_markets += len(changed)
+        return opportunities
+    
+    def _mark_dirty(self, market: MarketRecord) -> bool:
+        key = market.key
+        state = (market.liquidity, *(token.price for token in market.tokens))
+        if self._last_prices.get(key) == state:
+            return False
+        self._last_prices[key] = state
+        return True
+    
+    def _carry_over(self, market: MarketRecord):
+        opportunity = self.active_opportunities.get(generate_opportunity_id(market))
+        # An unchanged market whose opportunity was missed is still a miss.
+        if opportunity is None or opportunity_lifecycle.is_missing(opportunity.id):
+            return
+        self._scan.opportunities.append(opportunity)
+        self._scan.opportunity_ids.add(opportunity.id)
+        self._scan.carried_over += 1
+    
+    async def _prune_price_state(self):
+        if market_catalog.version == self._last_prices_catalog_version:
+            return
+        if process_offloader.is_running:
+            await process_offloader.prune(market_catalog.version)
+        self._last_prices_catalog_version = market_catalog.version
+        stale = [key for key in self._last_prices if key not in market_catalog.markets]
+        for key in stale:
+            del self._last_prices[key]
+        event_index.prune(market_catalog.markets)
+    
+    def _admit(self, opportunities: List[Opportunity]) -> List[Opportunity]:
+        now = time.monotonic()
+        return [opportunity for opportunity in opportunities if opportunity_lifecycle.admit(opportunity, now)]
+    
+    async def _detect_stage(self, markets: List[MarketRecord]) -> Optional[List[Opportunity]]:
+        if settings.DETECTION_MODE == "batch":
+            return self._admit(detect_arbitrage_batch(markets)) or None
+        
+        found = []
+        for market in markets:
+            try:
+                opportunity = detect_arbitrage(market)
+            except Exception as e:
+                logger.warning(f"Error processing market: {e}")
+                continue
+            if opportunity:
+                found.append(opportunity)
+        return self._admit(found) or None
+    
+    async def _depth_stage(self, opportunities: List[Opportunity]) -> List[Opportunity]:
+        await depth_engine.apply(opportunities)
+        return opportunities
+    
+    async def _persist_stage(self, opportunities: List[Opportunity]) -> List[Opportunity]:
+        for opportunity in opportunities:
+            data = opportunity.to_dict()
+            if not cluster_node.enabled:
+                write_behind.upsert(data)
+            entry = self.index.upsert(data)
+            if opportunity.id in self.active_opportunities:
+                self._scan.updated.append(entry)
+            else:
+                self._scan.added.append(entry)
+            self.active_opportunities[opportunity.id] = opportunity
+            self._scan.opportunities.append(opportunity)
+            self._scan.opportunity_ids.add(opportunity.id)
+        return opportunities
+    
+    async def _detect_events(self):
+        fresh, carried = event_index.evaluate()
+        fresh = self._admit(fresh)
+        
+        for opp_id in carried:
+            opportunity = self.active_opportunities.get(opp_id)
+            if (opportunity is not None and opp_id not in self._scan.opportunity_ids
+                    and not opportunity_lifecycle.is_missing(opp_id)):
+                self._scan.opportunities.append(opportunity)
+                self._scan.opportunity_ids.add(opp_id)
+                self._scan.carried_over += 1
+        
+        if not fresh:
+            return
+        if settings.DEPTH_ANALYSIS_ENABLED:
+            await self._depth_stage(fresh)
+        await self._persist_stage(fresh)
+    
+    def _build_pipeline(self, keys: Optional[List[str]] = None) -> Pipeline:
+        timed = self._scan.timer.timed
+        pipeline = (
+            Pipeline(self._iter_timed(self._market_source(keys)), queue_size=settings.PIPELINE_QUEUE_SIZE)
+            .add_stage("prices", timed("prices", self._fetch_prices_stage), workers=settings.PIPELINE_PRICE_WORKERS)
+        )
+        if settings.EXECUTION_MODE == "pool":
+            # Workers return finished opportunities, so nothing is detected on the loop.
+            pipeline.add_stage("build", timed("build", self._evaluate_pooled_stage), workers=process_offloader.workers)
+        else:
+            pipeline.add_stage("build", timed("build", self._build_markets_stage))
+            pipeline.add_stage("detect", timed("detect", self._detect_stage))
+        if settings.DEPTH_ANALYSIS_ENABLED:
+            pipeline.add_stage("depth", timed("depth", self._depth_stage), workers=settings.PIPELINE_PRICE_WORKERS)
+        return pipeline.add_stage("persist", timed("persist", self._persist_stage))
+    
+    def _retire(self, opp_id: str):
+        del self.active_opportunities[opp_id]
+        opportunity_lifecycle.forget(opp_id)
+        self._scan.removed.append(opp_id)
+        self.index.remove(opp_id)
+        if not cluster_node.enabled:
+            write_behind.expire(opp_id)
+    
+    def _opportunity_markets(self) -> Set[str]:
+        return {
+            opportunity.markets_involved[0]
+            for opportunity in self.active_opportunities.values()
+            if len(opportunity.markets_involved) == 1
+        }
+    
+    def _expired_ids(self) -> Set[str]:
+        current_opp_ids = self._scan.opportunity_ids
+        scope = self._scan.scope
+        expired = set()
+        for opp_id, opportunity in self.active_opportunities.items():
+            if opp_id in current_opp_ids:
+                continue
+            # Out-of-scope single-market opportunities were not re-evaluated this
+            # tick, unless their market left the catalog; event opportunities are
+            # always accounted for by the event index.
+            if scope is not None and len(opportunity.markets_involved) == 1:
+                key = opportunity.markets_involved[0]
+                if key not in scope and key in market_catalog.markets:
+                    continue
+            expired.add(opp_id)
+        return expired
+    
+    async def run_single_scan(self, keys: Optional[List[str]] = None) -> List[Opportunity]:
+        if not scan_profiler.armed:
+            return await self._run_scan(keys)
+        scan_profiler.begin_scan()
+        try:
+            return await self._run_scan(keys)
+        finally:
+            scan_profiler.end_scan(self._scan.scan_id)
+    
+    async def _run_scan(self, keys: Optional[List[str]] = None) -> List[Opportunity]:
         start_time = time.time()
-        scan_id = await log_scan_start()
-        opportunities_found: List[Opportunity] = []
+        self.scan_in_progress = True
+        self._scan = ScanState()
+        timer = self._scan.timer
+        scoped = keys is not None and market_catalog.is_loaded
+        with timer.span("db"):
+            scan_id = await self._open_history(scoped)
+        self._scan.scan_id = scan_id
+        if scoped:
+            self._scan.scope = set(keys)
+        log = logger.debug if scoped else logger.info
+        opportunities_found = self._scan.opportunities
+        flushed_before = write_behind.flush_seconds_total
         error_msg = None
         
         try:
-            logger.info("Starting market scan...")
-            
-            raw_markets = await market_fetcher.fetch_all_markets()
-            
-            token_ids = []
-            for m in raw_markets:
-                tokens = m.get("tokens", [])
-                for t in tokens:
-                    tid = t.get("token_id")
-                    if tid:
-                        token_ids.append(str(tid))
+            log("Starting market scan...")
+            self._release_unowned()
             
-            prices = {}
-            if token_ids:
-                prices = await market_fetcher.fetch_prices(token_ids)
-            
-            current_opp_ids = set()
-            
-            for raw in raw_markets:
+            if settings.EVENT_ARBITRAGE_ENABLED and not event_index.is_loaded:
                 try:
-                    market = Market.from_api(raw)
-                    
-                    if market.liquidity < settings.MIN_LIQUIDITY_USD:
-                        continue
-                    
-                    if prices:
-                        for token in market.tokens:
-                            if token.token_id in prices:
-                                price_data = prices[token.token_id]
-                                if isinstance(price_data, dict):
-                                    token.price = float(price_data.get("price", token.price) or token.price)
-                                elif isinstance(price_data, (int, float, str)):
-                                    token.price = float(price_data)
-                    
-                    opportunity = detect_arbitrage(market)
-                    if opportunity:
-                        opportunities_found.append(opportunity)
-                        current_opp_ids.add(opportunity.id)
-                        
-                        await save_opportunity(opportunity.to_dict())
-                        
-                        self.active_opportunities[opportunity.id] = opportunity
-                        
-                        if self._websocket_callback:
-                            await self._websocket_callback({
-                                "type": "new_opportunity",
-                                "data": opportunity.to_dict()
-                            })
-                
+                    with timer.span("events_refresh"):
+                        await event_index.refresh()
                 except Exception as e:
-                    logger.warning(f"Error processing market: {e}")
-                    continue
+                    logger.error(f"Event index refresh failed: {e}")
+            
+            with timer.span("pipeline"):
+                await self._build_pipeline(keys).run()
+            if settings.EVENT_ARBITRAGE_ENABLED:
+                with timer.span("event_detect"):
+                    await self._detect_events()
             
-            expired_ids = set(self.active_opportunities.keys()) - current_opp_ids
-            for opp_id in expired_ids:
-                await mark_opportunity_inactive(opp_id)
-                del self.active_opportunities[opp_id]
-                if self._websocket_callback:
-                    await self._websocket_callback({
-                        "type": "opportunity_expired",
-                        "opportunity_id": opp_id
-                    })
+            with timer.span("retire"):
+                now = time.monotonic()
+                for opp_id in self._expired_ids():
+                    if opportunity_lifecycle.miss(opp_id, now):
+                        self._retire(opp_id)
+                write_behind.flush_soon()
+                await self._prune_price_state()
             
-            self.markets_scanned = len(raw_markets)
+            self.markets_scanned = self._scan.markets_scanned
+            self.index.set_markets_scanned(len(market_catalog) if scoped else self.markets_scanned)
+            self.last_dirty_markets = self._scan.dirty_markets
             self.scan_count += 1
             self.last_scan_at = datetime.utcnow()
             
-            logger.info(f"Scan complete: {self.markets_scanned} markets, {len(opportunities_found)} opportunities")
-            
+            log(
+                f"Scan complete: {self.markets_scanned} markets ({self._scan.dirty_markets} changed), "
+                f"{len(opportunities_found)} opportunities ({self._scan.carried_over} unchanged)"
+            )
+        
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Scan failed: {e}")
         
-        duration_ms = int((time.time() - start_time) * 1000)
-        await log_scan_complete(
-            scan_id,
-            self.markets_scanned,
-            len(opportunities_found),
-            duration_ms,
-            error_msg
-        )
+        unchanged = not (self._scan.added or self._scan.updated or self._scan.removed)
+        if self._websocket_callback and not (scoped and unchanged):
+            with timer.span("broadcast"):
+                await self._websocket_callback({
+                    "type": "delta",
+                    "added": self._scan.added,
+                    "updated": self._scan.updated,
+                    "removed": self._scan.removed,
+                    "summary": self.index.summary(),
+                    "scan": {
+                        "markets": self.markets_scanned,
+                        "opportunities": len(self.active_opportunities) if scoped else len(opportunities_found),
+                        "completed_at": datetime.utcnow().isoformat()
+                    }
+                })
         
-        if self._websocket_callback:
-            await self._websocket_callback({
-                "type": "scan_complete",
-                "data": {
-                    "markets": self.markets_scanned,
-                    "opportunities": len(opportunities_found)
-                }
-            })
+        # Write-behind flushes run in the background; count the time they held
+        # the writer while this scan was in flight.
+        timer.add("db_flush", write_behind.flush_seconds_total - flushed_before)
+        duration = time.time() - start_time
+        self.last_loop_lag_ms = round(loop_lag_monitor.take_window_max() * 1000, 2)
+        self._record_metrics(duration, scoped, error_msg)
+        await self._record_history(scan_id, len(opportunities_found), duration, error_msg)
         
+        self.scan_in_progress = False
+        if self._scan_complete_callback:
+            self._scan_complete_callback()
         return opportunities_found
     
+    async def _open_history(self, scoped: bool) -> int:
+        if not scoped:
+            with DB_WRITE_LATENCY.time("scans"):
+                return await log_scan_start()
+        if self._tick_window is None:
+            with DB_WRITE_LATENCY.time("scans"):
+                self._tick_window = TickWindow(await log_scan_start("ticks"))
+        return self._tick_window.scan_id
+    
+    async def _record_history(self, scan_id: int, opportunities_found: int, duration: float, error: Optional[str]):
+        window = self._tick_window
+        if self._scan.scope is None:
+            with DB_WRITE_LATENCY.time("scans"):
+                await log_scan_complete(
+                    scan_id,
+                    self.markets_scanned,
+                    opportunities_found,
+                    int(duration * 1000),
+                    error,
+                    self.last_phases,
+                    self.last_loop_lag_ms
+                )
+        elif window is not None and window.scan_id == scan_id:
+            window.add(self._scan.markets_scanned, duration, error, self.last_phases, self.last_loop_lag_ms)
+            if time.monotonic() - window.opened >= settings.SCHEDULER_HISTORY_WINDOW_SECONDS:
+                await self.close_tick_window()
+        
+        if time.monotonic() - self._history_pruned_at >= SCAN_HISTORY_PRUNE_SECONDS:
+            self._history_pruned_at = time.monotonic()
+            cutoff = datetime.utcnow() - timedelta(days=settings.SCAN_HISTORY_RETENTION_DAYS)
+            removed = await delete_scans_before(cutoff.isoformat())
+            if removed:
+                logger.info(f"Pruned {removed} scan history rows older than {settings.SCAN_HISTORY_RETENTION_DAYS} days")
+    
+    async def close_tick_window(self):
+        window, self._tick_window = self._tick_window, None
+        if window is None:
+            return
+        with DB_WRITE_LATENCY.time("scans"):
+            await log_scan_complete(
+                window.scan_id,
+                window.markets_scanned,
+                len(self.active_opportunities),
+                int(window.duration * 1000),
+                window.error_message,
+                window.phases,
+                window.loop_lag_max_ms,
+                window.ticks
+            )
+    
+    def _record_metrics(self, duration: float, scoped: bool, error: Optional[str]):
+        phases = self._scan.timer.phases
+        for phase, seconds in phases.items():
+            SCAN_PHASE.observe(seconds, phase)
+        SCAN_DURATION.observe(duration, "scoped" if scoped else "full")
+        SCANS.inc("error" if error else "completed")
+        SCAN_MARKETS.set(self._scan.markets_scanned, "scanned")
+        SCAN_MARKETS.set(self._scan.dirty_markets, "changed")
+        self.last_phases = self._scan.timer.as_ms()
+    
+    async def _catalog_refresh_loop(self):
+        # A catalog restored from a checkpoint is re-fetched in full right away,
+        # while scans already run on the cached copy.
+        delay = 0.0 if market_catalog.restored else settings.CATALOG_REFRESH_SECONDS
+        while self.is_running:
+            await asyncio.sleep(delay)
+            delay = settings.CATALOG_REFRESH_SECONDS
+            try:
+                full = market_catalog.full_refresh_due()
+                await market_catalog.refresh(full=full)
+                if full and settings.EVENT_ARBITRAGE_ENABLED:
+                    await event_index.refresh()
+            except Exception as e:
+                logger.error(f"Catalog refresh failed: {e}")
+    
     async def start_continuous_scanning(self):
         if self.is_running:
             logger.warning("Scanner already running")
@@ -137,20 +579,53 @@ class ArbitrageScanner:
         self.is_running = True
         logger.info("Starting continuous scanning...")
         
+        self._catalog_task = asyncio.create_task(self._catalog_refresh_loop())
+        
+        if settings.SCAN_SCHEDULER == "tiered":
+            await self._run_tiered()
+            return
+        
         while self.is_running:
+            started = time.monotonic()
             try:
                 await self.run_single_scan()
             except Exception as e:
                 logger.error(f"Error in scan loop: {e}")
             
             if self.is_running:
-                await asyncio.sleep(settings.SCAN_INTERVAL_SECONDS)
+                await asyncio.sleep(max(0.0, settings.SCAN_INTERVAL_SECONDS - (time.monotonic() - started)))
+    
+    async def _run_tiered(self):
+        while self.is_running:
+            started = time.monotonic()
+            keys = None
+            try:
+                if not market_catalog.is_loaded:
+                    await self.run_single_scan()
+                else:
+                    version = (market_catalog.version, cluster_node.ownership_version)
+                    if scan_scheduler.needs_sync(version):
+                        scan_scheduler.sync(self._owned_markets(), version)
+                    keys = scan_scheduler.pop_due()
+                    if keys:
+                        await self.run_single_scan(keys)
+            except Exception as e:
+                logger.error(f"Error in scan loop: {e}")
+            finally:
+                if keys:
+                    scan_scheduler.complete(keys, market_catalog.markets, pinned=self._opportunity_markets())
+            
+            if self.is_running:
+                await asyncio.sleep(max(0.0, settings.SCHEDULER_TICK_SECONDS - (time.monotonic() - started)))
     
     def stop(self):
         self.is_running = False
         if self._scan_task:
             self._scan_task.cancel()
             self._scan_task = None
+        if self._catalog_task:
+            self._catalog_task.cancel()
+            self._catalog_task = None
         logger.info("Scanner stopped")
     
     def get_status(self) -> dict:
@@ -159,7 +634,13 @@ class ArbitrageScanner:
             "last_scan_at": self.last_scan_at.isoformat() if self.last_scan_at else None,
             "scan_count": self.scan_count,
             "markets_scanned": self.markets_scanned,
-            "active_opportunities_count": len(self.active_opportunities)
+            "dirty_markets": self.last_dirty_markets,
+            "last_scan_phases_ms": self.last_phases,
+            "last_scan_loop_lag_ms": self.last_loop_lag_ms,
+            "scheduler": scan_scheduler.get_stats() if settings.SCAN_SCHEDULER == "tiered" else None,
+            "active_opportunities_count": len(self.active_opportunities),
+            "lifecycle": opportunity_lifecycle.get_stats(),
+            "catalog": market_catalog.get_status()
         }
 
 scanner = ArbitrageScanner()
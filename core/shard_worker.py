@@ -0,0 +1,100 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.arbitrage_detector import build_opportunity
+from models.market import MarketRecord, TokenRecord
+
+# Runs inside pool worker processes. Workers rebuild the shard's market
+# records from plain columns, apply prices to them and build the opportunities,
+# so the parent only writes changed prices back and admits what comes out.
+
+class ShardState:
+    __slots__ = ("version", "markets", "last", "had_opportunity")
+    
+    def __init__(self, version: int, listings: List[tuple], tokens: List[Tuple[tuple, ...]],
+                 last: List[Optional[tuple]]):
+        self.version = version
+        self.markets = [
+            MarketRecord(id, question, condition_id, slug, [TokenRecord(*token) for token in market_tokens],
+                         0.0, liquidity, False, event_title)
+            for (id, question, condition_id, slug, event_title, liquidity), market_tokens in zip(listings, tokens)
+        ]
+        # Seeded from the parent's last-seen prices; an unchanged seeded market
+        # is reported as carried and the parent keeps whatever it already had.
+        self.last = last
+        self.had_opportunity: List[bool] = [state is not None for state in last]
+    
+    def inherit(self, previous: "ShardState"):
+        positions = {market.key: pos for pos, market in enumerate(previous.markets)}
+        for pos, market in enumerate(self.markets):
+            old = positions.get(market.key)
+            if old is not None and previous.last[old] is not None:
+                self.last[pos] = previous.last[old]
+                self.had_opportunity[pos] = previous.had_opportunity[old]
+
+_shards: Dict[str, ShardState] = {}
+
+def _parse_price(price_data, current: float) -> float:
+    if price_data is None:
+        return current
+    if isinstance(price_data, dict):
+        return float(price_data.get("price", current) or current)
+    if isinstance(price_data, (int, float, str)):
+        return float(price_data)
+    return current
+
+def scan_shard(shard_id: str, version: int, static: Optional[tuple], prices: dict, params: tuple):
+    start = time.perf_counter()
+    shard = _shards.get(shard_id)
+    if static is not None:
+        fresh = ShardState(version, *static)
+        if shard is not None:
+            fresh.inherit(shard)
+        shard = _shards[shard_id] = fresh
+    elif shard is None or shard.version != version:
+        return None
+    return (*_evaluate(shard, prices, params), time.perf_counter() - start)
+
+def scan_once(static: tuple, prices: dict, params: tuple):
+    # Scoped batches differ every tick; evaluate them against the parent's
+    # price state without keeping a shard around.
+    start = time.perf_counter()
+    shard = ShardState(0, *static)
+    return (*_evaluate(shard, prices, params), time.perf_counter() - start)
+
+def _evaluate(shard: ShardState, prices: dict, params: tuple):
+    min_liquidity, min_profit, fee, incremental = params
+    changed = []
+    opportunities = []
+    carried = []
+    
+    for pos, market in enumerate(shard.markets):
+        if market.liquidity < min_liquidity:
+            continue
+        
+        if prices:
+            for token in market.tokens:
+                token.price = _parse_price(prices.get(token.token_id), token.price)
+        current = tuple(token.price for token in market.tokens)
+        
+        state = (market.liquidity, *current)
+        if incremental and shard.last[pos] == state:
+            if shard.had_opportunity[pos]:
+                carried.append(pos)
+            continue
+        shard.last[pos] = state
+        changed.append((pos, current))
+        
+        opportunity = build_opportunity(market, fee, min_profit)
+        shard.had_opportunity[pos] = opportunity is not None
+        if opportunity is not None:
+            opportunities.append(opportunity)
+    
+    return changed, opportunities, carried
+
+def drop_shards(live_shard_ids: Sequence[str]) -> int:
+    live = set(live_shard_ids)
+    stale = [shard_id for shard_id in _shards if shard_id not in live]
+    for shard_id in stale:
+        del _shards[shard_id]
+    return len(stale)
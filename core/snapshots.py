@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from config import settings
+from core.metrics import DB_WRITE_LATENCY
+from models.database import (
+    insert_market_snapshots, get_latest_snapshot_time,
+    rollup_market_snapshots, delete_market_snapshots_before
+)
+from models.market import MarketRecord
+
+logger = logging.getLogger(__name__)
+
+RAW_RESOLUTION = 1
+ROLLUPS = (
+    (RAW_RESOLUTION, 60, "%Y-%m-%dT%H:%M:00"),
+    (60, 3600, "%Y-%m-%dT%H:00:00")
+)
+
+def pack_prices(prices: Sequence[float]) -> bytes:
+    return array("d", prices).tobytes()
+
+def unpack_prices(blob: Optional[bytes]) -> List[float]:
+    if not blob:
+        return []
+    values = array("d")
+    values.frombytes(blob)
+    return values.tolist()
+
+def _retention(resolution: int) -> timedelta:
+    if resolution == RAW_RESOLUTION:
+        return timedelta(hours=settings.SNAPSHOT_RAW_RETENTION_HOURS)
+    if resolution == 60:
+        return timedelta(days=settings.SNAPSHOT_MINUTE_RETENTION_DAYS)
+    return timedelta(days=settings.SNAPSHOT_HOUR_RETENTION_DAYS)
+
+class SnapshotRecorder:
+    def __init__(self):
+        self._buffer: List[tuple] = []
+        self._task: Optional[asyncio.Task] = None
+        self._running: bool = False
+        self._stopping = asyncio.Event()
+        self._rolled_up_to: Dict[int, str] = {}
+        self._last_maintenance: float = 0.0
+        self.recorded: int = 0
+        self.written: int = 0
+        self.dropped: int = 0
+        self.flushes: int = 0
+        self.rolled_up: int = 0
+        self.deleted: int = 0
+        self.last_flush_ms: float = 0.0
+    
+    def record(self, scan_id: Optional[int], snapshot_at: str, market: MarketRecord):
+        if len(self._buffer) >= settings.SNAPSHOT_MAX_BUFFERED_ROWS:
+            self.dropped += 1
+            return
+        prices = [token.price for token in market.tokens]
+        self._buffer.append((
+            scan_id,
+            market.key,
+            sum(prices),
+            pack_prices(prices),
+            market.volume_24h,
+            market.liquidity,
+            snapshot_at
+        ))
+        self.recorded += 1
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        self._running = False
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+            self._stopping.clear()
+        await self.flush()
+    
+    async def flush(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        start = time.perf_counter()
+        try:
+            await insert_market_snapshots(rows)
+        except Exception as e:
+            logger.error(f"Snapshot flush failed ({len(rows)} rows): {e}")
+            room = settings.SNAPSHOT_MAX_BUFFERED_ROWS - len(self._buffer)
+            self.dropped += max(0, len(rows) - room)
+            self._buffer = rows[:max(0, room)] + self._buffer
+            return
+        elapsed = time.perf_counter() - start
+        DB_WRITE_LATENCY.observe(elapsed, "snapshots")
+        self.flushes += 1
+        self.written += len(rows)
+        self.last_flush_ms = round(elapsed * 1000, 2)
+    
+    async def _rollup(self, source: int, target: int, bucket_format: str, now: datetime):
+        start = self._rolled_up_to.get(target)
+        if start is None:
+            latest = await get_latest_snapshot_time(target)
+            start = (datetime.fromisoformat(latest) + timedelta(seconds=target)).isoformat() if latest else ""
+        end = now.strftime(bucket_format)
+        if start and start >= end:
+            self._rolled_up_to[target] = start
+            return
+        
+        self.rolled_up += await rollup_market_snapshots(source, target, bucket_format, start, end)
+        self._rolled_up_to[target] = end
+    
+    async def maintain(self, now: Optional[datetime] = None):
+        now = now or datetime.utcnow()
+        for source, target, bucket_format in ROLLUPS:
+            await self._rollup(source, target, bucket_format, now)
+        
+        for source, target, _ in ROLLUPS:
+            cutoff = min((now - _retention(source)).isoformat(), self._rolled_up_to[target])
+            self.deleted += await delete_market_snapshots_before(source, cutoff)
+        final = ROLLUPS[-1][1]
+        self.deleted += await delete_market_snapshots_before(final, (now - _retention(final)).isoformat())
+    
+    async def _run(self):
+        while self._running:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.SNAPSHOT_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            if not self._running:
+                break
+            if time.monotonic() - self._last_maintenance < settings.SNAPSHOT_ROLLUP_INTERVAL_SECONDS:
+                continue
+            self._last_maintenance = time.monotonic()
+            try:
+                await self.maintain()
+            except Exception as e:
+                logger.error(f"Snapshot maintenance failed: {e}")
+    
+    def get_stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "rolled_up": self.rolled_up,
+            "deleted": self.deleted,
+            "last_flush_ms": self.last_flush_ms
+        }
+
+snapshot_recorder = SnapshotRecorder()
@@ -0,0 +1,252 @@
+import asyncio
+import gc
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from core.event_index import EventGroup, event_index
+from core.market_catalog import market_catalog
+from core.scanner import scanner
+from core.write_behind import write_behind
+from models.database import get_active_opportunity_ids
+from models.market import MarketRecord, TokenRecord
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PMWS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sII")
+
+# Fixed-width columns are raw arrays; strings are one JSON blob per section.
+SECTIONS = ("listings", "token_offsets", "prices", "liquidity", "priced_liquidity", "events", "opportunities")
+
+class CheckpointState:
+    def __init__(self, markets: List[MarketRecord], prices: array, priced_liquidity: array,
+                 events: List[EventGroup], opportunities: List[dict], meta: dict):
+        self.markets = markets
+        self.prices = prices
+        self.priced_liquidity = priced_liquidity
+        self.events = events
+        self.opportunities = opportunities
+        self.meta = meta
+
+def _encode_listings(markets: List[MarketRecord]) -> Tuple[bytes, bytes, bytes]:
+    offsets = array("I", [0])
+    for market in markets:
+        offsets.append(offsets[-1] + len(market.tokens))
+    listings = {
+        "markets": [
+            [m.id, m.question, m.condition_id, m.slug, m.volume_24h, m.closed, m.event_title] for m in markets
+        ],
+        "token_ids": [token.token_id for market in markets for token in market.tokens],
+        "outcomes": [token.outcome for market in markets for token in market.tokens]
+    }
+    liquidity = array("d", [market.liquidity for market in markets])
+    return json.dumps(listings, separators=(",", ":")).encode(), offsets.tobytes(), liquidity.tobytes()
+
+def _encode(state: CheckpointState, listings: Tuple[bytes, bytes, bytes]) -> bytes:
+    events = [[e.id, e.title, e.slug, e.neg_risk, e.members] for e in state.events]
+    blobs = {
+        "listings": listings[0],
+        "token_offsets": listings[1],
+        "prices": state.prices.tobytes(),
+        "liquidity": listings[2],
+        "priced_liquidity": state.priced_liquidity.tobytes(),
+        "events": json.dumps(events, separators=(",", ":")).encode(),
+        "opportunities": json.dumps(state.opportunities, separators=(",", ":"), default=str).encode()
+    }
+    meta = {**state.meta, "sections": [[name, len(blobs[name])] for name in SECTIONS]}
+    encoded_meta = json.dumps(meta).encode()
+    return b"".join([HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded_meta)), encoded_meta, *(blobs[name] for name in SECTIONS)])
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _read(path: str) -> Optional[Tuple[dict, Dict[str, bytes]]]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, meta_size = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+        offset = HEADER.size + meta_size
+        meta = json.loads(mm[HEADER.size:offset])
+        blobs = {}
+        for name, size in meta["sections"]:
+            blobs[name] = mm[offset:offset + size]
+            offset += size
+        return meta, blobs
+
+def _column(typecode: str, blob: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(blob)
+    return values
+
+def _decode_markets(blobs: Dict[str, bytes]) -> Tuple[Dict[str, MarketRecord], Dict[str, Tuple[float, ...]]]:
+    offsets = _column("I", blobs["token_offsets"])
+    prices = _column("d", blobs["prices"])
+    liquidity = _column("d", blobs["liquidity"])
+    priced_liquidity = _column("d", blobs["priced_liquidity"])
+    listings = json.loads(blobs["listings"])
+    tokens = list(map(TokenRecord, listings["token_ids"], map(sys.intern, listings["outcomes"]), prices))
+    markets: Dict[str, MarketRecord] = {}
+    last_prices: Dict[str, Tuple[float, ...]] = {}
+    for i, (market_id, question, condition_id, slug, volume, closed, event_title) in enumerate(listings["markets"]):
+        start, end = offsets[i], offsets[i + 1]
+        market = MarketRecord(market_id, question, condition_id, slug, tokens[start:end], volume, liquidity[i], closed, event_title)
+        markets[market.key] = market
+        if not math.isnan(priced_liquidity[i]):
+            last_prices[market.key] = (priced_liquidity[i], *prices[start:end])
+    return markets, last_prices
+
+class WarmStart:
+    def __init__(self):
+        self.path: str = settings.WARM_START_PATH
+        self._task: Optional[asyncio.Task] = None
+        self._last_checkpoint: float = time.monotonic()
+        self._listings_version: int = -1
+        self._listings: Optional[Tuple[bytes, bytes, bytes]] = None
+        self.restored: Optional[dict] = None
+        self.checkpoints: int = 0
+        self.failed_checkpoints: int = 0
+        self.last_checkpoint_at: Optional[str] = None
+        self.last_checkpoint_ms: float = 0.0
+        self.last_checkpoint_bytes: int = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return settings.WARM_START_ENABLED and not settings.CLUSTER_ENABLED
+    
+    async def restore(self) -> bool:
+        if not self.enabled or not os.path.exists(self.path):
+            return False
+        start = time.perf_counter()
+        try:
+            loaded = _read(self.path)
+            if loaded is None:
+                logger.warning(f"Ignoring warm-start checkpoint {self.path}: unknown format")
+                return False
+            meta, blobs = loaded
+            age = time.time() - meta["saved_at"]
+            if age > settings.WARM_START_MAX_AGE_SECONDS:
+                logger.info(f"Ignoring warm-start checkpoint {self.path}: {age:.0f}s old")
+                return False
+            # Restoring allocates a few objects per market and token; cyclic GC
+            # passes over that growing heap would dominate the load time.
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                markets, last_prices = _decode_markets(blobs)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+            events = [EventGroup(*fields) for fields in json.loads(blobs["events"])]
+            opportunities = json.loads(blobs["opportunities"])
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logger.error(f"Failed to read warm-start checkpoint {self.path}: {e}")
+            return False
+        
+        market_catalog.restore(markets, meta["catalog_version"], datetime.fromisoformat(meta["catalog_refreshed_at"]))
+        if events:
+            event_index.restore(events, (markets[key] for key in last_prices), opportunities)
+        scanner.restore(last_prices, opportunities, meta["markets_scanned"])
+        
+        # Rows still marked active from before the restart that the checkpoint
+        # does not vouch for would otherwise never expire.
+        restored_ids = {opportunity["id"] for opportunity in opportunities}
+        stale = [opp_id for opp_id in await get_active_opportunity_ids() if opp_id not in restored_ids]
+        for opp_id in stale:
+            write_behind.expire(opp_id)
+        
+        self.restored = {
+            "saved_at": datetime.utcfromtimestamp(meta["saved_at"]).isoformat(),
+            "age_seconds": round(age, 1),
+            "markets": len(markets),
+            "priced_markets": len(last_prices),
+            "events": len(events),
+            "opportunities": len(opportunities),
+            "expired_stale": len(stale),
+            "restore_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        logger.info(
+            f"Warm start: {len(markets)} markets, {len(opportunities)} opportunities from a checkpoint "
+            f"{age:.0f}s old in {self.restored['restore_ms']} ms"
+        )
+        return True
+    
+    def _capture(self) -> CheckpointState:
+        keys = list(market_catalog.markets)
+        markets = list(market_catalog.markets.values())
+        prices = array("d", [token.price for market in markets for token in market.tokens])
+        states = map(scanner.last_price_state, keys)
+        priced_liquidity = array("d", [state[0] if state is not None else math.nan for state in states])
+        meta = {
+            "saved_at": time.time(),
+            "catalog_version": market_catalog.version,
+            "catalog_refreshed_at": (market_catalog.last_full_refresh_at or datetime.utcnow()).isoformat(),
+            "markets_scanned": scanner.markets_scanned
+        }
+        return CheckpointState(
+            markets, prices, priced_liquidity, list(event_index.events.values()), scanner.index.entries(), meta
+        )
+    
+    def after_scan(self):
+        # Runs between scans, when prices, opportunities and the catalog agree.
+        if not self.enabled or not market_catalog.is_loaded:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        if time.monotonic() - self._last_checkpoint < settings.WARM_START_CHECKPOINT_SECONDS:
+            return
+        self._last_checkpoint = time.monotonic()
+        self._task = asyncio.create_task(self._checkpoint(self._capture()))
+    
+    async def _checkpoint(self, state: CheckpointState):
+        start = time.perf_counter()
+        try:
+            if self._listings_version != state.meta["catalog_version"] or self._listings is None:
+                # Listings only change with the catalog version; prices are re-encoded every time.
+                self._listings = await asyncio.to_thread(_encode_listings, state.markets)
+                self._listings_version = state.meta["catalog_version"]
+            data = await asyncio.to_thread(_encode, state, self._listings)
+            await asyncio.to_thread(_write_atomic, self.path, data)
+        except Exception as e:
+            self.failed_checkpoints += 1
+            logger.error(f"Warm-start checkpoint failed: {e}")
+            return
+        self.checkpoints += 1
+        self.last_checkpoint_at = datetime.utcnow().isoformat()
+        self.last_checkpoint_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.last_checkpoint_bytes = len(data)
+    
+    async def stop(self):
+        if self._task is not None:
+            await self._task
+            self._task = None
+        # A scan cut off by shutdown leaves state half-applied; keep the last good checkpoint.
+        if self.enabled and market_catalog.is_loaded and not scanner.scan_in_progress:
+            await self._checkpoint(self._capture())
+    
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "restored": self.restored,
+            "checkpoints": self.checkpoints,
+            "failed_checkpoints": self.failed_checkpoints,
+            "last_checkpoint_at": self.last_checkpoint_at,
+            "last_checkpoint_ms": self.last_checkpoint_ms,
+            "last_checkpoint_bytes": self.last_checkpoint_bytes
+        }
+
+warm_start = WarmStart()
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from core.metrics import DB_WRITE_LATENCY
+from models.database import opportunity_row, write_opportunity_batch
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindQueue:
+    def __init__(self):
+        self._upserts: Dict[str, Tuple[dict, str, int]] = {}
+        self._expirations: Dict[str, str] = {}
+        self._oldest_pending: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        self._running: bool = False
+        self.flushes: int = 0
+        self.rows_written: int = 0
+        self.failed_flushes: int = 0
+        self.last_flush_ms: float = 0.0
+        self.flush_seconds_total: float = 0.0
+    
+    @property
+    def pending(self) -> int:
+        return len(self._upserts) + len(self._expirations)
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        self._running = False
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        while self.pending:
+            await self._flush_once()
+        self._idle.set()
+    
+    def _touch(self):
+        self._idle.clear()
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+        if self.pending >= settings.DB_FLUSH_MAX_ROWS:
+            self._wakeup.set()
+        if not self._running:
+            self.start()
+    
+    def upsert(self, opportunity: dict):
+        opp_id = opportunity["id"]
+        self._expirations.pop(opp_id, None)
+        previous = self._upserts.get(opp_id)
+        count = previous[2] + 1 if previous else 1
+        self._upserts[opp_id] = (opportunity, datetime.utcnow().isoformat(), count)
+        self._touch()
+    
+    def expire(self, opp_id: str):
+        self._expirations[opp_id] = datetime.utcnow().isoformat()
+        self._touch()
+    
+    def flush_soon(self):
+        if self.pending:
+            self._wakeup.set()
+    
+    async def wait_idle(self):
+        self.flush_soon()
+        await self._idle.wait()
+    
+    def _take_batch(self) -> Tuple[Dict[str, Tuple[dict, str, int]], Dict[str, str]]:
+        limit = settings.DB_FLUSH_MAX_ROWS
+        if self.pending <= limit:
+            upserts, expirations = self._upserts, self._expirations
+            self._upserts, self._expirations = {}, {}
+            return upserts, expirations
+        
+        upserts = {}
+        for opp_id in list(self._upserts)[:limit]:
+            upserts[opp_id] = self._upserts.pop(opp_id)
+        expirations = {}
+        for opp_id in list(self._expirations)[:max(0, limit - len(upserts))]:
+            expirations[opp_id] = self._expirations.pop(opp_id)
+        return upserts, expirations
+    
+    def _restore(self, upserts: Dict[str, Tuple[dict, str, int]], expirations: Dict[str, str]):
+        for opp_id, (opportunity, seen_at, count) in upserts.items():
+            newer = self._upserts.get(opp_id)
+            if newer is not None:
+                self._upserts[opp_id] = (newer[0], newer[1], newer[2] + count)
+            elif opp_id not in self._expirations:
+                self._upserts[opp_id] = (opportunity, seen_at, count)
+        for opp_id, expired_at in expirations.items():
+            if opp_id not in self._upserts:
+                self._expirations.setdefault(opp_id, expired_at)
+    
+    async def _flush_once(self) -> bool:
+        upserts, expirations = self._take_batch()
+        self._oldest_pending = time.monotonic() if self.pending else None
+        if not upserts and not expirations:
+            return True
+        
+        start = time.perf_counter()
+        try:
+            await write_opportunity_batch(
+                [opportunity_row(opp, seen_at, count) for opp, seen_at, count in upserts.values()],
+                [(expired_at, opp_id) for opp_id, expired_at in expirations.items()]
+            )
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.error(f"Write-behind flush failed ({len(upserts) + len(expirations)} rows): {e}")
+            self._restore(upserts, expirations)
+            self._oldest_pending = time.monotonic()
+            if not self._running:
+                raise
+            return False
+        
+        elapsed = time.perf_counter() - start
+        DB_WRITE_LATENCY.observe(elapsed, "opportunities")
+        self.flushes += 1
+        self.rows_written += len(upserts) + len(expirations)
+        self.flush_seconds_total += elapsed
+        self.last_flush_ms = round(elapsed * 1000, 2)
+        return True
+    
+    async def _run(self):
+        while self._running:
+            timeout = None
+            if self._oldest_pending is not None:
+                timeout = max(0.0, self._oldest_pending + settings.DB_FLUSH_INTERVAL_SECONDS - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            
+            while self.pending:
+                if not await self._flush_once():
+                    break
+            if not self.pending:
+                self._idle.set()
+    
+    def get_stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": self.last_flush_ms
+        }
+
+write_behind = WriteBehindQueue()
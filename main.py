@@ -6,10 +6,23 @@ from fastapi.templating import Jinja2Templates
 from fastapi.requests import Request
 from fastapi.responses import HTMLResponse
 
+from api.metrics import router as metrics_router
 from api.routes import router as api_router
+from config import settings
 from api.websocket_manager import manager
+from core.cluster import cluster_node
+from core.http_pool import http_pool
+from core.market_fetcher import market_fetcher
+from core.metrics import loop_lag_monitor
+from core.offload import process_offloader
 from core.scanner import scanner
+from core.snapshots import snapshot_recorder
+from core.warm_start import warm_start
+from core.write_behind import write_behind
+from models.connection import database
 from models.database import init_database
+from services import notifications
+from services.notifications import notification_dispatcher
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,16 +34,53 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Starting Polymarket Arbitrage Scanner...")
     await init_database()
+    write_behind.start()
+    snapshot_recorder.start()
+    await warm_start.restore()
     
-    async def broadcast_callback(message: dict):
-        await manager.broadcast(message)
+    if settings.METRICS_ENABLED:
+        loop_lag_monitor.start()
+    
+    if settings.EXECUTION_MODE == "pool":
+        process_offloader.start()
+    
+    await http_pool.start()
+    market_fetcher.set_http_pool(http_pool)
+    notifications.set_http_pool(http_pool)
+    notification_dispatcher.start()
+    
+    async def publish_delta(delta: dict):
+        notification_dispatcher.submit_many(delta.get("added", ()))
+        await manager.publish_delta(delta)
+    
+    async def broadcast_callback(delta: dict):
+        if cluster_node.enabled:
+            await cluster_node.publish(delta)
+        else:
+            await publish_delta(delta)
     
     scanner.set_websocket_callback(broadcast_callback)
+    scanner.set_scan_complete_callback(warm_start.after_scan)
+    
+    if settings.CLUSTER_ENABLED:
+        cluster_node.set_publisher(publish_delta)
+        await cluster_node.start()
     
     yield
     
     logger.info("Shutting down scanner...")
     scanner.stop()
+    await scanner.close_tick_window()
+    if settings.CLUSTER_ENABLED:
+        await cluster_node.stop()
+    await warm_start.stop()
+    await notification_dispatcher.stop()
+    await http_pool.close()
+    process_offloader.shutdown()
+    await write_behind.stop()
+    await snapshot_recorder.stop()
+    await loop_lag_monitor.stop()
+    await database.close()
 
 app = FastAPI(
     title="Polymarket Arbitrage Scanner",
@@ -43,6 +93,7 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 app.include_router(api_router, prefix="/api")
+app.include_router(metrics_router)
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
@@ -54,6 +105,7 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             data = await websocket.receive_text()
+            manager.handle_message(websocket, data)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
@@ -62,4 +114,4 @@ async def websocket_endpoint(websocket: WebSocket):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5000)
+    uvicorn.run(app, host="0.0.0.0", port=settings.PORT, ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+import aiosqlite
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class Database:
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+    
+    async def _connect(self, database: str, uri: bool = False) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(
+            database,
+            uri=uri,
+            cached_statements=settings.DB_STATEMENT_CACHE_SIZE
+        )
+        await conn.execute(f"PRAGMA busy_timeout={settings.DB_BUSY_TIMEOUT_MS}")
+        await conn.execute(f"PRAGMA cache_size=-{settings.DB_CACHE_SIZE_KB}")
+        await conn.execute(f"PRAGMA mmap_size={settings.DB_MMAP_SIZE_BYTES}")
+        await conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+    
+    async def open(self):
+        async with self._open_lock:
+            if self.is_open:
+                return
+            
+            writer = await self._connect(self.path)
+            await writer.execute("PRAGMA journal_mode=WAL")
+            await writer.execute(f"PRAGMA synchronous={settings.DB_SYNCHRONOUS}")
+            await writer.commit()
+            self._writer = writer
+            
+            self._idle_readers = asyncio.Queue()
+            for _ in range(max(1, settings.DB_READ_POOL_SIZE)):
+                reader = await self._connect(f"file:{self.path}?mode=ro", uri=True)
+                await reader.execute("PRAGMA query_only=1")
+                reader.row_factory = aiosqlite.Row
+                self._readers.append(reader)
+                self._idle_readers.put_nowait(reader)
+            
+            logger.info(f"Database opened: 1 writer, {len(self._readers)} readers ({self.path})")
+    
+    async def close(self):
+        async with self._open_lock:
+            for reader in self._readers:
+                await reader.close()
+            self._readers = []
+            self._idle_readers = None
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+            logger.info("Database closed")
+    
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        if not self.is_open:
+            await self.open()
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+    
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        if not self.is_open:
+            await self.open()
+        idle = self._idle_readers
+        conn = await idle.get()
+        try:
+            yield conn
+        finally:
+            idle.put_nowait(conn)
+
+database = Database(settings.DATABASE_PATH)
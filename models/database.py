@@ -1,15 +1,44 @@
 import aiosqlite
 import json
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from config import settings
+from models.connection import database
 
 DATABASE_PATH = settings.DATABASE_PATH
 
+OPPORTUNITY_MIGRATIONS = {
+    "max_executable_size": "REAL",
+    "vwap_cost": "REAL",
+    "depth_adjusted_profit": "REAL"
+}
+
+SCAN_MIGRATIONS = {
+    "phase_timings": "TEXT",
+    "loop_lag_max_ms": "REAL",
+    "kind": "TEXT NOT NULL DEFAULT 'full'",
+    "ticks": "INTEGER"
+}
+
+SNAPSHOT_MIGRATIONS = {
+    "resolution": "INTEGER NOT NULL DEFAULT 1",
+    "price_sum_min": "REAL",
+    "price_sum_max": "REAL",
+    "samples": "INTEGER NOT NULL DEFAULT 1"
+}
+
+async def _fetchone(db: aiosqlite.Connection, sql: str, params: tuple = ()):
+    async with db.execute(sql, params) as cursor:
+        return await cursor.fetchone()
+
+async def _add_missing_columns(db: aiosqlite.Connection, table: str, columns: dict):
+    existing = {row[1] for row in await db.execute_fetchall(f"PRAGMA table_info({table})")}
+    for name, column_type in columns.items():
+        if name not in existing:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
 async def init_database():
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute("PRAGMA journal_mode=WAL")
-        
+    async with database.writer() as db:
         await db.execute("""
             CREATE TABLE IF NOT EXISTS opportunities (
                 id TEXT PRIMARY KEY,
@@ -31,9 +60,17 @@ async def init_database():
                 is_active INTEGER DEFAULT 1,
                 last_seen_at TIMESTAMP,
                 times_detected INTEGER DEFAULT 1,
-                expired_at TIMESTAMP
+                expired_at TIMESTAMP,
+                max_executable_size REAL,
+                vwap_cost REAL,
+                depth_adjusted_profit REAL
             )
         """)
+        await _add_missing_columns(db, "opportunities", OPPORTUNITY_MIGRATIONS)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_opportunities_active_profit
+            ON opportunities (is_active, net_profit_percent DESC)
+        """)
         
         await db.execute("""
             CREATE TABLE IF NOT EXISTS scans (
@@ -44,9 +81,22 @@ async def init_database():
                 opportunities_found INTEGER,
                 duration_ms INTEGER,
                 status TEXT DEFAULT 'running',
-                error_message TEXT
+                error_message TEXT,
+                phase_timings TEXT,
+                loop_lag_max_ms REAL,
+                kind TEXT NOT NULL DEFAULT 'full',
+                ticks INTEGER
             )
         """)
+        await _add_missing_columns(db, "scans", SCAN_MIGRATIONS)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scans_kind_started
+            ON scans (kind, started_at)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scans_started
+            ON scans (started_at)
+        """)
         
         await db.execute("""
             CREATE TABLE IF NOT EXISTS market_snapshots (
@@ -61,85 +111,105 @@ async def init_database():
                 snapshot_at TIMESTAMP NOT NULL
             )
         """)
+        await _add_missing_columns(db, "market_snapshots", SNAPSHOT_MIGRATIONS)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_snapshots_market_time
+            ON market_snapshots (condition_id, resolution, snapshot_at)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_snapshots_resolution_time
+            ON market_snapshots (resolution, snapshot_at)
+        """)
+        
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS cluster_members (
+                node_id TEXT PRIMARY KEY,
+                joined_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS cluster_leader (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                node_id TEXT NOT NULL,
+                lease_until REAL NOT NULL
+            )
+        """)
         
         await db.commit()
 
-async def save_opportunity(opp: dict) -> str:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        existing = await db.execute(
-            "SELECT id, times_detected FROM opportunities WHERE id = ?",
-            (opp["id"],)
-        )
-        row = await existing.fetchone()
-        
-        if row:
-            times = row[1] + 1
-            await db.execute("""
-                UPDATE opportunities SET
-                    last_seen_at = ?,
-                    times_detected = ?,
-                    is_active = 1,
-                    net_profit = ?,
-                    net_profit_percent = ?,
-                    total_cost = ?
-                WHERE id = ?
-            """, (
-                datetime.utcnow().isoformat(),
-                times,
-                opp["net_profit"],
-                opp["net_profit_percent"],
-                opp["total_cost"],
-                opp["id"]
-            ))
-        else:
-            await db.execute("""
-                INSERT INTO opportunities (
-                    id, detected_at, arbitrage_type, event_title, market_question,
-                    markets_involved, total_cost, guaranteed_payout, gross_profit,
-                    gross_profit_percent, estimated_fees, net_profit, net_profit_percent,
-                    trade_legs, min_liquidity, slug, is_active, last_seen_at, times_detected
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, 1)
-            """, (
-                opp["id"],
-                opp["detected_at"],
-                opp["arbitrage_type"],
-                opp.get("event_title"),
-                opp["market_question"],
-                json.dumps(opp["markets_involved"]),
-                opp["total_cost"],
-                opp["guaranteed_payout"],
-                opp["gross_profit"],
-                opp["gross_profit_percent"],
-                opp["estimated_fees"],
-                opp["net_profit"],
-                opp["net_profit_percent"],
-                json.dumps(opp["trade_legs"]),
-                opp["min_liquidity"],
-                opp.get("slug", ""),
-                datetime.utcnow().isoformat()
-            ))
-        
+UPSERT_OPPORTUNITY_SQL = """
+    INSERT INTO opportunities (
+        id, detected_at, arbitrage_type, event_title, market_question,
+        markets_involved, total_cost, guaranteed_payout, gross_profit,
+        gross_profit_percent, estimated_fees, net_profit, net_profit_percent,
+        trade_legs, min_liquidity, slug, is_active, last_seen_at, times_detected,
+        max_executable_size, vwap_cost, depth_adjusted_profit
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        last_seen_at = excluded.last_seen_at,
+        times_detected = opportunities.times_detected + excluded.times_detected,
+        is_active = 1,
+        net_profit = excluded.net_profit,
+        net_profit_percent = excluded.net_profit_percent,
+        total_cost = excluded.total_cost,
+        trade_legs = excluded.trade_legs,
+        max_executable_size = excluded.max_executable_size,
+        vwap_cost = excluded.vwap_cost,
+        depth_adjusted_profit = excluded.depth_adjusted_profit
+"""
+
+def opportunity_row(opp: dict, seen_at: str, times_detected: int = 1) -> tuple:
+    return (
+        opp["id"],
+        opp["detected_at"],
+        opp["arbitrage_type"],
+        opp.get("event_title"),
+        opp["market_question"],
+        json.dumps(opp["markets_involved"]),
+        opp["total_cost"],
+        opp["guaranteed_payout"],
+        opp["gross_profit"],
+        opp["gross_profit_percent"],
+        opp["estimated_fees"],
+        opp["net_profit"],
+        opp["net_profit_percent"],
+        json.dumps(opp["trade_legs"]),
+        opp["min_liquidity"],
+        opp.get("slug", ""),
+        seen_at,
+        times_detected,
+        opp.get("max_executable_size"),
+        opp.get("vwap_cost"),
+        opp.get("depth_adjusted_profit")
+    )
+
+async def write_opportunity_batch(upserts: List[tuple], expirations: List[tuple]):
+    async with database.writer() as db:
+        if upserts:
+            await db.executemany(UPSERT_OPPORTUNITY_SQL, upserts)
+        if expirations:
+            await db.executemany(
+                "UPDATE opportunities SET is_active = 0, expired_at = ? WHERE id = ?",
+                expirations
+            )
         await db.commit()
-        return opp["id"]
 
 async def get_active_opportunities(limit: int = 100, min_profit: float = 0, sort: str = "profit") -> List[dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
+    async with database.reader() as db:
         order_by = "net_profit_percent DESC"
         if sort == "liquidity":
             order_by = "min_liquidity DESC"
         elif sort == "recent":
             order_by = "detected_at DESC"
         
-        cursor = await db.execute(f"""
+        rows = await db.execute_fetchall(f"""
             SELECT * FROM opportunities 
             WHERE is_active = 1 AND net_profit_percent >= ?
             ORDER BY {order_by}
             LIMIT ?
         """, (min_profit, limit))
         
-        rows = await cursor.fetchall()
         results = []
         for row in rows:
             opp = dict(row)
@@ -148,47 +218,44 @@ async def get_active_opportunities(limit: int = 100, min_profit: float = 0, sort
             results.append(opp)
         return results
 
+async def get_active_opportunity_ids() -> List[str]:
+    async with database.reader() as db:
+        rows = await db.execute_fetchall("SELECT id FROM opportunities WHERE is_active = 1")
+        return [row[0] for row in rows]
+
 async def get_opportunity_by_id(opp_id: str) -> Optional[dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
+    async with database.reader() as db:
+        rows = await db.execute_fetchall(
             "SELECT * FROM opportunities WHERE id = ?",
             (opp_id,)
         )
-        row = await cursor.fetchone()
-        if row:
+        if rows:
+            row = rows[0]
             opp = dict(row)
             opp["markets_involved"] = json.loads(opp["markets_involved"]) if opp["markets_involved"] else []
             opp["trade_legs"] = json.loads(opp["trade_legs"]) if opp["trade_legs"] else []
             return opp
         return None
 
-async def mark_opportunity_inactive(opp_id: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute("""
-            UPDATE opportunities SET is_active = 0, expired_at = ?
-            WHERE id = ?
-        """, (datetime.utcnow().isoformat(), opp_id))
-        await db.commit()
-
-async def mark_all_inactive():
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute("""
-            UPDATE opportunities SET is_active = 0, expired_at = ?
-            WHERE is_active = 1
-        """, (datetime.utcnow().isoformat(),))
-        await db.commit()
-
-async def log_scan_start() -> int:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+async def log_scan_start(kind: str = "full") -> int:
+    async with database.writer() as db:
         cursor = await db.execute("""
-            INSERT INTO scans (started_at, status) VALUES (?, 'running')
-        """, (datetime.utcnow().isoformat(),))
+            INSERT INTO scans (started_at, status, kind) VALUES (?, 'running', ?)
+        """, (datetime.utcnow().isoformat(), kind))
         await db.commit()
         return cursor.lastrowid
 
-async def log_scan_complete(scan_id: int, markets_scanned: int, opportunities_found: int, duration_ms: int, error: str = None):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+async def log_scan_complete(
+    scan_id: int,
+    markets_scanned: int,
+    opportunities_found: int,
+    duration_ms: int,
+    error: str = None,
+    phase_timings: Optional[dict] = None,
+    loop_lag_max_ms: Optional[float] = None,
+    ticks: Optional[int] = None
+):
+    async with database.writer() as db:
         status = "error" if error else "completed"
         await db.execute("""
             UPDATE scans SET
@@ -197,7 +264,10 @@ async def log_scan_complete(scan_id: int, markets_scanned: int, opportunities_fo
                 opportunities_found = ?,
                 duration_ms = ?,
                 status = ?,
-                error_message = ?
+                error_message = ?,
+                phase_timings = ?,
+                loop_lag_max_ms = ?,
+                ticks = ?
             WHERE id = ?
         """, (
             datetime.utcnow().isoformat(),
@@ -206,38 +276,122 @@ async def log_scan_complete(scan_id: int, markets_scanned: int, opportunities_fo
             duration_ms,
             status,
             error,
+            json.dumps(phase_timings) if phase_timings else None,
+            loop_lag_max_ms,
+            ticks,
             scan_id
         ))
         await db.commit()
 
-async def get_scan_history(limit: int = 50) -> List[dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+async def get_scan_history(limit: int = 50, kind: Optional[str] = None) -> List[dict]:
+    async with database.reader() as db:
+        if kind:
+            rows = await db.execute_fetchall("""
+                SELECT * FROM scans WHERE kind = ? ORDER BY started_at DESC LIMIT ?
+            """, (kind, limit))
+        else:
+            rows = await db.execute_fetchall("""
+                SELECT * FROM scans ORDER BY started_at DESC LIMIT ?
+            """, (limit,))
+        scans = []
+        for row in rows:
+            scan = dict(row)
+            scan["phase_timings"] = json.loads(scan["phase_timings"]) if scan["phase_timings"] else {}
+            scans.append(scan)
+        return scans
+
+async def delete_scans_before(cutoff: str) -> int:
+    async with database.writer() as db:
+        cursor = await db.execute("DELETE FROM scans WHERE started_at < ?", (cutoff,))
+        await db.commit()
+        return cursor.rowcount
+
+async def insert_market_snapshots(rows: List[tuple]):
+    async with database.writer() as db:
+        await db.executemany("""
+            INSERT INTO market_snapshots (
+                scan_id, condition_id, price_sum, token_prices, volume_24h, liquidity, snapshot_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        await db.commit()
+
+async def get_latest_snapshot_time(resolution: int) -> Optional[str]:
+    async with database.reader() as db:
+        row = await _fetchone(
+            db,
+            "SELECT MAX(snapshot_at) as latest FROM market_snapshots WHERE resolution = ?",
+            (resolution,)
+        )
+        return row["latest"] if row else None
+
+async def rollup_market_snapshots(source: int, target: int, bucket_format: str, start: str, end: str) -> int:
+    async with database.writer() as db:
         cursor = await db.execute("""
-            SELECT * FROM scans ORDER BY started_at DESC LIMIT ?
-        """, (limit,))
-        rows = await cursor.fetchall()
+            INSERT INTO market_snapshots (
+                scan_id, condition_id, price_sum, token_prices, volume_24h, liquidity,
+                snapshot_at, resolution, price_sum_min, price_sum_max, samples
+            )
+            WITH bucketed AS (
+                SELECT *, strftime(?, snapshot_at) AS bucket
+                FROM market_snapshots
+                WHERE resolution = ? AND snapshot_at >= ? AND snapshot_at < ?
+            ), ranked AS (
+                SELECT *,
+                    ROW_NUMBER() OVER latest AS row_rank,
+                    MIN(COALESCE(price_sum_min, price_sum)) OVER bucket_rows AS low,
+                    MAX(COALESCE(price_sum_max, price_sum)) OVER bucket_rows AS high,
+                    SUM(samples) OVER bucket_rows AS total_samples
+                FROM bucketed
+                WINDOW bucket_rows AS (PARTITION BY condition_id, bucket),
+                       latest AS (PARTITION BY condition_id, bucket ORDER BY snapshot_at DESC)
+            )
+            SELECT scan_id, condition_id, price_sum, token_prices, volume_24h, liquidity,
+                   bucket, ?, low, high, total_samples
+            FROM ranked WHERE row_rank = 1
+        """, (bucket_format, source, start, end, target))
+        await db.commit()
+        return cursor.rowcount
+
+async def delete_market_snapshots_before(resolution: int, cutoff: str) -> int:
+    async with database.writer() as db:
+        cursor = await db.execute(
+            "DELETE FROM market_snapshots WHERE resolution = ? AND snapshot_at < ?",
+            (resolution, cutoff)
+        )
+        await db.commit()
+        return cursor.rowcount
+
+async def get_market_snapshots(condition_id: str, resolution: int = 1, since: str = "", limit: int = 1000) -> List[dict]:
+    async with database.reader() as db:
+        rows = await db.execute_fetchall("""
+            SELECT scan_id, condition_id, price_sum, token_prices, volume_24h, liquidity,
+                   snapshot_at, resolution, price_sum_min, price_sum_max, samples
+            FROM market_snapshots
+            WHERE condition_id = ? AND snapshot_at >= ? AND resolution = ?
+            ORDER BY snapshot_at DESC
+            LIMIT ?
+        """, (condition_id, since, resolution, limit))
         return [dict(row) for row in rows]
 
-async def get_summary_stats() -> dict:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
-        active = await db.execute("SELECT COUNT(*) as count FROM opportunities WHERE is_active = 1")
-        active_row = await active.fetchone()
-        
-        profit = await db.execute("SELECT SUM(net_profit) as total FROM opportunities WHERE is_active = 1")
-        profit_row = await profit.fetchone()
-        
-        best = await db.execute("SELECT MAX(net_profit_percent) as best FROM opportunities WHERE is_active = 1")
-        best_row = await best.fetchone()
-        
-        scans = await db.execute("SELECT markets_scanned FROM scans ORDER BY id DESC LIMIT 1")
-        scan_row = await scans.fetchone()
-        
-        return {
-            "active_opportunities": active_row["count"] if active_row else 0,
-            "total_profit_potential": profit_row["total"] if profit_row and profit_row["total"] else 0,
-            "best_opportunity_percent": best_row["best"] if best_row and best_row["best"] else 0,
-            "markets_scanned": scan_row["markets_scanned"] if scan_row and scan_row["markets_scanned"] else 0
-        }
+async def heartbeat_cluster_member(node_id: str, now: float, ttl: float) -> Tuple[List[str], Optional[str]]:
+    async with database.writer() as db:
+        await db.execute("""
+            INSERT INTO cluster_members (node_id, joined_at, heartbeat_at) VALUES (?, ?, ?)
+            ON CONFLICT(node_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+        """, (node_id, now, now))
+        await db.execute("DELETE FROM cluster_members WHERE heartbeat_at < ?", (now - ttl,))
+        await db.execute("""
+            INSERT INTO cluster_leader (id, node_id, lease_until) VALUES (1, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET node_id = excluded.node_id, lease_until = excluded.lease_until
+            WHERE cluster_leader.node_id = excluded.node_id OR cluster_leader.lease_until < ?
+        """, (node_id, now + ttl, now))
+        members = await db.execute_fetchall("SELECT node_id FROM cluster_members ORDER BY node_id")
+        leader = await _fetchone(db, "SELECT node_id FROM cluster_leader WHERE id = 1")
+        await db.commit()
+        return [row[0] for row in members], leader[0] if leader else None
+
+async def leave_cluster(node_id: str):
+    async with database.writer() as db:
+        await db.execute("DELETE FROM cluster_members WHERE node_id = ?", (node_id,))
+        await db.execute("UPDATE cluster_leader SET lease_until = 0 WHERE node_id = ?", (node_id,))
+        await db.commit()
@@ -1,4 +1,5 @@
-from typing import List, Optional
+import sys
+from typing import List, Optional, Union
 from pydantic import BaseModel, Field
 
 class Token(BaseModel):
@@ -47,3 +48,81 @@ class Market(BaseModel):
             closed=data.get("closed", False),
             event_title=data.get("groupItemTitle") or data.get("eventTitle")
         )
+
+class TokenRecord:
+    __slots__ = ("token_id", "outcome", "price")
+    
+    def __init__(self, token_id: str, outcome: str, price: float = 0.0):
+        self.token_id = token_id
+        self.outcome = outcome
+        self.price = price
+    
+    @classmethod
+    def from_api(cls, data: dict) -> "TokenRecord":
+        return cls(
+            sys.intern(str(data.get("token_id", ""))),
+            sys.intern(data.get("outcome", "") or ""),
+            float(data.get("price", 0) or 0)
+        )
+    
+    def to_model(self) -> Token:
+        return Token(token_id=self.token_id, outcome=self.outcome, price=self.price)
+
+class MarketRecord:
+    __slots__ = ("id", "question", "condition_id", "slug", "tokens", "volume_24h", "liquidity", "closed", "event_title")
+    
+    def __init__(self, id: str, question: str, condition_id: str, slug: str, tokens: List[TokenRecord],
+                 volume_24h: float, liquidity: float, closed: bool, event_title: Optional[str]):
+        self.id = id
+        self.question = question
+        self.condition_id = condition_id
+        self.slug = slug
+        self.tokens = tokens
+        self.volume_24h = volume_24h
+        self.liquidity = liquidity
+        self.closed = closed
+        self.event_title = event_title
+    
+    @classmethod
+    def from_api(cls, data: dict) -> "MarketRecord":
+        return cls(
+            str(data.get("id", "")),
+            data.get("question", ""),
+            sys.intern(data.get("conditionId", "") or ""),
+            data.get("slug", ""),
+            [TokenRecord.from_api(t) for t in data.get("tokens", []) or []],
+            float(data.get("volume24hr", 0) or 0),
+            float(data.get("liquidity", 0) or 0),
+            bool(data.get("closed", False)),
+            data.get("groupItemTitle") or data.get("eventTitle")
+        )
+    
+    @property
+    def key(self) -> str:
+        return self.condition_id or self.id
+    
+    def same_listing(self, other: "MarketRecord") -> bool:
+        return (
+            self.id == other.id
+            and self.question == other.question
+            and self.slug == other.slug
+            and self.volume_24h == other.volume_24h
+            and self.liquidity == other.liquidity
+            and self.event_title == other.event_title
+            and [(t.token_id, t.outcome) for t in self.tokens] == [(t.token_id, t.outcome) for t in other.tokens]
+        )
+    
+    def to_model(self) -> Market:
+        return Market(
+            id=self.id,
+            question=self.question,
+            condition_id=self.condition_id,
+            slug=self.slug,
+            tokens=[t.to_model() for t in self.tokens],
+            volume_24h=self.volume_24h,
+            liquidity=self.liquidity,
+            closed=self.closed,
+            event_title=self.event_title
+        )
+
+MarketLike = Union[Market, MarketRecord]
@@ -14,6 +14,7 @@ class TradeLeg(BaseModel):
     side: str = "BUY"
     price: float
     suggested_size: float = 1.0
+    vwap_price: Optional[float] = None
 
 class Opportunity(BaseModel):
     id: str
@@ -35,6 +36,9 @@ class Opportunity(BaseModel):
     is_active: bool = True
     last_seen_at: Optional[datetime] = None
     times_detected: int = 1
+    max_executable_size: Optional[float] = None
+    vwap_cost: Optional[float] = None
+    depth_adjusted_profit: Optional[float] = None
     
     def to_dict(self) -> dict:
         return {
@@ -56,5 +60,8 @@ class Opportunity(BaseModel):
             "slug": self.slug,
             "is_active": self.is_active,
             "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None,
-            "times_detected": self.times_detected
+            "times_detected": self.times_detected,
+            "max_executable_size": self.max_executable_size,
+            "vwap_cost": self.vwap_cost,
+            "depth_adjusted_profit": self.depth_adjusted_profit
         }
@@ -1,18 +1,33 @@
-import httpx
+import asyncio
+import json
 import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+
+import httpx
 from config import settings
+from core.http_pool import HttpClientPool, http_pool
+from core.metrics import NOTIFICATIONS
+from core.rate_limiter import AdaptiveRateLimiter, backoff_delay
 
 logger = logging.getLogger(__name__)
 
-async def send_discord_notification(opportunity: dict):
-    if not settings.DISCORD_WEBHOOK_URL:
-        return
-    
+DISCORD_MAX_EMBEDS = 10
+SHUTDOWN_TIMEOUT_SECONDS = 5.0
+
+_http: HttpClientPool = http_pool
+
+def set_http_pool(pool: HttpClientPool):
+    global _http
+    _http = pool
+
+def build_discord_embed(opportunity: dict) -> dict:
     embed = {
         "title": "New Arbitrage Opportunity!",
         "color": 0x22c55e,
         "fields": [
-            {"name": "Market", "value": opportunity.get("market_question", "N/A")[:100], "inline": False},
+            {"name": "Market", "value": (opportunity.get("market_question") or "N/A")[:100], "inline": False},
             {"name": "Net Profit", "value": f"${opportunity.get('net_profit', 0):.4f}", "inline": True},
             {"name": "Profit %", "value": f"{opportunity.get('net_profit_percent', 0):.2f}%", "inline": True},
             {"name": "Liquidity", "value": f"${opportunity.get('min_liquidity', 0):,.0f}", "inline": True},
@@ -22,11 +37,234 @@ async def send_discord_notification(opportunity: dict):
     slug = opportunity.get("slug", "")
     if slug:
         embed["url"] = f"https://polymarket.com/event/{slug}"
+    return embed
+
+class NotificationSink(ABC):
+    name = "sink"
+    max_batch = 1
+    limiter: Optional[AdaptiveRateLimiter] = None
+    
+    @abstractmethod
+    async def send(self, opportunities: List[dict]) -> Optional[httpx.Response]:
+        ...
     
-    payload = {"embeds": [embed]}
+    def on_response(self, response: httpx.Response) -> Optional[float]:
+        return None
+
+class HttpSink(NotificationSink):
+    def __init__(self, name: str, url: str, max_batch: int):
+        self.name = name
+        self.url = url
+        self.max_batch = max_batch
+        self.limiter = AdaptiveRateLimiter(name, settings.NOTIFY_RATE_LIMIT_PER_SECOND, settings.NOTIFY_RATE_LIMIT_BURST)
+    
+    @abstractmethod
+    def payload(self, opportunities: List[dict]) -> dict:
+        ...
+    
+    async def send(self, opportunities: List[dict]) -> Optional[httpx.Response]:
+        await self.limiter.acquire()
+        return await _http.post(self.url, json=self.payload(opportunities))
+    
+    def on_response(self, response: httpx.Response) -> Optional[float]:
+        retry_after = self.limiter.on_response(response)
+        if retry_after is None and response.status_code == 429:
+            # Discord also reports the wait in the body, in seconds.
+            try:
+                retry_after = float(response.json()["retry_after"])
+            except (ValueError, TypeError, KeyError):
+                return None
+            self.limiter.block_for(retry_after)
+        return retry_after
+
+class DiscordSink(HttpSink):
+    def __init__(self, url: str):
+        super().__init__("discord", url, DISCORD_MAX_EMBEDS)
+    
+    def payload(self, opportunities: List[dict]) -> dict:
+        return {"embeds": [build_discord_embed(opportunity) for opportunity in opportunities]}
+
+class WebhookSink(HttpSink):
+    def __init__(self, url: str):
+        super().__init__("webhook", url, settings.NOTIFY_BATCH_MAX)
+    
+    def payload(self, opportunities: List[dict]) -> dict:
+        return {"type": "opportunities", "count": len(opportunities), "opportunities": opportunities}
+
+class FileSink(NotificationSink):
+    name = "file"
     
-    try:
-        async with httpx.AsyncClient() as client:
-            await client.post(settings.DISCORD_WEBHOOK_URL, json=payload)
-    except Exception as e:
-        logger.error(f"Failed to send Discord notification: {e}")
+    def __init__(self, path: str):
+        self.path = path
+        self.max_batch = settings.NOTIFY_BATCH_MAX
+    
+    def _append(self, lines: str):
+        with open(self.path, "a") as f:
+            f.write(lines)
+    
+    async def send(self, opportunities: List[dict]) -> Optional[httpx.Response]:
+        lines = "".join(json.dumps(opportunity, default=str) + "\n" for opportunity in opportunities)
+        await asyncio.to_thread(self._append, lines)
+        return None
+
+def configured_sinks() -> List[NotificationSink]:
+    sinks: List[NotificationSink] = []
+    if settings.DISCORD_WEBHOOK_URL:
+        sinks.append(DiscordSink(settings.DISCORD_WEBHOOK_URL))
+    if settings.NOTIFY_WEBHOOK_URL:
+        sinks.append(WebhookSink(settings.NOTIFY_WEBHOOK_URL))
+    if settings.NOTIFY_FILE_PATH:
+        sinks.append(FileSink(settings.NOTIFY_FILE_PATH))
+    return sinks
+
+class NotificationDispatcher:
+    def __init__(self):
+        self.sinks: List[NotificationSink] = []
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.NOTIFY_QUEUE_SIZE)
+        self._recent: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._closing: bool = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.stats: Dict[str, int] = {
+            "queued": 0, "deduped": 0, "dropped": 0, "messages": 0, "delivered": 0, "retried": 0, "failed": 0
+        }
+    
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self, sinks: Optional[List[NotificationSink]] = None):
+        self.sinks = configured_sinks() if sinks is None else sinks
+        if not self.sinks or self.is_running:
+            return
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Notifications enabled: {', '.join(sink.name for sink in self.sinks)}")
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._task, SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropped {self._queue.qsize()} queued notifications on shutdown")
+        self._task = None
+    
+    def submit(self, opportunity: dict) -> bool:
+        if not self.is_running or self._closing:
+            return False
+        opp_id = opportunity["id"]
+        now = time.monotonic()
+        if self._recent.get(opp_id, 0.0) > now:
+            self.stats["deduped"] += 1
+            return False
+        try:
+            self._queue.put_nowait(opportunity)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+        self._recent[opp_id] = now + settings.NOTIFY_DEDUPE_SECONDS
+        self._idle.clear()
+        self.stats["queued"] += 1
+        return True
+    
+    async def wait_idle(self):
+        await self._idle.wait()
+    
+    def submit_many(self, opportunities: Iterable[dict]):
+        for opportunity in opportunities:
+            self.submit(opportunity)
+    
+    async def _collect(self, first: dict) -> List[dict]:
+        # Bursts arrive as one delta per scan; wait briefly so they share messages.
+        batch = [first]
+        deadline = time.monotonic() + settings.NOTIFY_COALESCE_SECONDS
+        while len(batch) < settings.NOTIFY_BATCH_MAX:
+            if self._queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closing:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            if item is not None:
+                batch.append(item)
+        return batch
+    
+    async def _run(self):
+        while not (self._closing and self._queue.empty()):
+            first = await self._queue.get()
+            if first is None:
+                continue
+            batch = await self._collect(first)
+            try:
+                await asyncio.gather(*(self._send_to(sink, batch) for sink in self.sinks))
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {e}")
+            self._prune_recent()
+            if self._queue.empty():
+                self._idle.set()
+    
+    def _prune_recent(self):
+        now = time.monotonic()
+        expired = [opp_id for opp_id, until in self._recent.items() if until <= now]
+        for opp_id in expired:
+            del self._recent[opp_id]
+    
+    async def _send_to(self, sink: NotificationSink, batch: List[dict]):
+        for i in range(0, len(batch), sink.max_batch):
+            chunk = batch[i:i + sink.max_batch]
+            if await self._deliver(sink, chunk):
+                self.stats["messages"] += 1
+                self.stats["delivered"] += len(chunk)
+    
+    async def _deliver(self, sink: NotificationSink, chunk: List[dict]) -> bool:
+        attempts = settings.NOTIFY_MAX_ATTEMPTS
+        for attempt in range(attempts):
+            delay = backoff_delay(attempt)
+            try:
+                response = await sink.send(chunk)
+            except Exception as e:
+                NOTIFICATIONS.inc(sink.name, "error")
+                logger.warning(f"{sink.name} notification failed on attempt {attempt + 1}: {e}")
+            else:
+                if response is None:
+                    NOTIFICATIONS.inc(sink.name, "sent")
+                    return True
+                NOTIFICATIONS.inc(sink.name, str(response.status_code))
+                retry_after = sink.on_response(response)
+                if response.status_code < 400:
+                    return True
+                if response.status_code == 429:
+                    if retry_after is not None:
+                        delay = max(delay, retry_after)
+                elif response.status_code < 500:
+                    logger.error(f"{sink.name} rejected notification: HTTP {response.status_code}")
+                    break
+            
+            if attempt < attempts - 1:
+                self.stats["retried"] += 1
+                await asyncio.sleep(delay)
+        
+        self.stats["failed"] += 1
+        return False
+    
+    def get_stats(self) -> dict:
+        return {
+            "sinks": [sink.name for sink in self.sinks],
+            "pending": self._queue.qsize(),
+            "dedupe_entries": len(self._recent),
+            "rate_limiters": {sink.name: sink.limiter.get_stats() for sink in self.sinks if sink.limiter is not None},
+            **self.stats
+        }
+
+notification_dispatcher = NotificationDispatcher()
@@ -1,6 +1,8 @@
 let ws = null;
 let opportunities = [];
 let reconnectInterval = null;
+let lastSeq = null;
+const MAX_RENDERED_ROWS = 100;
 
 document.addEventListener('DOMContentLoaded', function() {
     initWebSocket();
@@ -11,7 +13,7 @@ document.addEventListener('DOMContentLoaded', function() {
     document.getElementById('startBtn').addEventListener('click', startScanner);
     document.getElementById('stopBtn').addEventListener('click', stopScanner);
     document.getElementById('scanBtn').addEventListener('click', triggerScan);
-    document.getElementById('applyFilters').addEventListener('click', fetchOpportunities);
+    document.getElementById('applyFilters').addEventListener('click', applyFilters);
     document.getElementById('modalClose').addEventListener('click', closeModal);
     document.getElementById('copyPlan').addEventListener('click', copyTradePlan);
     
@@ -26,8 +28,10 @@ document.addEventListener('DOMContentLoaded', function() {
 
 function initWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/ws`;
+    const minProfit = document.getElementById('minProfit').value || 0;
+    const wsUrl = `${protocol}//${window.location.host}/ws?min_profit=${minProfit}`;
     
+    lastSeq = null;
     ws = new WebSocket(wsUrl);
     
     ws.onopen = function() {
@@ -57,18 +61,15 @@ function initWebSocket() {
 
 function handleWebSocketMessage(message) {
     switch(message.type) {
-        case 'new_opportunity':
-            addOrUpdateOpportunity(message.data);
-            fetchSummary();
-            break;
-        case 'opportunity_expired':
-            removeOpportunity(message.opportunity_id);
-            fetchSummary();
+        case 'snapshot':
+            lastSeq = message.seq;
+            opportunities = message.opportunities;
+            sortOpportunities();
+            renderOpportunities();
+            updateSummary(message.summary);
             break;
-        case 'scan_complete':
-            document.getElementById('marketsScanned').textContent = message.data.markets.toLocaleString();
-            document.getElementById('lastScan').textContent = 'Last scan: Just now';
-            fetchSummary();
+        case 'delta':
+            applyDelta(message);
             break;
         case 'status_update':
             updateScannerStatus(message.data);
@@ -76,6 +77,58 @@ function handleWebSocketMessage(message) {
     }
 }
 
+function applyDelta(delta) {
+    if (lastSeq === null || delta.seq <= lastSeq) return;
+    if (delta.seq !== lastSeq + 1) {
+        requestResync();
+        return;
+    }
+    lastSeq = delta.seq;
+    
+    const removed = new Set(delta.removed);
+    const changed = new Map();
+    delta.added.concat(delta.updated).forEach(opp => changed.set(opp.id, opp));
+    
+    opportunities = opportunities
+        .filter(o => !removed.has(o.id))
+        .map(o => changed.get(o.id) || o);
+    const present = new Set(opportunities.map(o => o.id));
+    delta.added.concat(delta.updated).forEach(opp => {
+        if (!present.has(opp.id)) opportunities.unshift(opp);
+    });
+    
+    sortOpportunities();
+    renderOpportunities();
+    updateSummary(delta.summary);
+    document.getElementById('lastScan').textContent = 'Last scan: Just now';
+}
+
+function requestResync() {
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'resync' }));
+    }
+}
+
+function sortOpportunities() {
+    const sortBy = document.getElementById('sortBy').value;
+    const keys = {
+        profit: o => o.net_profit_percent,
+        liquidity: o => o.min_liquidity || 0,
+        recent: o => new Date(o.detected_at).getTime()
+    };
+    const key = keys[sortBy] || keys.profit;
+    opportunities.sort((a, b) => key(b) - key(a));
+}
+
+function applyFilters() {
+    const minProfit = parseFloat(document.getElementById('minProfit').value) || 0;
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'subscribe', min_profit: minProfit }));
+    } else {
+        fetchOpportunities();
+    }
+}
+
 function updateConnectionStatus(connected) {
     const statusDot = document.querySelector('.status-dot');
     const statusText = document.querySelector('.status-text');
@@ -124,17 +177,19 @@ function updateScannerStatus(status) {
 async function fetchSummary() {
     try {
         const response = await fetch('/api/summary');
-        const data = await response.json();
-        
-        document.getElementById('activeCount').textContent = data.active_opportunities || 0;
-        document.getElementById('totalProfit').textContent = '$' + (data.total_profit_potential || 0).toFixed(4);
-        document.getElementById('marketsScanned').textContent = (data.markets_scanned || 0).toLocaleString();
-        document.getElementById('bestOpportunity').textContent = (data.best_opportunity_percent || 0).toFixed(2) + '%';
+        updateSummary(await response.json());
     } catch (error) {
         console.error('Failed to fetch summary:', error);
     }
 }
 
+function updateSummary(data) {
+    document.getElementById('activeCount').textContent = data.active_opportunities || 0;
+    document.getElementById('totalProfit').textContent = '$' + (data.total_profit_potential || 0).toFixed(4);
+    document.getElementById('marketsScanned').textContent = (data.markets_scanned || 0).toLocaleString();
+    document.getElementById('bestOpportunity').textContent = (data.best_opportunity_percent || 0).toFixed(2) + '%';
+}
+
 async function fetchOpportunities() {
     const minProfit = document.getElementById('minProfit').value || 0;
     const sortBy = document.getElementById('sortBy').value;
@@ -148,21 +203,6 @@ async function fetchOpportunities() {
     }
 }
 
-function addOrUpdateOpportunity(opp) {
-    const index = opportunities.findIndex(o => o.id === opp.id);
-    if (index >= 0) {
-        opportunities[index] = opp;
-    } else {
-        opportunities.unshift(opp);
-    }
-    renderOpportunities();
-}
-
-function removeOpportunity(oppId) {
-    opportunities = opportunities.filter(o => o.id !== oppId);
-    renderOpportunities();
-}
-
 function renderOpportunities() {
     const tbody = document.getElementById('opportunitiesBody');
     
@@ -175,7 +215,8 @@ function renderOpportunities() {
         return;
     }
     
-    tbody.innerHTML = opportunities.map(opp => {
+    // Deltas are applied to the full set; only the table is capped.
+    tbody.innerHTML = opportunities.slice(0, MAX_RENDERED_ROWS).map(opp => {
         const profitClass = opp.net_profit_percent > 2 ? 'profit-high' : 
                            opp.net_profit_percent > 1 ? 'profit-medium' : 'profit-low';
         
@@ -213,10 +254,17 @@ function showOpportunityDetail(oppId) {
     document.getElementById('modalNet').textContent = '$' + opp.net_profit.toFixed(4);
     document.getElementById('modalPercent').textContent = opp.net_profit_percent.toFixed(2) + '%';
     
+    // Depth fields can be missing or partial on depth-less or partially merged deltas.
+    const legSize = (opp.trade_legs && opp.trade_legs.length) ? opp.trade_legs[0].suggested_size : null;
+    document.getElementById('modalSize').textContent = formatShares(opp.vwap_cost != null ? legSize : null);
+    document.getElementById('modalVwap').textContent = formatDollars(opp.vwap_cost, 4);
+    document.getElementById('modalDepthProfit').textContent = formatDollars(opp.depth_adjusted_profit, 4);
+    document.getElementById('modalMaxSize').textContent = formatShares(opp.max_executable_size);
+    
     const tradeLegsHtml = (opp.trade_legs || []).map(leg => `
         <div class="trade-leg">
             <span><strong>${leg.side}</strong> ${leg.outcome}</span>
-            <span>$${leg.price.toFixed(4)}</span>
+            <span>$${leg.price.toFixed(4)}${leg.vwap_price ? ` (VWAP $${leg.vwap_price.toFixed(4)} x ${leg.suggested_size})` : ''}</span>
         </div>
     `).join('');
     document.getElementById('tradeLegs').innerHTML = tradeLegsHtml || 'No trade legs available';
@@ -249,7 +297,7 @@ function copyTradePlan() {
     plan += `TRADES:\n`;
     
     (opp.trade_legs || []).forEach(leg => {
-        plan += `  - ${leg.side} ${leg.outcome} at $${leg.price.toFixed(4)}\n`;
+        plan += `  - ${leg.side} ${leg.suggested_size} ${leg.outcome} at $${(leg.vwap_price || leg.price).toFixed(4)}\n`;
     });
     
     plan += `\nSUMMARY:\n`;
@@ -307,6 +355,14 @@ async function triggerScan() {
     }
 }
 
+function formatShares(value) {
+    return typeof value === 'number' ? value.toLocaleString() + ' shares' : 'N/A';
+}
+
+function formatDollars(value, digits) {
+    return typeof value === 'number' ? '$' + value.toFixed(digits) : 'N/A';
+}
+
 function truncate(str, length) {
     if (!str) return '';
     return str.length > length ? str.substring(0, length) + '...' : str;
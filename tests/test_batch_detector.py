@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from config import settings
+from core.arbitrage_detector import detect_arbitrage
+from core.batch_detector import PriceColumns, detect_arbitrage_batch
+from models.market import MarketRecord, TokenRecord
+
+def markets(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    generated = []
+    for i in range(n):
+        n_tokens = rng.choice([1, 2, 2, 2, 3, 5])
+        target = rng.uniform(0.85, 1.05)
+        weights = [rng.random() + 0.05 for _ in range(n_tokens)]
+        prices = [round(w / sum(weights) * target, 4) for w in weights]
+        if rng.random() < 0.1:
+            prices[0] = 0.0
+        tokens = [TokenRecord(f"{i}-{j}", f"O{j}", price) for j, price in enumerate(prices)]
+        generated.append(MarketRecord(str(i), f"Market {i}?", f"0x{i:04x}", f"m-{i}", tokens, 0.0, 1000.0, False, None))
+    return generated
+
+def boundary_market(price_sum: float) -> MarketRecord:
+    tokens = [TokenRecord("b-yes", "Yes", price_sum / 2), TokenRecord("b-no", "No", price_sum / 2)]
+    return MarketRecord("b", "Boundary?", "0xb", "b", tokens, 0.0, 1000.0, False, None)
+
+def dumps(opportunities: list) -> list:
+    return [opportunity.model_dump(exclude={"detected_at"}) for opportunity in opportunities]
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_batch_matches_scalar_detector(seed):
+    batch = markets(2000, seed)
+    scalar = [opportunity for market in batch if (opportunity := detect_arbitrage(market))]
+    
+    assert scalar
+    assert dumps(detect_arbitrage_batch(batch)) == dumps(scalar)
+    assert dumps(detect_arbitrage_batch(batch, PriceColumns.from_markets(batch))) == dumps(scalar)
+
+def test_threshold_boundary_matches_scalar_detector(monkeypatch):
+    monkeypatch.setattr(settings, "POLYMARKET_FEE_PERCENT", 0.0)
+    monkeypatch.setattr(settings, "OPPORTUNITY_EXIT_PERCENT", settings.MIN_ARBITRAGE_PERCENT)
+    # net_profit_percent == MIN_ARBITRAGE_PERCENT exactly, up to float rounding.
+    price_sum = 100 / (100 + settings.MIN_ARBITRAGE_PERCENT)
+    for market in (boundary_market(price_sum), boundary_market(price_sum + 1e-12), boundary_market(price_sum - 1e-12)):
+        assert dumps(detect_arbitrage_batch([market])) == dumps(filter(None, [detect_arbitrage(market)]))
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from config import settings
+from models.connection import Database
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_READ_POOL_SIZE", 2)
+    return Database(os.path.join(tmp_path, "pool.db"))
+
+async def create_table(db: Database):
+    async with db.writer() as conn:
+        await conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        await conn.commit()
+
+def test_readers_are_read_only_and_see_committed_writes(db):
+    async def run():
+        await create_table(db)
+        async with db.writer() as conn:
+            await conn.execute("INSERT INTO items (name) VALUES ('a')")
+            await conn.commit()
+        async with db.reader() as conn:
+            rows = await conn.execute_fetchall("SELECT name FROM items")
+            with pytest.raises(sqlite3.OperationalError):
+                await conn.execute("INSERT INTO items (name) VALUES ('b')")
+        await db.close()
+        return [row["name"] for row in rows]
+    
+    assert asyncio.run(run()) == ["a"]
+
+def test_reads_proceed_while_the_writer_is_held(db):
+    async def run():
+        await create_table(db)
+        released = asyncio.Event()
+        
+        async def hold_writer():
+            async with db.writer() as conn:
+                await conn.execute("INSERT INTO items (name) VALUES ('pending')")
+                await released.wait()
+                await conn.commit()
+        
+        holder = asyncio.create_task(hold_writer())
+        await asyncio.sleep(0.05)
+        
+        async def count():
+            async with db.reader() as conn:
+                return (await conn.execute_fetchall("SELECT COUNT(*) FROM items"))[0][0]
+        # Uncommitted rows stay invisible to the readers, and no read waits for the writer.
+        counts = await asyncio.wait_for(asyncio.gather(count(), count(), count()), 2)
+        released.set()
+        await holder
+        after = await count()
+        await db.close()
+        return counts, after
+    
+    assert asyncio.run(run()) == ([0, 0, 0], 1)
+
+def test_failed_write_is_rolled_back(db):
+    async def run():
+        await create_table(db)
+        with pytest.raises(RuntimeError):
+            async with db.writer() as conn:
+                await conn.execute("INSERT INTO items (name) VALUES ('lost')")
+                raise RuntimeError("abort")
+        async with db.writer() as conn:
+            await conn.commit()
+        async with db.reader() as conn:
+            rows = await conn.execute_fetchall("SELECT COUNT(*) FROM items")
+        await db.close()
+        return rows[0][0]
+    
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from core.depth_engine import DepthEngine, compute_depth
+from models.opportunity import ArbitrageType, Opportunity, TradeLeg
+
+FEE = 0.02
+
+def test_binary_set_sized_to_break_even():
+    ladders = [[(0.45, 100.0), (0.55, 100.0)], [(0.50, 300.0)]]
+    result = compute_depth(ladders, FEE)
+    
+    assert result.size == 100.0
+    assert result.cost == pytest.approx(95.0)
+    assert result.profit == pytest.approx(100 * 0.98 - 95.0)
+
+def test_three_leg_no_set_sized_against_its_payout():
+    # Buying NO on every leg of a 3-outcome event pays 2 per set.
+    ladders = [[(0.60, 50.0), (0.70, 50.0)], [(0.60, 100.0)], [(0.65, 100.0)]]
+    result = compute_depth(ladders, FEE, guaranteed_payout=2.0)
+    
+    assert result.size == 100.0
+    assert result.vwap_cost == pytest.approx(1.90)
+    assert result.profit == pytest.approx(100 * 2.0 * 0.98 - 190.0)
+    assert result.profit > 0
+    
+    unit = compute_depth(ladders, FEE)
+    assert unit.size == 0.0
+
+def test_analyze_uses_opportunity_payout(monkeypatch):
+    books = {"a": [(0.60, 40.0)], "b": [(0.60, 40.0)], "c": [(0.65, 40.0)]}
+    engine = DepthEngine()
+    
+    async def get_asks(token_id: str):
+        return books[token_id]
+    monkeypatch.setattr(engine, "get_asks", get_asks)
+    
+    opportunity = Opportunity(
+        id="event-no", detected_at=datetime.utcnow(), arbitrage_type=ArbitrageType.MULTI_MARKET_INCONSISTENCY,
+        market_question="Event (buy all NO)", markets_involved=["a", "b", "c"], total_cost=1.85,
+        guaranteed_payout=2.0, gross_profit=0.15, gross_profit_percent=8.11, estimated_fees=0.04,
+        net_profit=0.11, net_profit_percent=5.95, min_liquidity=1000,
+        trade_legs=[TradeLeg(token_id=token_id, outcome="No", price=books[token_id][0][0]) for token_id in books]
+    )
+    asyncio.run(engine.analyze(opportunity))
+    
+    assert opportunity.max_executable_size == 40.0
+    assert opportunity.vwap_cost == pytest.approx(1.85)
+    assert opportunity.depth_adjusted_profit == pytest.approx(40 * 1.96 - 40 * 1.85)
+    assert all(leg.suggested_size == 40.0 for leg in opportunity.trade_legs)
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from core.market_catalog import MarketCatalog
+from core.market_fetcher import PageFetchError, market_fetcher
+
+def raw_market(i: int) -> dict:
+    return {
+        "id": str(i),
+        "conditionId": f"0x{i:04x}",
+        "question": f"Market {i}?",
+        "liquidity": 5000,
+        "tokens": [{"token_id": f"{i}-yes", "outcome": "Yes"}, {"token_id": f"{i}-no", "outcome": "No"}]
+    }
+
+def serve(monkeypatch, listing: list, failing_offset: int = None):
+    async def request(url: str, params: dict = None, retries: int = None):
+        offset, limit = params["offset"], params["limit"]
+        if offset == failing_offset:
+            return {}
+        return listing[offset:offset + limit]
+    monkeypatch.setattr(market_fetcher, "_request_with_retry", request)
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "FETCH_PAGE_SIZE", 3)
+    monkeypatch.setattr(settings, "FETCH_CONCURRENCY", 2)
+
+def test_full_refresh_prunes_delisted_markets(monkeypatch):
+    catalog = MarketCatalog()
+    serve(monkeypatch, [raw_market(i) for i in range(20)])
+    asyncio.run(catalog.refresh(full=True))
+    
+    serve(monkeypatch, [raw_market(i) for i in range(18)])
+    diff = asyncio.run(catalog.refresh(full=True))
+    
+    assert len(catalog) == 18
+    assert diff["removed"] == 2
+
+def test_failed_page_aborts_full_refresh_without_pruning(monkeypatch):
+    catalog = MarketCatalog()
+    serve(monkeypatch, [raw_market(i) for i in range(20)])
+    asyncio.run(catalog.refresh(full=True))
+    version = catalog.version
+    
+    serve(monkeypatch, [raw_market(i) for i in range(20)], failing_offset=6)
+    with pytest.raises(PageFetchError):
+        asyncio.run(catalog.refresh(full=True))
+    
+    assert len(catalog) == 20
+    assert len(catalog.token_ids) == 40
+    assert catalog.version == version
+    assert not catalog.last_diff["removed"]
+
+def test_failed_page_on_cold_load_leaves_catalog_unloaded(monkeypatch):
+    catalog = MarketCatalog()
+    serve(monkeypatch, [raw_market(i) for i in range(20)], failing_offset=9)
+    with pytest.raises(PageFetchError):
+        asyncio.run(catalog.refresh(full=True))
+    
+    assert not catalog.is_loaded
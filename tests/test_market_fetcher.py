@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from core.market_fetcher import MarketFetcher
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "FETCH_PAGE_SIZE", 10)
+    monkeypatch.setattr(settings, "FETCH_CONCURRENCY", 4)
+
+def serve(monkeypatch, fetcher: MarketFetcher, total: int, delays: dict = None) -> list:
+    requested = []
+    
+    async def request(url: str, params: dict = None, retries: int = None):
+        offset, limit = params["offset"], params["limit"]
+        requested.append(offset)
+        await asyncio.sleep((delays or {}).get(offset, 0.0))
+        return list(range(offset, min(offset + limit, total)))
+    monkeypatch.setattr(fetcher, "_request_with_retry", request)
+    return requested
+
+async def collect(fetcher: MarketFetcher) -> list:
+    return [page async for page in fetcher.iter_pages("http://gamma/markets")]
+
+def test_pages_are_yielded_in_offset_order_when_they_complete_out_of_order(monkeypatch):
+    fetcher = MarketFetcher()
+    serve(monkeypatch, fetcher, 45, delays={0: 0.05, 10: 0.03, 20: 0.01})
+    
+    pages = asyncio.run(collect(fetcher))
+    
+    assert [page[0] for page in pages] == [0, 10, 20, 30, 40]
+    assert [item for page in pages for item in page] == list(range(45))
+
+def test_short_page_stops_the_listing(monkeypatch):
+    fetcher = MarketFetcher()
+    # The short page at offset 20 lands last; pages already issued past it are dropped.
+    requested = serve(monkeypatch, fetcher, 25, delays={20: 0.05})
+    
+    pages = asyncio.run(collect(fetcher))
+    
+    assert [item for page in pages for item in page] == list(range(25))
+    assert max(requested) < 20 + settings.FETCH_PAGE_SIZE * settings.FETCH_CONCURRENCY
+
+def test_exact_multiple_ends_on_the_first_empty_page(monkeypatch):
+    fetcher = MarketFetcher()
+    requested = serve(monkeypatch, fetcher, 30)
+    
+    pages = asyncio.run(collect(fetcher))
+    
+    assert [len(page) for page in pages] == [10, 10, 10]
+    assert 30 in requested
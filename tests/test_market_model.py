@@ -0,0 +1,38 @@
+from core.arbitrage_detector import detect_arbitrage
+from models.market import Market, MarketRecord
+
+RAW = {
+    "id": "42",
+    "question": "Will it rain?",
+    "conditionId": "0xabc",
+    "slug": "will-it-rain",
+    "volume24hr": "1200.5",
+    "liquidity": 5000,
+    "closed": False,
+    "groupItemTitle": "Weather",
+    "tokens": [
+        {"token_id": "42-yes", "outcome": "Yes", "price": "0.45"},
+        {"token_id": "42-no", "outcome": "No", "price": 0.47}
+    ]
+}
+
+def test_record_parses_like_the_pydantic_model():
+    record = MarketRecord.from_api(RAW)
+    
+    assert record.key == "0xabc"
+    assert record.to_model().model_dump() == Market.from_api(RAW).model_dump()
+
+def test_record_and_model_detect_the_same_opportunity():
+    from_record = detect_arbitrage(MarketRecord.from_api(RAW))
+    from_model = detect_arbitrage(Market.from_api(RAW))
+    
+    assert from_record.model_dump(exclude={"detected_at"}) == from_model.model_dump(exclude={"detected_at"})
+
+def test_same_listing_ignores_prices_only():
+    record = MarketRecord.from_api(RAW)
+    repriced = MarketRecord.from_api({**RAW, "tokens": [{**t, "price": 0.5} for t in RAW["tokens"]]})
+    renamed = MarketRecord.from_api({**RAW, "question": "Will it snow?"})
+    
+    assert record.same_listing(repriced)
+    assert not record.same_listing(renamed)
+    assert MarketRecord.from_api({**RAW, "conditionId": ""}).key == "42"
@@ -0,0 +1,67 @@
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metrics import router
+from core.metrics import MetricsRegistry
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*"(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*")*\})? (\S+)$')
+
+def test_metrics_content_type_header():
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "# TYPE arbitrage_active_opportunities gauge" in response.text
+
+def test_every_exposed_sample_is_well_formed_and_typed():
+    app = FastAPI()
+    app.include_router(router)
+    text = TestClient(app).get("/metrics").text
+    
+    assert text.endswith("\n")
+    typed = {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            typed[name] = kind
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        name = match.group(1)
+        base = re.sub(r"_(bucket|sum|count)$", "", name) if name not in typed else name
+        assert base in typed, line
+        float(match.group(3))
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests", ["endpoint"])
+    registry.gauge("demo_depth", "Queue depth", collect=lambda: 3)
+    latency = registry.histogram("demo_latency_seconds", "Latency", ["endpoint"], buckets=(0.1, 1.0))
+    
+    requests.inc('/a"b')
+    requests.inc('/a"b', amount=2)
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+    latency.observe(5.0, "/a")
+    
+    assert registry.render() == "\n".join([
+        "# HELP demo_requests_total Requests",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{endpoint="/a\\"b"} 3.0',
+        "# HELP demo_depth Queue depth",
+        "# TYPE demo_depth gauge",
+        "demo_depth 3.0",
+        "# HELP demo_latency_seconds Latency",
+        "# TYPE demo_latency_seconds histogram",
+        'demo_latency_seconds_bucket{endpoint="/a",le="0.1"} 1',
+        'demo_latency_seconds_bucket{endpoint="/a",le="1.0"} 2',
+        'demo_latency_seconds_bucket{endpoint="/a",le="+Inf"} 3',
+        'demo_latency_seconds_sum{endpoint="/a"} 5.55',
+        'demo_latency_seconds_count{endpoint="/a"} 3'
+    ]) + "\n"
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import settings
+from core.http_pool import HttpClientPool
+from services import notifications
+from services.notifications import (
+    DiscordSink, FileSink, HttpSink, NotificationDispatcher, NotificationSink, WebhookSink
+)
+
+class Receiver:
+    def __init__(self):
+        self.bodies = defaultdict(list)
+        self.statuses = defaultdict(list)
+        self.scripted = defaultdict(list)
+        self._lock = threading.Lock()
+        receiver = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with receiver._lock:
+                    script = receiver.scripted[self.path]
+                    status, reply = script.pop(0) if script else (204, None)
+                    receiver.statuses[self.path].append(status)
+                    if status < 300:
+                        receiver.bodies[self.path].append(body)
+                payload = json.dumps(reply).encode() if reply is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+    
+    def fail(self, path: str, *responses):
+        self.scripted[path].extend(responses)
+
+@pytest.fixture
+def receiver():
+    receiver = Receiver()
+    receiver.thread.start()
+    yield receiver
+    receiver.server.shutdown()
+    receiver.server.server_close()
+
+@pytest.fixture(autouse=True)
+def fast_delivery(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_RATE_LIMIT_PER_SECOND", 100.0)
+    monkeypatch.setattr(settings, "NOTIFY_RATE_LIMIT_BURST", 100)
+    monkeypatch.setattr(settings, "NOTIFY_COALESCE_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "NOTIFY_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "RETRY_BASE_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(notifications, "_http", HttpClientPool())
+
+def opportunity(i: int) -> dict:
+    return {
+        "id": f"opp-{i}",
+        "market_question": f"Market {i}?",
+        "net_profit": 0.05,
+        "net_profit_percent": 5.0,
+        "min_liquidity": 2500,
+        "slug": f"market-{i}"
+    }
+
+async def dispatch(sinks: list, batches: list) -> NotificationDispatcher:
+    dispatcher = NotificationDispatcher()
+    dispatcher.start(sinks)
+    try:
+        for batch in batches:
+            dispatcher.submit_many(batch)
+            await asyncio.sleep(0)
+        await asyncio.wait_for(dispatcher.wait_idle(), 10)
+    finally:
+        await dispatcher.stop()
+        await notifications._http.close()
+    return dispatcher
+
+def test_sinks_are_abstract():
+    with pytest.raises(TypeError):
+        NotificationSink()
+    with pytest.raises(TypeError):
+        HttpSink("partial", "http://127.0.0.1", 1)
+
+def test_repeated_opportunities_are_notified_once(receiver):
+    first = [opportunity(i) for i in range(3)]
+    again = [opportunity(1), opportunity(2), opportunity(3)]
+    dispatcher = asyncio.run(dispatch([WebhookSink(receiver.url("/hook"))], [first, again]))
+    
+    delivered = [item["id"] for body in receiver.bodies["/hook"] for item in body["opportunities"]]
+    assert sorted(delivered) == ["opp-0", "opp-1", "opp-2", "opp-3"]
+    assert dispatcher.stats["deduped"] == 2
+    assert dispatcher.stats["queued"] == 4
+
+def test_burst_is_coalesced_per_sink_batch_limit(receiver, tmp_path):
+    path = str(tmp_path / "notifications.jsonl")
+    sinks = [DiscordSink(receiver.url("/discord")), WebhookSink(receiver.url("/hook")), FileSink(path)]
+    asyncio.run(dispatch(sinks, [[opportunity(i) for i in range(25)]]))
+    
+    assert [len(body["embeds"]) for body in receiver.bodies["/discord"]] == [10, 10, 5]
+    assert receiver.bodies["/discord"][0]["embeds"][0]["url"] == "https://polymarket.com/event/market-0"
+    assert [body["count"] for body in receiver.bodies["/hook"]] == [25]
+    with open(path) as f:
+        assert [json.loads(line)["id"] for line in f] == [f"opp-{i}" for i in range(25)]
+
+def test_failing_sink_is_retried_and_does_not_block_others(receiver):
+    receiver.fail("/flaky", (500, None), (429, {"retry_after": 0.05}))
+    receiver.fail("/broken", (500, None), (500, None), (500, None))
+    sinks = [
+        WebhookSink(receiver.url("/flaky")),
+        DiscordSink(receiver.url("/broken")),
+        WebhookSink(receiver.url("/hook"))
+    ]
+    sinks[1].name = "broken"
+    dispatcher = asyncio.run(dispatch(sinks, [[opportunity(i) for i in range(5)]]))
+    
+    assert receiver.statuses["/flaky"] == [500, 429, 204]
+    assert [body["count"] for body in receiver.bodies["/flaky"]] == [5]
+    assert receiver.statuses["/broken"] == [500, 500, 500]
+    assert not receiver.bodies["/broken"]
+    assert [body["count"] for body in receiver.bodies["/hook"]] == [5]
+    assert sinks[0].limiter.throttled == 1
+    assert dispatcher.stats["retried"] == 4
+    assert dispatcher.stats["failed"] == 1
+    assert dispatcher.stats["messages"] == 2
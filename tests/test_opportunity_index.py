@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import routes
+from core.opportunity_index import OpportunityIndex
+from models.opportunity import ArbitrageType, Opportunity
+
+def entry(opp_id: str, profit_percent: float) -> dict:
+    return Opportunity(
+        id=opp_id, detected_at=datetime.utcnow(), arbitrage_type=ArbitrageType.BINARY_MISPRICING,
+        market_question=opp_id, markets_involved=[opp_id], total_cost=0.95, gross_profit=0.05,
+        gross_profit_percent=profit_percent, estimated_fees=0.0, net_profit=0.05, net_profit_percent=profit_percent,
+        trade_legs=[], min_liquidity=1000
+    ).to_dict()
+
+@pytest.fixture
+def index(monkeypatch):
+    index = OpportunityIndex()
+    monkeypatch.setattr(routes, "opportunity_index", index)
+    return index
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+def test_unchanged_index_answers_304(index, client):
+    index.upsert(entry("a", 3.0))
+    first = client.get("/opportunities")
+    etag = first.headers["etag"]
+    
+    again = client.get("/opportunities", headers={"If-None-Match": etag})
+    
+    assert first.status_code == 200
+    assert [opp["id"] for opp in first.json()] == ["a"]
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert not again.content
+
+def test_any_change_moves_the_etag(index, client):
+    index.upsert(entry("a", 3.0))
+    etag = client.get("/summary").headers["etag"]
+    
+    index.upsert(entry("b", 5.0))
+    changed = client.get("/summary", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["active_opportunities"] == 2
+    
+    index.remove("a")
+    removed = client.get("/opportunities", headers={"If-None-Match": changed.headers["etag"]})
+    assert removed.status_code == 200
+    assert [opp["id"] for opp in removed.json()] == ["b"]
+
+def test_rendered_bodies_are_cached_per_query_until_a_change(index):
+    index.upsert(entry("a", 3.0))
+    builds = []
+    
+    def build():
+        builds.append(1)
+        return index.query()
+    
+    first = index.render(("list", 100), build)
+    assert index.render(("list", 100), build) is first
+    index.upsert(entry("b", 1.0))
+    index.render(("list", 100), build)
+    
+    assert len(builds) == 2
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from core.pipeline import Pipeline
+
+async def numbers(n: int, produced: list = None):
+    for i in range(n):
+        if produced is not None:
+            produced.append(i)
+        yield i
+
+def test_items_flow_through_every_stage_and_none_is_dropped():
+    results = []
+    
+    async def double(x):
+        return x * 2
+    
+    async def evens(x):
+        return x if x % 4 == 0 else None
+    
+    async def collect(x):
+        results.append(x)
+    
+    pipeline = (
+        Pipeline(numbers(20), queue_size=2)
+        .add_stage("double", double, workers=3)
+        .add_stage("filter", evens)
+        .add_stage("collect", collect)
+    )
+    asyncio.run(pipeline.run())
+    
+    assert sorted(results) == list(range(0, 40, 4))
+    assert pipeline.get_stats() == {
+        "double": {"in": 20, "out": 20},
+        "filter": {"in": 20, "out": 10},
+        "collect": {"in": 10, "out": 0}
+    }
+
+def test_source_is_not_read_ahead_of_a_slow_stage():
+    produced = []
+    lead = []
+    
+    async def slow(x):
+        lead.append(len(produced) - x)
+        await asyncio.sleep(0.005)
+    
+    asyncio.run(Pipeline(numbers(30, produced), queue_size=2).add_stage("slow", slow).run())
+    
+    # One item in the handler, a full queue and one waiting to be put.
+    assert max(lead) <= 2 + 2
+
+def test_stage_failure_cancels_the_pipeline():
+    seen = []
+    
+    async def fail_on_five(x):
+        if x == 5:
+            raise ValueError("boom")
+        return x
+    
+    async def collect(x):
+        seen.append(x)
+    
+    pipeline = Pipeline(numbers(1000), queue_size=2).add_stage("check", fail_on_five).add_stage("collect", collect)
+    with pytest.raises(ValueError):
+        asyncio.run(pipeline.run())
+    assert len(seen) < 10
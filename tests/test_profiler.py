@@ -0,0 +1,60 @@
+import marshal
+import time
+
+import pytest
+
+from core.profiler import ScanProfiler
+
+def busy_scan(seconds: float = 0.02):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+def profile(profiler: ScanProfiler, scans: int):
+    for scan_id in range(scans):
+        profiler.begin_scan()
+        busy_scan()
+        profiler.end_scan(scan_id)
+
+def test_deterministic_session_covers_exactly_the_requested_scans():
+    profiler = ScanProfiler()
+    profiler.arm(2, "deterministic", 1.0, allocations=True, top=5)
+    
+    profile(profiler, 1)
+    assert profiler.armed
+    assert profiler.dump_pstats() is None
+    
+    profile(profiler, 1)
+    status = profiler.get_status()
+    assert not status["armed"]
+    session = status["session"]
+    assert session["scans_profiled"] == 2
+    assert any("busy_scan" in entry["function"] for entry in session["top_functions"])
+    assert [diff["scan_id"] for diff in session["allocation_diffs"]] == [0, 0]
+    
+    stats = marshal.loads(profiler.dump_pstats())
+    assert any(func[2] == "busy_scan" for func in stats)
+    assert any(line.split(" ")[0].endswith("test_profiler:busy_scan") for line in profiler.dump_collapsed().splitlines())
+
+def test_sampling_session_collects_stacks():
+    profiler = ScanProfiler()
+    profiler.arm(1, "sampling", 1.0, allocations=False, top=5)
+    
+    profile(profiler, 1)
+    
+    session = profiler.get_status()["session"]
+    assert session["samples"] > 0
+    assert "test_profiler:busy_scan" in profiler.dump_collapsed()
+
+def test_only_one_session_runs_at_a_time():
+    profiler = ScanProfiler()
+    profiler.arm(1, "deterministic", 1.0, allocations=False, top=5)
+    
+    with pytest.raises(RuntimeError):
+        profiler.arm(1, "deterministic", 1.0, allocations=False, top=5)
+    profiler.cancel()
+    assert not profiler.armed
+    with pytest.raises(ValueError):
+        profiler.arm(1, "tracing", 1.0, allocations=False, top=5)
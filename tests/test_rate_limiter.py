@@ -0,0 +1,72 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from config import settings
+from core.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+@pytest.fixture(autouse=True)
+def aimd(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_MIN_PER_SECOND", 1.0)
+    monkeypatch.setattr(settings, "RATE_LIMIT_DECREASE_FACTOR", 0.5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_INCREASE_STEP", 0.5)
+
+def response(status: int, **headers) -> httpx.Response:
+    return httpx.Response(status, headers={name.replace("_", "-"): value for name, value in headers.items()})
+
+def test_throttling_halves_the_rate_and_successes_add_back_linearly():
+    limiter = AdaptiveRateLimiter("test", 10.0, 5)
+    
+    limiter.on_response(response(429))
+    limiter.on_response(response(429))
+    assert limiter.rate == 2.5
+    assert limiter.tokens == 0.0
+    assert limiter.throttled == 2
+    
+    for _ in range(3):
+        limiter.on_response(response(200))
+    assert limiter.rate == 4.0
+    
+    for _ in range(3):
+        limiter.on_response(response(429))
+    assert limiter.rate == settings.RATE_LIMIT_MIN_PER_SECOND
+    
+    for _ in range(100):
+        limiter.on_response(response(200))
+    assert limiter.rate == limiter.max_rate
+
+def test_retry_after_blocks_acquire():
+    limiter = AdaptiveRateLimiter("test", 100.0, 5)
+    
+    assert limiter.on_response(response(429, retry_after="0.2")) == 0.2
+    
+    async def acquire_after_block() -> float:
+        start = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - start
+    assert asyncio.run(acquire_after_block()) > 0.19
+    assert limiter.waits >= 1
+
+def test_rate_limit_reset_is_used_without_retry_after():
+    limiter = AdaptiveRateLimiter("test", 100.0, 5)
+    
+    assert limiter.on_response(response(429, x_ratelimit_reset="3")) == 3.0
+    assert limiter.get_stats()["blocked_for_seconds"] > 2.5
+
+def test_exhausted_quota_blocks_until_reset():
+    limiter = AdaptiveRateLimiter("test", 100.0, 5)
+    
+    assert limiter.on_response(response(200, x_ratelimit_remaining="0", x_ratelimit_reset="2")) is None
+    assert limiter.get_stats()["blocked_for_seconds"] > 1.5
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    
+    assert parse_retry_after("7") == 7.0
+    assert 28 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
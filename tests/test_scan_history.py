@@ -0,0 +1,72 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.scanner import ArbitrageScanner, ScanState
+from models import database as database_module
+from models.connection import Database
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    database = Database(os.path.join(tmp_path, "scans.db"))
+    monkeypatch.setattr(database_module, "database", database)
+    return database
+
+async def tick(scanner: ArbitrageScanner, markets: int, error: str = None):
+    scan_id = await scanner._open_history(True)
+    scanner._scan = ScanState()
+    scanner._scan.scope = {"market"}
+    scanner._scan.markets_scanned = markets
+    scanner.last_phases = {"pipeline": 2.0}
+    await scanner._record_history(scan_id, 0, 0.01, error)
+
+def test_ticks_share_one_history_row(db):
+    async def run():
+        await database_module.init_database()
+        scanner = ArbitrageScanner()
+        for _ in range(4):
+            await tick(scanner, 10)
+        await tick(scanner, 10, error="boom")
+        await scanner.close_tick_window()
+        
+        scan_id = await scanner._open_history(False)
+        scanner._scan = ScanState()
+        await scanner._record_history(scan_id, 3, 0.5, None)
+        
+        history = await database_module.get_scan_history()
+        ticks = await database_module.get_scan_history(kind="ticks")
+        await db.close()
+        return history, ticks
+    
+    history, ticks = asyncio.run(run())
+    
+    assert [row["kind"] for row in history] == ["full", "ticks"]
+    assert len(ticks) == 1
+    assert ticks[0]["ticks"] == 5
+    assert ticks[0]["markets_scanned"] == 50
+    assert ticks[0]["phase_timings"] == {"pipeline": 10.0}
+    assert ticks[0]["status"] == "error"
+    assert ticks[0]["error_message"].startswith("1 of 5 ticks failed")
+
+def test_old_scans_are_pruned(db):
+    async def run():
+        await database_module.init_database()
+        old = await database_module.log_scan_start()
+        recent = await database_module.log_scan_start()
+        async with db.writer() as conn:
+            started_at = (datetime.utcnow() - timedelta(days=30)).isoformat()
+            await conn.execute("UPDATE scans SET started_at = ? WHERE id = ?", (started_at, old))
+            await conn.commit()
+        
+        cutoff = (datetime.utcnow() - timedelta(days=7)).isoformat()
+        removed = await database_module.delete_scans_before(cutoff)
+        remaining = [row["id"] for row in await database_module.get_scan_history()]
+        await db.close()
+        return removed, remaining, recent
+    
+    removed, remaining, recent = asyncio.run(run())
+    
+    assert removed == 1
+    assert remaining == [recent]
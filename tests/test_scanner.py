@@ -0,0 +1,156 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from config import settings
+from core import cluster as cluster_module
+from core import scanner as scanner_module
+from core.arbitrage_detector import generate_opportunity_id
+from core.cluster import ClusterNode
+from core.event_index import EventGroup, EventIndex
+from core.hash_ring import HashRing
+from core.lifecycle import OpportunityLifecycle
+from core.market_catalog import MarketCatalog
+from core.opportunity_index import OpportunityIndex
+from core.scan_scheduler import ScanScheduler
+from core.scanner import ArbitrageScanner, ScanState
+from core.write_behind import WriteBehindQueue
+from models import database as database_module
+from models.connection import Database
+from models.market import MarketRecord, TokenRecord
+from models.opportunity import ArbitrageType, Opportunity
+
+def opportunity(opp_id: str, markets: list) -> Opportunity:
+    return Opportunity(
+        id=opp_id, detected_at=datetime.utcnow(), arbitrage_type=ArbitrageType.BINARY_MISPRICING,
+        market_question=opp_id, markets_involved=markets, total_cost=0.95, gross_profit=0.05,
+        gross_profit_percent=5.26, estimated_fees=0.0, net_profit=0.05, net_profit_percent=5.26,
+        trade_legs=[], min_liquidity=1000
+    )
+
+def record(key: str, yes: float, no: float) -> MarketRecord:
+    tokens = [TokenRecord(f"{key}-yes", "Yes", yes), TokenRecord(f"{key}-no", "No", no)]
+    return MarketRecord(key, f"{key}?", key, key, tokens, 0.0, 5000.0, False, None)
+
+def test_scoped_scan_expires_only_evaluated_or_delisted_markets(monkeypatch):
+    monkeypatch.setattr(scanner_module.market_catalog, "markets", {"in-scope": None, "out-of-scope": None})
+    scanner = ArbitrageScanner()
+    scanner.active_opportunities = {
+        "a": opportunity("a", ["in-scope"]),
+        "b": opportunity("b", ["out-of-scope"]),
+        "c": opportunity("c", ["delisted"])
+    }
+    scanner._scan = ScanState()
+    scanner._scan.scope = {"in-scope"}
+    
+    assert scanner._expired_ids() == {"a", "c"}
+
+def test_unchanged_markets_skip_detection_and_carry_their_opportunity(monkeypatch):
+    monkeypatch.setattr(settings, "INCREMENTAL_DETECTION", True)
+    monkeypatch.setattr(settings, "SNAPSHOTS_ENABLED", False)
+    monkeypatch.setattr(settings, "EVENT_ARBITRAGE_ENABLED", False)
+    monkeypatch.setattr(scanner_module, "opportunity_lifecycle", OpportunityLifecycle())
+    batch = [record("cheap", 0.45, 0.45), record("fair", 0.50, 0.50)]
+    scanner = ArbitrageScanner()
+    
+    scanner._scan = ScanState()
+    assert scanner._build_markets_inline(batch, {}) == batch
+    assert scanner.last_price_state("cheap") == (5000.0, 0.45, 0.45)
+    held = opportunity(generate_opportunity_id(batch[0]), ["cheap"])
+    scanner.active_opportunities = {held.id: held}
+    
+    scanner._scan = ScanState()
+    assert scanner._build_markets_inline(batch, {"fair-yes": {"price": 0.50}}) is None
+    assert scanner._scan.dirty_markets == 0
+    assert scanner._scan.opportunities == [held]
+    assert scanner._scan.carried_over == 1
+    
+    scanner._scan = ScanState()
+    assert scanner._build_markets_inline(batch, {"fair-yes": {"price": 0.48}}) == [batch[1]]
+    assert scanner.last_price_state("fair") == (5000.0, 0.48, 0.50)
+    assert scanner._scan.carried_over == 1
+
+def test_event_regrouping_releases_markets_moved_to_another_node(monkeypatch):
+    monkeypatch.setattr(settings, "CLUSTER_ENABLED", True)
+    events = EventIndex()
+    node = ClusterNode()
+    node.node_id = "node-a"
+    node.ring = HashRing(["node-a", "node-b"])
+    node.ring_version = 1
+    monkeypatch.setattr(cluster_module, "event_index", events)
+    monkeypatch.setattr(scanner_module, "event_index", events)
+    monkeypatch.setattr(scanner_module, "cluster_node", node)
+    monkeypatch.setattr(scanner_module, "opportunity_lifecycle", OpportunityLifecycle())
+    
+    key = next(f"m{i}" for i in range(1000) if node.ring.owner(f"m{i}") == "node-a")
+    event_id = next(f"e{i}" for i in range(1000) if node.ring.owner(f"e{i}") == "node-b")
+    monkeypatch.setattr(scanner_module.market_catalog, "markets", {key: record(key, 0.45, 0.45)})
+    scanner = ArbitrageScanner()
+    scanner.active_opportunities = {"a": opportunity("a", [key])}
+    scanner._scan = ScanState()
+    
+    scanner._release_unowned()
+    assert list(scanner.active_opportunities) == ["a"]
+    
+    events.install([EventGroup(event_id, "Event", "event", True, [key, "other"])])
+    scanner._release_unowned()
+    assert not scanner.active_opportunities
+    assert scanner._scan.removed == ["a"]
+
+@pytest.fixture
+def tiered(tmp_path, monkeypatch):
+    for name, value in {
+        "SCAN_SCHEDULER": "tiered", "SCHEDULER_TICK_SECONDS": 0.02, "SCHEDULER_HOT_INTERVAL_SECONDS": 0.05,
+        "SCHEDULER_WARM_INTERVAL_SECONDS": 30.0, "SCHEDULER_COLD_INTERVAL_SECONDS": 60.0,
+        "OPPORTUNITY_GRACE_SECONDS": 0.3, "CATALOG_REFRESH_SECONDS": 3600.0, "EVENT_ARBITRAGE_ENABLED": False,
+        "DEPTH_ANALYSIS_ENABLED": False, "SNAPSHOTS_ENABLED": False, "EXECUTION_MODE": "inline"
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    monkeypatch.setattr(database_module, "database", Database(os.path.join(tmp_path, "tiered.db")))
+    catalog = MarketCatalog()
+    catalog.restore({key: record(key, 0.45, 0.45) if key == "m0" else record(key, 0.55, 0.55) for key in ("m0", "m1")}, 1, datetime.utcnow())
+    catalog.restored = False
+    for name, value in {
+        "market_catalog": catalog, "scan_scheduler": ScanScheduler(), "opportunity_lifecycle": OpportunityLifecycle(),
+        "opportunity_index": OpportunityIndex(), "write_behind": WriteBehindQueue()
+    }.items():
+        monkeypatch.setattr(scanner_module, name, value)
+    
+    prices = {}
+    async def fetch_prices(token_ids):
+        return {token_id: {"price": prices[token_id]} for token_id in token_ids if token_id in prices}
+    monkeypatch.setattr(scanner_module.market_fetcher, "fetch_prices", fetch_prices)
+    return prices
+
+def test_vanished_opportunity_expires_within_grace_on_tiered_scans(tiered):
+    prices = tiered
+    
+    async def run():
+        await database_module.init_database()
+        scanner = ArbitrageScanner()
+        task = asyncio.create_task(scanner.start_continuous_scanning())
+        try:
+            deadline = time.monotonic() + 5
+            while not scanner.active_opportunities and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            assert list(scanner.active_opportunities) == [generate_opportunity_id(record("m0", 0.45, 0.45))]
+            
+            prices.update({"m0-yes": 0.55, "m0-no": 0.55})
+            vanished = time.monotonic()
+            while scanner.active_opportunities and time.monotonic() - vanished < 5:
+                await asyncio.sleep(0.01)
+            return time.monotonic() - vanished, scanner_module.scan_scheduler.get_stats()["tiers"]
+        finally:
+            scanner.stop()
+            await scanner.close_tick_window()
+            await asyncio.gather(task, return_exceptions=True)
+            await scanner_module.write_behind.stop()
+            await database_module.database.close()
+    
+    expired_after, tiers = asyncio.run(run())
+    
+    assert expired_after < settings.OPPORTUNITY_GRACE_SECONDS + 0.5
+    assert tiers["cold"]["markets"] == 2
@@ -0,0 +1,42 @@
+from core import shard_worker
+from core.arbitrage_detector import build_opportunity
+from models.market import MarketRecord, TokenRecord
+
+PARAMS = (1000.0, 1.0, 0.02, True)
+
+def record(key: str, yes: float, no: float) -> MarketRecord:
+    tokens = [TokenRecord(f"{key}-yes", "Yes", yes), TokenRecord(f"{key}-no", "No", no)]
+    return MarketRecord(key, f"{key}?", key, key, tokens, 0.0, 5000.0, False, None)
+
+def static(last: list) -> tuple:
+    batch = [record("a", 0.40, 0.50), record("b", 0.50, 0.50), record("c", 0.30, 0.30)]
+    return (
+        [(m.id, m.question, m.condition_id, m.slug, m.event_title, m.liquidity) for m in batch],
+        [tuple((t.token_id, t.outcome, t.price) for t in m.tokens) for m in batch],
+        last
+    )
+
+def test_scan_once_evaluates_against_parent_state_and_keeps_no_shard():
+    last = [None, (5000.0, 0.50, 0.50), (5000.0, 0.30, 0.30)]
+    changed, opportunities, carried, _ = shard_worker.scan_once(static(last), {"a-yes": {"price": 0.45}}, PARAMS)
+    
+    assert changed == [(0, (0.45, 0.50))]
+    assert carried == [1, 2]
+    assert not shard_worker._shards
+    
+    expected = build_opportunity(record("a", 0.45, 0.50), PARAMS[2], PARAMS[1])
+    assert [opportunity.model_dump(exclude={"detected_at"}) for opportunity in opportunities] == [
+        expected.model_dump(exclude={"detected_at"})
+    ]
+
+def test_scan_shard_keeps_state_between_calls():
+    last = [None, None, None]
+    first = shard_worker.scan_shard("s", 1, static(last), {}, PARAMS)
+    again = shard_worker.scan_shard("s", 1, None, {}, PARAMS)
+    
+    assert [pos for pos, _ in first[0]] == [0, 1, 2]
+    assert [opportunity.markets_involved for opportunity in first[1]] == [["a"], ["c"]]
+    assert again[0] == [] and again[1] == []
+    assert again[2] == [0, 2]
+    assert shard_worker.scan_shard("s", 2, None, {}, PARAMS) is None
+    shard_worker.drop_shards([])
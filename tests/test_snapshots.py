@@ -0,0 +1,81 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import settings
+from core.snapshots import SnapshotRecorder, unpack_prices
+from models import database as database_module
+from models.connection import Database
+from models.database import get_market_snapshots, init_database
+from models.market import MarketRecord, TokenRecord
+
+START = datetime(2026, 1, 5, 12, 0, 0)
+
+@pytest.fixture(autouse=True)
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_module, "database", Database(os.path.join(tmp_path, "snapshots.db")))
+    monkeypatch.setattr(settings, "SNAPSHOT_RAW_RETENTION_HOURS", 0)
+    monkeypatch.setattr(settings, "SNAPSHOT_MINUTE_RETENTION_DAYS", 7)
+    monkeypatch.setattr(settings, "SNAPSHOT_HOUR_RETENTION_DAYS", 90)
+    asyncio.run(init_database())
+    yield
+    asyncio.run(database_module.database.close())
+
+def market(yes: float, no: float) -> MarketRecord:
+    tokens = [TokenRecord("m-yes", "Yes", yes), TokenRecord("m-no", "No", no)]
+    return MarketRecord("m", "M?", "0xm", "m", tokens, 100.0, 5000.0, False, None)
+
+def record(recorder: SnapshotRecorder, at: datetime, yes: float, no: float):
+    recorder.record(1, at.isoformat(), market(yes, no))
+
+def test_raw_ticks_roll_up_to_minutes_then_hours():
+    recorder = SnapshotRecorder()
+    # Two minutes of ticks, the second minute with its low in the middle.
+    record(recorder, START + timedelta(seconds=5), 0.50, 0.50)
+    record(recorder, START + timedelta(seconds=40), 0.48, 0.49)
+    record(recorder, START + timedelta(seconds=65), 0.47, 0.48)
+    record(recorder, START + timedelta(seconds=80), 0.45, 0.45)
+    record(recorder, START + timedelta(seconds=100), 0.49, 0.50)
+    
+    async def run():
+        await recorder.flush()
+        await recorder.maintain(START + timedelta(minutes=5))
+        minutes = await get_market_snapshots("0xm", resolution=60)
+        raw = await get_market_snapshots("0xm", resolution=1)
+        await recorder.maintain(START + timedelta(hours=2))
+        hours = await get_market_snapshots("0xm", resolution=3600)
+        return minutes, raw, hours
+    minutes, raw, hours = asyncio.run(run())
+    
+    assert not raw
+    assert [row["snapshot_at"] for row in minutes] == ["2026-01-05T12:01:00", "2026-01-05T12:00:00"]
+    latest, first = minutes
+    assert latest["price_sum"] == pytest.approx(0.99)
+    assert unpack_prices(latest["token_prices"]) == [0.49, 0.50]
+    assert (latest["price_sum_min"], latest["price_sum_max"], latest["samples"]) == pytest.approx((0.90, 0.99, 3))
+    assert (first["price_sum_min"], first["price_sum_max"], first["samples"]) == pytest.approx((0.97, 1.00, 2))
+    
+    assert len(hours) == 1
+    assert hours[0]["snapshot_at"] == "2026-01-05T12:00:00"
+    assert (hours[0]["price_sum_min"], hours[0]["price_sum_max"], hours[0]["samples"]) == pytest.approx((0.90, 1.00, 5))
+    assert recorder.rolled_up == 3
+
+def test_open_bucket_is_not_rolled_up_until_it_closes():
+    recorder = SnapshotRecorder()
+    record(recorder, START + timedelta(seconds=5), 0.50, 0.50)
+    
+    async def run():
+        await recorder.flush()
+        await recorder.maintain(START + timedelta(seconds=30))
+        before = await get_market_snapshots("0xm", resolution=60)
+        raw = await get_market_snapshots("0xm", resolution=1)
+        await recorder.maintain(START + timedelta(seconds=90))
+        after = await get_market_snapshots("0xm", resolution=60)
+        return before, raw, after
+    before, raw, after = asyncio.run(run())
+    
+    assert not before
+    assert len(raw) == 1
+    assert [row["samples"] for row in after] == [1]
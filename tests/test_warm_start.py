@@ -0,0 +1,116 @@
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+
+from config import settings
+from core import scanner as scanner_module
+from core import warm_start as warm_start_module
+from core.event_index import EventGroup, EventIndex
+from core.lifecycle import OpportunityLifecycle
+from core.market_catalog import MarketCatalog
+from core.opportunity_index import OpportunityIndex
+from core.scanner import ArbitrageScanner
+from core.warm_start import WarmStart
+from core.write_behind import WriteBehindQueue
+from models import database as database_module
+from models.connection import Database
+from models.database import get_active_opportunity_ids, init_database, opportunity_row, write_opportunity_batch
+from models.market import MarketRecord, TokenRecord
+from models.opportunity import ArbitrageType, Opportunity
+
+@pytest.fixture(autouse=True)
+def checkpoint_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WARM_START_ENABLED", True)
+    monkeypatch.setattr(settings, "CLUSTER_ENABLED", False)
+    monkeypatch.setattr(settings, "WARM_START_PATH", os.path.join(tmp_path, "warm.bin"))
+    monkeypatch.setattr(settings, "WARM_START_MAX_AGE_SECONDS", 3600)
+    monkeypatch.setattr(database_module, "database", Database(os.path.join(tmp_path, "warm.db")))
+
+def fresh_process(monkeypatch) -> ArbitrageScanner:
+    # Every singleton the checkpoint reads or restores, as a new process would have them.
+    catalog = MarketCatalog()
+    events = EventIndex()
+    queue = WriteBehindQueue()
+    for module in (scanner_module, warm_start_module):
+        monkeypatch.setattr(module, "market_catalog", catalog)
+        monkeypatch.setattr(module, "event_index", events)
+        monkeypatch.setattr(module, "write_behind", queue)
+    monkeypatch.setattr(scanner_module, "opportunity_index", OpportunityIndex())
+    monkeypatch.setattr(scanner_module, "opportunity_lifecycle", OpportunityLifecycle())
+    scanner = ArbitrageScanner()
+    monkeypatch.setattr(warm_start_module, "scanner", scanner)
+    return scanner
+
+def market(key: str, yes: float, no: float, event_title: str = None) -> MarketRecord:
+    tokens = [TokenRecord(f"{key}-yes", "Yes", yes), TokenRecord(f"{key}-no", "No", no)]
+    return MarketRecord(key, f"{key}?", key, key, tokens, 1200.0, 5000.0, False, event_title)
+
+def entry(opp_id: str, key: str) -> dict:
+    return Opportunity(
+        id=opp_id, detected_at=datetime.utcnow(), arbitrage_type=ArbitrageType.BINARY_MISPRICING,
+        market_question=f"{key}?", markets_involved=[key], total_cost=0.9, gross_profit=0.1,
+        gross_profit_percent=11.1, estimated_fees=0.0, net_profit=0.1, net_profit_percent=11.1,
+        trade_legs=[], min_liquidity=5000
+    ).to_dict()
+
+async def checkpoint(monkeypatch) -> WarmStart:
+    scanner = fresh_process(monkeypatch)
+    markets = {"a": market("a", 0.45, 0.45, "Event"), "b": market("b", 0.50, 0.52), "c": market("c", 0.30, 0.71)}
+    warm_start_module.market_catalog.restore(markets, 7, datetime(2026, 1, 5, 12, 0, 0))
+    warm_start_module.event_index.install([EventGroup("e1", "Event", "event", True, ["a", "b"])])
+    scanner.restore({"a": (5000.0, 0.45, 0.45), "b": (5000.0, 0.50, 0.52)}, [entry("opp-a", "a")], 3)
+    
+    warm = WarmStart()
+    await warm._checkpoint(warm._capture())
+    assert warm.checkpoints == 1
+    return warm
+
+def test_checkpoint_round_trip_restores_state_and_expires_unvouched_rows(monkeypatch):
+    async def run():
+        await init_database()
+        seen_at = datetime.utcnow().isoformat()
+        await write_opportunity_batch(
+            [opportunity_row(entry("opp-a", "a"), seen_at), opportunity_row(entry("opp-gone", "z"), seen_at)], []
+        )
+        await checkpoint(monkeypatch)
+        
+        scanner = fresh_process(monkeypatch)
+        warm = WarmStart()
+        assert await warm.restore()
+        await warm_start_module.write_behind.stop()
+        active = await get_active_opportunity_ids()
+        await database_module.database.close()
+        return scanner, warm, active
+    scanner, warm, active = asyncio.run(run())
+    
+    catalog = warm_start_module.market_catalog
+    assert catalog.is_loaded and catalog.restored
+    assert catalog.version == 7
+    assert {key: [(t.token_id, t.outcome, t.price) for t in m.tokens] for key, m in catalog.markets.items()} == {
+        "a": [("a-yes", "Yes", 0.45), ("a-no", "No", 0.45)],
+        "b": [("b-yes", "Yes", 0.50), ("b-no", "No", 0.52)],
+        "c": [("c-yes", "Yes", 0.30), ("c-no", "No", 0.71)]
+    }
+    assert catalog.markets["a"].event_title == "Event"
+    assert scanner.last_price_state("a") == (5000.0, 0.45, 0.45)
+    assert scanner.last_price_state("c") is None
+    assert list(scanner.active_opportunities) == ["opp-a"]
+    assert scanner.index.get("opp-a")["market_question"] == "a?"
+    assert scanner.markets_scanned == 3
+    assert warm_start_module.event_index.event_by_market == {"a": "e1", "b": "e1"}
+    
+    assert warm.restored["expired_stale"] == 1
+    assert active == ["opp-a"]
+
+def test_checkpoint_older_than_max_age_is_ignored(monkeypatch):
+    async def run():
+        await checkpoint(monkeypatch)
+        monkeypatch.setattr(settings, "WARM_START_MAX_AGE_SECONDS", -1)
+        fresh_process(monkeypatch)
+        warm = WarmStart()
+        return await warm.restore()
+    
+    assert not asyncio.run(run())
+    assert not warm_start_module.market_catalog.is_loaded
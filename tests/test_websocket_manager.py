@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+from api.websocket_manager import ConnectionManager
+from config import settings
+
+class StalledSocket:
+    def __init__(self):
+        self.query_params = {}
+        self.sent = []
+        self.closed = False
+        self.release = asyncio.Event()
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, text: str):
+        await self.release.wait()
+        self.sent.append(json.loads(text))
+    
+    async def send_bytes(self, data: bytes):
+        await self.release.wait()
+    
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+def delta(i: int) -> dict:
+    return {"type": "delta", "added": [], "updated": [], "removed": [f"opp-{i}"], "summary": {}}
+
+@pytest.fixture(autouse=True)
+def small_queues(monkeypatch):
+    monkeypatch.setattr(settings, "WS_CLIENT_QUEUE_SIZE", 4)
+
+def test_overflowing_client_is_resynced(monkeypatch):
+    monkeypatch.setattr(settings, "WS_SLOW_CLIENT_POLICY", "resync")
+    
+    async def run():
+        manager = ConnectionManager()
+        socket = StalledSocket()
+        await manager.connect(socket)
+        await asyncio.sleep(0)
+        for i in range(10):
+            await manager.publish_delta(delta(i))
+        stats = manager.get_stats()
+        socket.release.set()
+        await asyncio.sleep(0.05)
+        manager.disconnect(socket)
+        return stats, socket.sent
+    
+    stats, sent = asyncio.run(run())
+    
+    assert stats["resyncs"] == 1
+    assert stats["evictions"] == 0
+    assert stats["messages_dropped"] > 0
+    assert [frame["type"] for frame in sent] == ["snapshot", "snapshot"]
+    assert sent[-1]["seq"] == 10
+
+def test_overflowing_client_is_evicted(monkeypatch):
+    monkeypatch.setattr(settings, "WS_SLOW_CLIENT_POLICY", "disconnect")
+    
+    async def run():
+        manager = ConnectionManager()
+        socket = StalledSocket()
+        await manager.connect(socket)
+        await asyncio.sleep(0)
+        for i in range(10):
+            await manager.publish_delta(delta(i))
+        await asyncio.sleep(0)
+        return manager.get_stats(), socket.closed
+    
+    stats, closed = asyncio.run(run())
+    
+    assert stats["evictions"] == 1
+    assert stats["clients"] == 0
+    assert closed